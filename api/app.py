@@ -1,22 +1,72 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import PlainTextResponse, StreamingResponse
 
 from api.schemas.process_schema import Processo
+from api.schemas.processo_compacto import ErroProjecao, projetar_processo
 from verifier.opniaoTecnica import gerar_parecer_tecnico
-from verifier.llm_client import analisar_com_llm, ErroLLM
+from verifier.llm_client import analisar_com_llm, analisar_com_llm_async, aquecer_clientes, modelo_padrao, ErroLLM
+from verifier.registro_prompts import registro_prompts
+from verifier.cache_decisoes import cache_decisoes
+from verifier.agendador_llm import agendador_llm
+from verifier.roteador_llm import roteador_llm
+from verifier.motor_decisao import DecisaoMotor, decidir, decidir_async, usar_curto_circuito
+from verifier.armazem_decisoes import armazem_decisoes, impressao_processo
+from verifier.analise_incremental import estados_incrementais
+from verifier.pool_cpu import pool_cpu
+from verifier.regras import registro_politicas
+from verifier.batch import analisar_registro
+from api.notificacoes import despachante_n8n
+from api.ingestao import CorpoGrandeDemais, receber_corpo, ingerir_processo
 from config.logger import obter_log
+from config.metricas import LATENCIA_ETAPA, LATENCIA_REQUISICAO, metricas_compartilhadas, registro_metricas
+from pydantic import ValidationError
+import asyncio
+import json
 import uuid
 import time
 import os
-import requests
+from contextlib import asynccontextmanager
+
+
+logger = obter_log("api")
+
+
+@asynccontextmanager
+async def ciclo_de_vida(app: FastAPI):
+    # Clientes do LLM montados em segundo plano: a API já atende (health,
+    # decisões por regras) enquanto o SDK da OpenAI é importado
+    aquecimento = asyncio.create_task(run_in_threadpool(aquecer_clientes))
+    # Trabalhadores do pool de CPU sobem antes da primeira requisição
+    if pool_cpu is not None:
+        await run_in_threadpool(pool_cpu.aquecer)
+    # Com vários workers (serve.py), cada um publica as próprias métricas
+    if metricas_compartilhadas is not None:
+        metricas_compartilhadas.iniciar()
+    yield
+    await aquecimento
+    # Envia o que ainda estiver na fila de notificações antes de sair
+    await run_in_threadpool(despachante_n8n.encerrar)
+    if pool_cpu is not None:
+        await run_in_threadpool(pool_cpu.encerrar)
+    if metricas_compartilhadas is not None:
+        await run_in_threadpool(metricas_compartilhadas.encerrar)
 
 
 app = FastAPI(
     title="JusCash ML API",
     version="1.0.0",
-    description="API para análise automatizada de processos judiciais."
+    description="API para análise automatizada de processos judiciais.",
+    lifespan=ciclo_de_vida,
 )
 
-logger = obter_log("api")
+# Na rota /rapido, corpos até este tamanho são lidos no próprio event loop;
+# maiores vão para o threadpool, já que projetar/validar é CPU
+RAPIDO_ENTRADA_INLINE_BYTES = int(os.getenv("JUSCASH_RAPIDO_INLINE_BYTES", "65536"))
+
+# Limite de chamadas simultâneas ao LLM no endpoint de lote
+LOTE_CONCORRENCIA_LLM = int(os.getenv("JUSCASH_LOTE_CONCORRENCIA", "8"))
 
 @app.get("/health")
 def health():
@@ -27,81 +77,368 @@ def health():
         }
 
 
+# Métricas no formato texto do Prometheus; com vários workers, somadas
+# entre todos
+@app.get("/metrics", response_class=PlainTextResponse)
+def metricas():
+
+    if metricas_compartilhadas is not None:
+        corpo = metricas_compartilhadas.exportar()
+    else:
+        corpo = registro_metricas.exportar()
+    return PlainTextResponse(corpo, media_type="text/plain; version=0.0.4")
+
+
+# Os endpoints de estado abaixo descrevem só o worker que respondeu
+# (identificado por `worker`, o pid)
+@app.get("/cache/estatisticas")
+def estatisticas_cache():
+
+    return {**cache_decisoes.estatisticas(), "worker": os.getpid()}
+
+
+@app.get("/pool-cpu/estatisticas")
+def estatisticas_pool_cpu():
+
+    if pool_cpu is None:
+        raise HTTPException(status_code=404, detail={"error": "Pool de CPU desabilitado."})
+    return {**pool_cpu.estatisticas(), "worker": os.getpid()}
+
+
+# Fila/limites do agendador e estado (p95, disjuntor) de cada modelo
+@app.get("/llm/estado")
+def estado_llm():
+
+    return {
+        "agendador": agendador_llm.estatisticas(),
+        "modelos": roteador_llm.estatisticas(),
+        "modelo_secundario": roteador_llm.secundario,
+        "worker": os.getpid(),
+    }
+
+
+@app.get("/politicas")
+def politicas_ativas():
+
+    politicas = registro_politicas.obter()
+    return {
+        "versao": politicas.versao,
+        "politicas": [id_politica for id_politica, *_ in politicas.politicas],
+        "tempos_por_regra": politicas.estatisticas(),
+    }
+
+
+# Histórico de decisões de um processo (requer JUSCASH_ARMAZEM_SQLITE)
+@app.get("/decisoes/{numero_processo}")
+def historico_decisoes(numero_processo: str, limite: int = Query(default=50, ge=1, le=1000)):
+    if armazem_decisoes is None:
+        raise HTTPException(status_code=404, detail={"error": "Armazém de decisões desabilitado."})
+    return {"numero_processo": numero_processo, "decisoes": armazem_decisoes.historico(numero_processo, limite)}
+
+
+
 # Endpoint principal
 @app.post("/analisar-processo")
-def analisar_processo(processo: Processo):
+def analisar_processo(processo: Processo, curto_circuito: bool | None = None, reprocessar: bool = False):
     
     request_id = str(uuid.uuid4())
     logger.info(f"[{request_id}] Nova requisição /analisar-processo recebida")
 
     inicio_tempo_total = time.perf_counter()
 
+    # Processo sem mudanças desde a última análise: devolve a decisão gravada
+    impressao, armazenada = _decisao_armazenada(request_id, processo, curto_circuito, reprocessar)
+    if armazenada is not None:
+        return _finalizar_analise(request_id, processo, armazenada, 0.0, 0.0, inicio_tempo_total, "/analisar-processo")
+
     # Gera parecer técnico + chama llm
     try:
         tempo_inicio_parecer = time.perf_counter()
-        parecer = gerar_parecer_tecnico(processo)
+        parecer, reaproveitada, estado = _gerar_parecer(processo, curto_circuito)
         parecer_tempo = time.perf_counter() - tempo_inicio_parecer
-        logger.info(
-            f"[{request_id}] Parecer gerado | numero_processo={processo.numeroProcesso} | "
-            f"politicas_violadas={parecer.politicas_potencialmente_violadas}"
-        )
+        _registrar_parecer(request_id, processo, parecer)
 
         tempo_inicio_llm = time.perf_counter()
-        decisao = analisar_com_llm(parecer)
-        llm_tempo = time.perf_counter() - tempo_inicio_llm
-        logger.info(
-            f"[{request_id}] Decisão LLM | numero_processo={processo.numeroProcesso} | "
-            f"decision={decisao.decisao} | citations={decisao.citacoes}"
+        decisao = reaproveitada or decidir(
+            parecer, analisar=analisar_com_llm, curto_circuito=curto_circuito, processo=processo
         )
+        llm_tempo = time.perf_counter() - tempo_inicio_llm
+        _registrar_decisao(request_id, processo, decisao)
+        _armazenar_decisao(processo, impressao, parecer, decisao, parecer_tempo, llm_tempo, inicio_tempo_total)
+        if estado is not None:
+            estados_incrementais.confirmar(processo.numeroProcesso, estado, decisao.resultado, decisao.caminho)
 
     except ErroLLM as e:
-        tempo_total_llm_erro = time.perf_counter() - inicio_tempo_total
-        logger.error(
-            f"[{request_id}] Erro na decisão do LLM | numero_processo={processo.numeroProcesso} | "
-            f"erro={e} | total_time={tempo_total_llm_erro:.3f}s"
-        )
+        _tratar_erro_llm(request_id, processo, e, inicio_tempo_total)
+
+    except Exception as e:
+        _tratar_erro_inesperado(request_id, processo, e, inicio_tempo_total)
+
+    return _finalizar_analise(
+        request_id, processo, decisao, parecer_tempo, llm_tempo, inicio_tempo_total, "/analisar-processo"
+    )
+
+
+# Mesmo fluxo do endpoint principal, mas sem prender uma thread do
+# threadpool durante a chamada ao LLM
+@app.post("/analisar-processo/async")
+async def analisar_processo_async(
+    processo: Processo, curto_circuito: bool | None = None, reprocessar: bool = False
+):
 
-        # Notificar fluxo no n8n (erro)
-        notificar_n8n_erro(
-            request_id=request_id,
-            processo=processo,
-            error=str(e),
-            tempo_total=tempo_total_llm_erro
+    request_id = str(uuid.uuid4())
+    logger.info(f"[{request_id}] Nova requisição /analisar-processo/async recebida")
+
+    return await _analisar_async(
+        request_id, processo, curto_circuito, "/analisar-processo/async", reprocessar=reprocessar
+    )
+
+
+# Caminho rápido opcional: o corpo vira uma projeção enxuta (um json.loads e
+# registros com __slots__, api/schemas/processo_compacto.py) em vez da árvore
+# Pydantic completa. Com ?auditoria=true, valida o Processo inteiro
+@app.post("/analisar-processo/rapido")
+async def analisar_processo_rapido(
+    request: Request, curto_circuito: bool | None = None, auditoria: bool = False, reprocessar: bool = False
+):
+
+    request_id = str(uuid.uuid4())
+    logger.info(f"[{request_id}] Nova requisição /analisar-processo/rapido recebida | auditoria={auditoria}")
+
+    inicio_tempo_total = time.perf_counter()
+    corpo = await request.body()
+
+    with LATENCIA_ETAPA.cronometrar(etapa="entrada"):
+        ler = Processo.model_validate_json if auditoria else projetar_processo
+        try:
+            if len(corpo) <= RAPIDO_ENTRADA_INLINE_BYTES:
+                processo = ler(corpo)
+            else:
+                processo = await run_in_threadpool(ler, corpo)
+        except ValidationError as e:
+            raise RequestValidationError(e.errors(include_url=False))
+        except ErroProjecao as e:
+            raise RequestValidationError(e.erros())
+
+    return await _analisar_async(
+        request_id, processo, curto_circuito, "/analisar-processo/rapido", inicio_tempo_total, reprocessar
+    )
+
+
+# Para processos muito grandes: o corpo vai para um arquivo temporário e os
+# textos dos documentos ficam fora do modelo, lidos só se alguém pedir
+# (api/ingestao.py). Fora isso, mesmo fluxo da rota async
+@app.post("/analisar-processo/grande")
+async def analisar_processo_grande(
+    request: Request, curto_circuito: bool | None = None, reprocessar: bool = False
+):
+
+    request_id = str(uuid.uuid4())
+    logger.info(f"[{request_id}] Nova requisição /analisar-processo/grande recebida")
+
+    inicio_tempo_total = time.perf_counter()
+
+    try:
+        corpo = await receber_corpo(request)
+    except CorpoGrandeDemais as e:
+        raise HTTPException(status_code=413, detail={"error": str(e)})
+
+    async with corpo:
+        try:
+            processo = await run_in_threadpool(ingerir_processo, corpo)
+        except ValidationError as e:
+            raise RequestValidationError(e.errors(include_url=False))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail={"error": str(e)})
+
+        return await _analisar_async(
+            request_id, processo, curto_circuito, "/analisar-processo/grande", inicio_tempo_total, reprocessar
         )
 
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "error": "Falha ao obter decisão do LLM.",
-                #"details": str(e),
-            },
+
+# Fluxo das rotas async: parecer, decisão (atalho ou LLM) e resposta
+async def _analisar_async(
+    request_id, processo, curto_circuito, endpoint, inicio_tempo_total=None, reprocessar=False
+):
+
+    if inicio_tempo_total is None:
+        inicio_tempo_total = time.perf_counter()
+
+    # A impressão lê todos os textos: fica fora do event loop
+    impressao, armazenada = await run_in_threadpool(
+        _decisao_armazenada, request_id, processo, curto_circuito, reprocessar
+    )
+    if armazenada is not None:
+        return _finalizar_analise(request_id, processo, armazenada, 0.0, 0.0, inicio_tempo_total, endpoint)
+
+    try:
+        tempo_inicio_parecer = time.perf_counter()
+        parecer, reaproveitada, estado = await _gerar_parecer_async(processo, curto_circuito)
+        parecer_tempo = time.perf_counter() - tempo_inicio_parecer
+        _registrar_parecer(request_id, processo, parecer)
+
+        tempo_inicio_llm = time.perf_counter()
+        decisao = reaproveitada or await decidir_async(
+            parecer, analisar=analisar_com_llm_async, curto_circuito=curto_circuito, processo=processo
         )
+        llm_tempo = time.perf_counter() - tempo_inicio_llm
+        _registrar_decisao(request_id, processo, decisao)
+        if armazem_decisoes is not None:
+            # Gravação em SQLite: fora do event loop, como a leitura
+            await run_in_threadpool(
+                _armazenar_decisao, processo, impressao, parecer, decisao, parecer_tempo, llm_tempo, inicio_tempo_total
+            )
+        if estado is not None:
+            estados_incrementais.confirmar(processo.numeroProcesso, estado, decisao.resultado, decisao.caminho)
+
+    except ErroLLM as e:
+        _tratar_erro_llm(request_id, processo, e, inicio_tempo_total)
 
     except Exception as e:
-        tempo_total_erros = time.perf_counter() - inicio_tempo_total
-        logger.exception(
-            f"[{request_id}] Erro inesperado ao analisar processo "
-            f"| numero_processo={processo.numeroProcesso} | total_time={tempo_total_erros:.3f}s"
-        )
+        _tratar_erro_inesperado(request_id, processo, e, inicio_tempo_total)
 
-        # Notificar fluxo no n8n (erro)
-        notificar_n8n_erro(
-            request_id=request_id,
-            processo=processo,
-            error=str(e),
-            tempo_total=tempo_total_llm_erro
-        )
+    return _finalizar_analise(
+        request_id, processo, decisao, parecer_tempo, llm_tempo, inicio_tempo_total, endpoint
+    )
 
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "error": "Erro interno ao analisar o processo.",
-            },
-        )
-    
+
+# Parecer técnico; no modo incremental, varre só os itens novos e devolve a
+# decisão anterior quando o parecer não mudou. Devolve (parecer, decisão
+# reaproveitada ou None, estado a confirmar ou None). Processos com muito
+# texto vão para o pool de CPU, se ligado
+def _gerar_parecer(processo, curto_circuito=None):
+    if estados_incrementais is None:
+        if pool_cpu is not None and pool_cpu.vale_a_pena(processo):
+            return pool_cpu.gerar_parecer(processo), None, None
+        return gerar_parecer_tecnico(processo), None, None
+
+    parecer, resultado_anterior, estado = estados_incrementais.analisar(
+        processo, usar_curto_circuito(curto_circuito)
+    )
+    reaproveitada = None
+    if resultado_anterior is not None:
+        reaproveitada = DecisaoMotor(resultado=resultado_anterior, caminho="incremental")
+    return parecer, reaproveitada, estado
+
+
+# Nas rotas async o parecer não ocupa o event loop: vai para o pool de CPU
+# ou, fora dele, para o threadpool (a varredura dos textos é CPU e, na rota
+# /grande, leitura de textos enormes)
+async def _gerar_parecer_async(processo, curto_circuito=None):
+    if estados_incrementais is None and pool_cpu is not None and pool_cpu.vale_a_pena(processo):
+        return await pool_cpu.gerar_parecer_async(processo), None, None
+    return await run_in_threadpool(_gerar_parecer, processo, curto_circuito)
+
+
+# Impressão das entradas e, se o processo não mudou desde a última análise,
+# a decisão gravada no armazém. (None, None) com o armazém desligado
+def _decisao_armazenada(request_id, processo, curto_circuito, reprocessar):
+    if armazem_decisoes is None:
+        return None, None
+
+    impressao = impressao_processo(
+        processo, registro_prompts.versao_ativa, registro_politicas.obter().versao, modelo_padrao(),
+        usar_curto_circuito(curto_circuito),
+    )
+    if reprocessar:
+        return impressao, None
+
+    resultado = armazem_decisoes.buscar(processo.numeroProcesso, impressao)
+    if resultado is None:
+        return impressao, None
+
+    logger.info(
+        f"[{request_id}] Decisão reaproveitada do armazém | numero_processo={processo.numeroProcesso} | "
+        f"decision={resultado.decisao}"
+    )
+    return impressao, DecisaoMotor(resultado=resultado, caminho="armazem")
+
+
+def _armazenar_decisao(processo, impressao, parecer, decisao, parecer_tempo, llm_tempo, inicio_tempo_total):
+    if armazem_decisoes is None or impressao is None:
+        return
+    armazem_decisoes.registrar(
+        numero_processo=processo.numeroProcesso,
+        impressao=impressao,
+        opiniao=parecer,
+        resultado=decisao.resultado,
+        caminho=decisao.caminho,
+        versao_prompt=registro_prompts.versao_ativa,
+        versao_politicas=registro_politicas.obter().versao,
+        modelo=decisao.modelo,
+        tempo_parecer=parecer_tempo,
+        tempo_decisao=llm_tempo,
+        tempo_total=time.perf_counter() - inicio_tempo_total,
+    )
+
+
+def _registrar_parecer(request_id, processo, parecer):
+    logger.info(
+        f"[{request_id}] Parecer gerado | numero_processo={processo.numeroProcesso} | "
+        f"politicas_violadas={parecer.politicas_potencialmente_violadas}"
+    )
+
+
+def _registrar_decisao(request_id, processo, decisao):
+    logger.info(
+        f"[{request_id}] Decisão | caminho={decisao.caminho} | numero_processo={processo.numeroProcesso} | "
+        f"decision={decisao.resultado.decisao} | citations={decisao.resultado.citacoes}"
+    )
+
+
+def _tratar_erro_llm(request_id, processo, e, inicio_tempo_total):
+    tempo_total_llm_erro = time.perf_counter() - inicio_tempo_total
+    logger.error(
+        f"[{request_id}] Erro na decisão do LLM | numero_processo={processo.numeroProcesso} | "
+        f"erro={e} | total_time={tempo_total_llm_erro:.3f}s"
+    )
+
+    # Notificar fluxo no n8n (erro)
+    notificar_n8n_erro(
+        request_id=request_id,
+        processo=processo,
+        error=str(e),
+        tempo_total=tempo_total_llm_erro
+    )
+
+    raise HTTPException(
+        status_code=500,
+        detail={
+            "error": "Falha ao obter decisão do LLM.",
+            #"details": str(e),
+        },
+    )
+
+
+def _tratar_erro_inesperado(request_id, processo, e, inicio_tempo_total):
+    tempo_total_erros = time.perf_counter() - inicio_tempo_total
+    logger.exception(
+        f"[{request_id}] Erro inesperado ao analisar processo "
+        f"| numero_processo={processo.numeroProcesso} | total_time={tempo_total_erros:.3f}s",
+        exc_info=e,
+    )
+
+    # Notificar fluxo no n8n (erro)
+    notificar_n8n_erro(
+        request_id=request_id,
+        processo=processo,
+        error=str(e),
+        tempo_total=tempo_total_erros
+    )
+
+    raise HTTPException(
+        status_code=500,
+        detail={
+            "error": "Erro interno ao analisar o processo.",
+        },
+    )
+
+
+def _finalizar_analise(request_id, processo, decisao, parecer_tempo, llm_tempo, inicio_tempo_total, endpoint):
 
     # Resultado final
     tempo_total = time.perf_counter() - inicio_tempo_total
+    LATENCIA_REQUISICAO.observar(tempo_total, endpoint=endpoint)
     logger.info(
         f"[{request_id}] Tempos | parecer={parecer_tempo:.3f}s | llm={llm_tempo:.3f}s | "
         f"total={tempo_total:.3f}s"
@@ -109,43 +446,149 @@ def analisar_processo(processo: Processo):
 
     notificar_n8n_sucesso(request_id, processo, decisao, tempo_total)
 
-    return decisao.model_dump()
+    return decisao.resultado.model_dump()
+
+
+# Endpoint de lote: recebe uma lista JSON (ou NDJSON) de processos e devolve
+# um resultado por linha (NDJSON) à medida que cada análise termina
+@app.post("/analisar-processos/lote")
+async def analisar_processos_lote(
+    request: Request,
+    concorrencia: int | None = Query(default=None, ge=1, le=256),
+    curto_circuito: bool | None = None,
+):
+
+    request_id = str(uuid.uuid4())
+    corpo = await request.body()
+
+    try:
+        itens = _ler_itens_lote(corpo, request.headers.get("content-type", ""))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail={"error": str(e)})
+
+    limite = concorrencia or LOTE_CONCORRENCIA_LLM
+    logger.info(
+        f"[{request_id}] Nova requisição /analisar-processos/lote recebida | "
+        f"itens={len(itens)} | concorrencia_llm={limite}"
+    )
+
+    return StreamingResponse(
+        _gerar_resultados_lote(request_id, itens, limite, curto_circuito),
+        media_type="application/x-ndjson",
+    )
+
+
+def _ler_itens_lote(corpo: bytes, content_type: str) -> list:
+    try:
+        texto = corpo.decode("utf-8").strip()
+    except UnicodeDecodeError as e:
+        raise ValueError(f"Corpo não está em UTF-8: {e}") from e
+    if not texto:
+        raise ValueError("Corpo da requisição vazio.")
+
+    # Lista JSON tradicional
+    if "ndjson" not in content_type and texto.startswith("["):
+        try:
+            itens = json.loads(texto)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"JSON inválido: {e}") from e
+        return itens
+
+    # NDJSON: um processo por linha; linhas inválidas viram erro do próprio item
+    itens = []
+    for linha in texto.splitlines():
+        linha = linha.strip()
+        if not linha:
+            continue
+        try:
+            itens.append(json.loads(linha))
+        except json.JSONDecodeError as e:
+            itens.append(ValueError(f"Linha NDJSON inválida: {e}"))
+    return itens
+
+
+# Janela deslizante como em verifier/batch.py: no máximo 2 x `limite` itens
+# em andamento (parecer, regras, resultado pendente), não o lote inteiro
+async def _gerar_resultados_lote(request_id: str, itens: list, limite: int, curto_circuito: bool | None):
+    inicio_tempo_total = time.perf_counter()
+    semaforo = asyncio.Semaphore(limite)
+    max_pendentes = limite * 2
+    pendentes: set[asyncio.Task] = set()
+
+    erros = 0
+
+    def linhas(prontas):
+        nonlocal erros
+        for tarefa in prontas:
+            resultado = tarefa.result()
+            if resultado["status"] != "success":
+                erros += 1
+            yield json.dumps(resultado, ensure_ascii=False) + "\n"
+
+    try:
+        for indice, item in enumerate(itens):
+            pendentes.add(
+                asyncio.create_task(_analisar_item_lote(request_id, indice, item, semaforo, curto_circuito))
+            )
+            if len(pendentes) >= max_pendentes:
+                prontas, pendentes = await asyncio.wait(pendentes, return_when=asyncio.FIRST_COMPLETED)
+                for linha in linhas(prontas):
+                    yield linha
+
+        while pendentes:
+            prontas, pendentes = await asyncio.wait(pendentes, return_when=asyncio.FIRST_COMPLETED)
+            for linha in linhas(prontas):
+                yield linha
+    finally:
+        # Cliente desconectou no meio do stream: não deixa análises órfãs
+        for tarefa in pendentes:
+            tarefa.cancel()
+
+    tempo_total = time.perf_counter() - inicio_tempo_total
+    logger.info(
+        f"[{request_id}] Lote concluído | itens={len(itens)} | erros={erros} | "
+        f"total={tempo_total:.3f}s"
+    )
+
 
+async def _analisar_item_lote(
+    request_id: str, indice: int, item, semaforo: asyncio.Semaphore, curto_circuito: bool | None
+) -> dict:
 
-N8N_WEBHOOK_URL = os.getenv("N8N_WEBHOOK_URL")
+    resultado = await analisar_registro(
+        item, semaforo, curto_circuito=curto_circuito, analisar=analisar_com_llm_async
+    )
+    if resultado["status"] != "success":
+        logger.warning(
+            f"[{request_id}] Item do lote com erro | indice={indice} | "
+            f"numero_processo={resultado['numeroProcesso']} | erro={resultado['erro']}"
+        )
+    return {"indice": indice, **resultado}
 
+
+# Os eventos vão para a fila do despachante; o envio ao n8n acontece em
+# segundo plano e não pesa na latência da resposta
 def notificar_n8n_sucesso(request_id, processo, decisao, tempo_total):
-    if not N8N_WEBHOOK_URL:
-        return
     payload = {
         "request_id": request_id,
         "numero_processo": processo.numeroProcesso,
-        "decisao": decisao.decisao,
-        "citacoes": decisao.citacoes,
+        "decisao": decisao.resultado.decisao,
+        "citacoes": decisao.resultado.citacoes,
+        "caminho_decisao": decisao.caminho,
         "latencia_total": tempo_total,
-        "versao_prompt": os.getenv("PROMPT_VERSION", "1"),
+        "versao_prompt": registro_prompts.versao_ativa,
         "status": "success",
     }
-    try:
-        requests.post(N8N_WEBHOOK_URL, json=payload, timeout=5)
-    except Exception:
-        logger.warning(f"[{request_id}] Falha ao notificar n8n")
+    despachante_n8n.enviar(payload)
 
 
 def notificar_n8n_erro(request_id, processo, error, tempo_total):
-    if not N8N_WEBHOOK_URL:
-        return
     payload = {
         "request_id": request_id,
         "numero_processo": processo.numeroProcesso,
         "erro": error,
         "latencia_total": tempo_total,
-        "versao_prompt": os.getenv("PROMPT_VERSION", "1"),
+        "versao_prompt": registro_prompts.versao_ativa,
         "status": "error",
     }
-    try:
-        requests.post(N8N_WEBHOOK_URL, json=payload, timeout=5)
-    except Exception:
-        logger.warning(f"[{request_id}] Falha ao notificar n8n (erro)")
-
-
+    despachante_n8n.enviar(payload)
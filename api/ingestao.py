@@ -0,0 +1,219 @@
+import codecs
+import json
+import mmap
+import os
+import re
+import tempfile
+from typing import Iterator
+
+from fastapi import Request
+
+from api.schemas.process_schema import Processo
+from config.logger import obter_log
+
+
+logger = obter_log("ingestao")
+
+
+# Ingestão de processos grandes sem carregar os textos dos documentos:
+# 1. o corpo da requisição vai em streaming para um arquivo temporário
+#    (nunca inteiro na memória) e é mapeado com mmap
+# 2. uma varredura acha cada valor de "texto" e monta um corpo enxuto, com o
+#    valor trocado por uma referência curta ("#N")
+# 3. o Pydantic valida só o corpo enxuto (metadados, nomes, movimentos)
+# 4. cada Documento guarda (início, fim) do seu texto no mmap e só decodifica
+#    quando alguém chama `carregar_texto()`
+# O mmap vive até o fim da requisição; o pico de memória fica perto do
+# tamanho dos metadados, e não do processo inteiro.
+
+LIMITE_CORPO_BYTES = int(float(os.getenv("JUSCASH_INGESTAO_MAX_CORPO_MB", "1024")) * 1024 * 1024)
+LIMITE_TEXTO_BYTES = int(float(os.getenv("JUSCASH_INGESTAO_MAX_TEXTO_MB", "16")) * 1024 * 1024)
+DIRETORIO_SPOOL = os.getenv("JUSCASH_INGESTAO_DIR") or None
+
+# Chave "texto" seguida do início do valor string. Dentro de strings JSON
+# aspas aparecem escapadas, então só casa em chaves de verdade (conferido
+# pela contagem de barras antes da aspa)
+_CHAVE_TEXTO = re.compile(rb'"texto"\s*:\s*"')
+
+
+class CorpoGrandeDemais(Exception):
+    pass
+
+
+class TextoAdiado:
+    __slots__ = ("corpo", "inicio", "fim", "limite")
+
+    # [inicio, fim) é o conteúdo da string JSON, sem as aspas
+    def __init__(self, corpo, inicio: int, fim: int, limite: int = LIMITE_TEXTO_BYTES):
+        self.corpo = corpo
+        self.inicio = inicio
+        self.fim = fim
+        self.limite = limite
+
+    @property
+    def tamanho_bytes(self) -> int:
+        return self.fim - self.inicio
+
+    def _fim_efetivo(self) -> int:
+        if self.tamanho_bytes <= self.limite:
+            return self.fim
+        logger.warning(f"Texto de documento truncado | bytes={self.tamanho_bytes} | limite={self.limite}")
+        return _cortar_escape(self.corpo, self.inicio, self.inicio + self.limite)
+
+    def ler(self) -> str:
+        return _decodificar(self.bruto().decode("utf-8", "ignore"))
+
+    # Conteúdo ainda escapado, para mandar a outro processo sem decodificar
+    # (verifier/pool_cpu.py); lá vira um TextoAdiado sobre esses bytes
+    def bruto(self) -> bytes:
+        return bytes(self.corpo[self.inicio:self._fim_efetivo()])
+
+    # Texto em pedaços de ~`tamanho` bytes, decodificados um a um, sem partir
+    # sequências de escape nem caracteres UTF-8
+    def partes(self, tamanho: int) -> Iterator[str]:
+        decodificador = codecs.getincrementaldecoder("utf-8")("ignore")
+        fim_total = self._fim_efetivo()
+        posicao = self.inicio
+        # Cabe sempre um escape inteiro (\uXXXX), então o corte avança
+        tamanho = max(tamanho, 6)
+
+        while posicao < fim_total:
+            fim = min(posicao + tamanho, fim_total)
+            if fim < fim_total:
+                fim = _cortar_escape(self.corpo, posicao, fim)
+            bruto = decodificador.decode(bytes(self.corpo[posicao:fim]), final=fim >= fim_total)
+            posicao = fim
+            if bruto:
+                yield _decodificar(bruto)
+
+
+# Conteúdo de string JSON (sem as aspas) para str; sem barra invertida não há
+# escape a resolver
+def _decodificar(bruto: str) -> str:
+    if "\\" not in bruto:
+        return bruto
+    return json.loads(f'"{bruto}"')
+
+
+# Recua o corte para não partir uma sequência de escape (\n, \", \u00e7)
+def _cortar_escape(corpo, inicio: int, fim: int) -> int:
+    janela = max(inicio, fim - 6)
+    barra = bytes(corpo[janela:fim]).rfind(b"\\")
+    if barra == -1:
+        return fim
+    posicao = janela + barra
+    if _escapada(corpo, posicao, inicio):
+        return fim
+    tamanho_escape = 6 if posicao + 1 < fim and corpo[posicao + 1] == ord("u") else 2
+    return posicao if fim - posicao < tamanho_escape else fim
+
+
+def _fim_da_string(corpo, inicio: int) -> int:
+    posicao = inicio
+    while True:
+        aspa = corpo.find(b'"', posicao)
+        if aspa == -1:
+            raise ValueError("String JSON sem fechamento no corpo da requisição.")
+        if not _escapada(corpo, aspa, inicio):
+            return aspa
+        posicao = aspa + 1
+
+
+# Ímpar de barras logo antes da posição = caractere escapado
+def _escapada(corpo, posicao: int, inicio: int = 0) -> bool:
+    barras = 0
+    while posicao - barras - 1 >= inicio and corpo[posicao - barras - 1] == ord("\\"):
+        barras += 1
+    return barras % 2 == 1
+
+
+# Corpo sem os valores de "texto" (cada um vira "#N") e as posições de cada valor
+def separar_textos(corpo) -> tuple[bytes, list[tuple[int, int]]]:
+    partes = []
+    posicoes = []
+    anterior = 0
+    busca = 0
+
+    while True:
+        chave = _CHAVE_TEXTO.search(corpo, busca)
+        if chave is None:
+            break
+        if _escapada(corpo, chave.start()):
+            busca = chave.start() + 1
+            continue
+
+        inicio = chave.end()
+        fim = _fim_da_string(corpo, inicio)
+        partes.append(bytes(corpo[anterior:inicio]))
+        partes.append(f"#{len(posicoes)}".encode())
+        posicoes.append((inicio, fim))
+        anterior = busca = fim
+
+    partes.append(bytes(corpo[anterior:]))
+    return b"".join(partes), posicoes
+
+
+class CorpoSpool:
+
+    def __init__(self, arquivo, tamanho: int):
+        self.arquivo = arquivo
+        self.tamanho = tamanho
+        self.mapa = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ) if tamanho else None
+
+    def fechar(self) -> None:
+        if self.mapa is not None:
+            self.mapa.close()
+        self.arquivo.close()
+
+    async def __aenter__(self) -> "CorpoSpool":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self.fechar()
+
+
+# Grava o corpo em um arquivo temporário à medida que chega, respeitando o
+# limite de tamanho. As escritas vão para o cache de páginas do SO e são
+# rápidas o bastante para ficar no event loop
+async def receber_corpo(request: Request, limite: int | None = None) -> CorpoSpool:
+    limite = LIMITE_CORPO_BYTES if limite is None else limite
+    declarado = request.headers.get("content-length")
+    if declarado and declarado.isdigit() and int(declarado) > limite:
+        raise CorpoGrandeDemais(f"Corpo de {declarado} bytes excede o limite de {limite} bytes.")
+
+    arquivo = tempfile.TemporaryFile(dir=DIRETORIO_SPOOL)
+    tamanho = 0
+    try:
+        async for pedaco in request.stream():
+            tamanho += len(pedaco)
+            if tamanho > limite:
+                raise CorpoGrandeDemais(f"Corpo excede o limite de {limite} bytes.")
+            arquivo.write(pedaco)
+        arquivo.flush()
+        return CorpoSpool(arquivo, tamanho)
+    except BaseException:
+        arquivo.close()
+        raise
+
+
+# Valida o processo a partir do corpo enxuto e liga cada documento ao seu texto
+def ingerir_processo(corpo: CorpoSpool, limite_texto: int | None = None) -> Processo:
+    limite_texto = LIMITE_TEXTO_BYTES if limite_texto is None else limite_texto
+    if corpo.mapa is None:
+        return Processo.model_validate_json(b"")
+
+    enxuto, posicoes = separar_textos(corpo.mapa)
+    processo = Processo.model_validate_json(enxuto)
+
+    for documento in processo.documentos:
+        referencia = documento.texto
+        if referencia.startswith("#") and referencia[1:].isdigit() and int(referencia[1:]) < len(posicoes):
+            inicio, fim = posicoes[int(referencia[1:])]
+            documento.texto = ""
+            documento._texto_adiado = TextoAdiado(corpo.mapa, inicio, fim, limite_texto)
+
+    logger.info(
+        f"Processo ingerido sem textos | numero_processo={processo.numeroProcesso} | "
+        f"corpo_bytes={corpo.tamanho} | enxuto_bytes={len(enxuto)} | textos={len(posicoes)}"
+    )
+    return processo
@@ -0,0 +1,165 @@
+import json
+import os
+import queue
+import random
+import threading
+import time
+from typing import TYPE_CHECKING
+
+from config.logger import obter_log
+from config.metricas import LATENCIA_ETAPA
+
+if TYPE_CHECKING:
+    import requests
+
+
+logger = obter_log("notificacoes")
+
+
+# Envia eventos ao webhook do n8n fora do caminho da requisição:
+# - fila em memória limitada + uma thread de envio com sessão HTTP reaproveitada
+# - retentativa com backoff exponencial (com jitter)
+# - vários eventos por POST quando tamanho_lote > 1 (o n8n recebe uma lista)
+# - fila cheia ou envio esgotado => evento vai para um arquivo de spool local (NDJSON)
+# - `requests` só é importado pela thread de envio: sem webhook configurado,
+#   a API não paga esse import na subida
+class DespachanteNotificacoes:
+
+    def __init__(
+        self,
+        url: str | None,
+        tamanho_fila: int = 1000,
+        tamanho_lote: int = 1,
+        tentativas: int = 3,
+        backoff_base: float = 0.5,
+        timeout: float = 5,
+        caminho_spool: str | None = None,
+    ):
+        self.url = url
+        self.tamanho_lote = max(1, tamanho_lote)
+        self.tentativas = max(1, tentativas)
+        self.backoff_base = backoff_base
+        self.timeout = timeout
+        self.caminho_spool = caminho_spool
+
+        self._fila: queue.Queue = queue.Queue(maxsize=tamanho_fila)
+        self._thread: threading.Thread | None = None
+        self._lock_inicio = threading.Lock()
+        self._lock_spool = threading.Lock()
+        self._parar = threading.Event()
+        self._sessao: "requests.Session | None" = None
+
+        self.enviados = 0
+        self.em_spool = 0
+
+    def enviar(self, evento: dict) -> bool:
+        if not self.url:
+            return False
+
+        self._garantir_worker()
+        try:
+            self._fila.put_nowait(evento)
+            return True
+        except queue.Full:
+            logger.warning("Fila de notificações cheia, evento enviado ao spool")
+            self._gravar_spool([evento])
+            return False
+
+    def _garantir_worker(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock_inicio:
+            if self._thread is None or not self._thread.is_alive():
+                self._parar.clear()
+                self._thread = threading.Thread(target=self._loop, name="notificacoes-n8n", daemon=True)
+                self._thread.start()
+
+    def _loop(self) -> None:
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self._sessao = requests.Session()
+        self._sessao.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+        self._sessao.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+
+        while not (self._parar.is_set() and self._fila.empty()):
+            try:
+                primeiro = self._fila.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            eventos = [primeiro]
+            while len(eventos) < self.tamanho_lote:
+                try:
+                    eventos.append(self._fila.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                self._postar(eventos)
+            finally:
+                for _ in eventos:
+                    self._fila.task_done()
+
+        self._sessao.close()
+
+    def _postar(self, eventos: list[dict]) -> None:
+        import requests
+
+        corpo = eventos if self.tamanho_lote > 1 else eventos[0]
+
+        for tentativa in range(1, self.tentativas + 1):
+            try:
+                with LATENCIA_ETAPA.cronometrar(etapa="webhook"):
+                    resposta = self._sessao.post(self.url, json=corpo, timeout=self.timeout)
+                if resposta.status_code < 500:
+                    if resposta.status_code >= 400:
+                        logger.warning(f"n8n recusou notificação | status={resposta.status_code}")
+                    self.enviados += len(eventos)
+                    return
+                erro = f"status={resposta.status_code}"
+            except requests.RequestException as e:
+                erro = str(e)
+
+            if tentativa < self.tentativas:
+                espera = self.backoff_base * (2 ** (tentativa - 1))
+                time.sleep(espera * random.uniform(0.5, 1.5))
+
+        logger.warning(f"Falha ao notificar n8n após {self.tentativas} tentativas | erro={erro}")
+        self._gravar_spool(eventos)
+
+    def _gravar_spool(self, eventos: list[dict]) -> None:
+        if not self.caminho_spool:
+            logger.warning(f"Notificações descartadas (sem spool configurado) | eventos={len(eventos)}")
+            return
+        with self._lock_spool:
+            with open(self.caminho_spool, "a", encoding="utf-8") as f:
+                for evento in eventos:
+                    f.write(json.dumps(evento, ensure_ascii=False) + "\n")
+            self.em_spool += len(eventos)
+
+    # Espera a fila esvaziar (até `timeout`) e para a thread de envio
+    def encerrar(self, timeout: float = 10) -> None:
+        if self._thread is None:
+            return
+        self._parar.set()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.warning("Encerrando com notificações pendentes na fila")
+            pendentes = []
+            while True:
+                try:
+                    pendentes.append(self._fila.get_nowait())
+                except queue.Empty:
+                    break
+            if pendentes:
+                self._gravar_spool(pendentes)
+
+
+despachante_n8n = DespachanteNotificacoes(
+    url=os.getenv("N8N_WEBHOOK_URL"),
+    tamanho_fila=int(os.getenv("N8N_FILA_MAX", "1000")),
+    tamanho_lote=int(os.getenv("N8N_LOTE_MAX", "1")),
+    tentativas=int(os.getenv("N8N_TENTATIVAS", "3")),
+    caminho_spool=os.getenv("N8N_SPOOL_PATH", "n8n_spool.ndjson"),
+)
@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Iterator, List, Optional
 
 class Documento(BaseModel):
     id: str
@@ -8,6 +8,25 @@ class Documento(BaseModel):
     nome: str
     texto: str
 
+    # Na ingestão preguiçosa (api/ingestao.py) o texto fica fora do modelo,
+    # como referência ao corpo da requisição, e `texto` vem vazio
+    _texto_adiado: Any = PrivateAttr(default=None)
+
+    # Texto do documento, lido do corpo da requisição só quando alguém pede
+    def carregar_texto(self) -> str:
+        if self._texto_adiado is None:
+            return self.texto
+        return self._texto_adiado.ler()
+
+    # Texto em pedaços de até `tamanho` caracteres, sem materializar o texto
+    # adiado inteiro
+    def partes_texto(self, tamanho: int) -> Iterator[str]:
+        if self._texto_adiado is not None:
+            yield from self._texto_adiado.partes(tamanho)
+            return
+        for inicio in range(0, len(self.texto), tamanho):
+            yield self.texto[inicio:inicio + tamanho]
+
 
 class Movimento(BaseModel):
     dataHora: datetime
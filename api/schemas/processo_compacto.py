@@ -0,0 +1,148 @@
+import json
+import os
+from typing import Any, Iterator
+
+from api.ingestao import TextoAdiado, separar_textos
+
+
+# Projeção enxuta do Processo para o caminho rápido: um único json.loads e
+# registros com __slots__, sem conversão de datas nem objeto Pydantic por
+# documento/movimento. Só os campos lidos pelas regras (esfera, valor,
+# nomes dos documentos, descrições dos movimentos) e o número do processo
+# são conferidos; o resto é mantido como veio. Para auditoria, a validação
+# completa continua sendo `Processo.model_validate_json`.
+#
+# Decodificar os textos dos documentos é a maior parte do custo do parse.
+# Quando eles são longos (média acima de JUSCASH_PROJECAO_TEXTO_ADIADO_BYTES),
+# os valores são separados antes (api/ingestao.py) e só decodificados se
+# alguém chamar `carregar_texto()`. Com muitos textos curtos a separação em
+# Python custa mais do que economiza, e o json.loads direto é usado.
+
+BYTES_POR_TEXTO_ADIADO = int(os.getenv("JUSCASH_PROJECAO_TEXTO_ADIADO_BYTES", "4096"))
+
+
+class ErroProjecao(ValueError):
+
+    def __init__(self, local: tuple, mensagem: str):
+        super().__init__(mensagem)
+        self.local = local
+        self.mensagem = mensagem
+
+    # Mesmo formato dos erros de validação do FastAPI (422)
+    def erros(self) -> list[dict]:
+        return [{"type": "value_error", "loc": ["body", *self.local], "msg": self.mensagem}]
+
+
+class DocumentoCompacto:
+    __slots__ = ("id", "dataHoraJuntada", "nome", "texto", "_texto_adiado")
+
+    def __init__(self, id: Any, dataHoraJuntada: Any, nome: str, texto: Any, texto_adiado: Any = None):
+        self.id = id
+        self.dataHoraJuntada = dataHoraJuntada
+        self.nome = nome
+        self.texto = texto
+        self._texto_adiado = texto_adiado
+
+    def carregar_texto(self) -> str:
+        if self._texto_adiado is not None:
+            return self._texto_adiado.ler()
+        return self.texto if isinstance(self.texto, str) else ""
+
+    def partes_texto(self, tamanho: int) -> Iterator[str]:
+        if self._texto_adiado is not None:
+            yield from self._texto_adiado.partes(tamanho)
+            return
+        texto = self.carregar_texto()
+        for inicio in range(0, len(texto), tamanho):
+            yield texto[inicio:inicio + tamanho]
+
+
+class MovimentoCompacto:
+    __slots__ = ("dataHora", "descricao")
+
+    def __init__(self, dataHora: Any, descricao: str):
+        self.dataHora = dataHora
+        self.descricao = descricao
+
+
+class ProcessoCompacto:
+    __slots__ = (
+        "numeroProcesso", "classe", "orgaoJulgador", "ultimaDistribuicao", "assunto",
+        "segredoJustica", "justicaGratuita", "siglaTribunal", "esfera", "valorCondenacao",
+        "documentos", "movimentos",
+    )
+
+    def __init__(self, dados: dict, documentos: list, movimentos: list):
+        self.numeroProcesso = dados["numeroProcesso"]
+        self.classe = dados.get("classe")
+        self.orgaoJulgador = dados.get("orgaoJulgador")
+        self.ultimaDistribuicao = dados.get("ultimaDistribuicao")
+        self.assunto = dados.get("assunto")
+        self.segredoJustica = dados.get("segredoJustica")
+        self.justicaGratuita = dados.get("justicaGratuita")
+        self.siglaTribunal = dados.get("siglaTribunal")
+        self.esfera = dados["esfera"]
+        self.valorCondenacao = dados["valorCondenacao"]
+        self.documentos = documentos
+        self.movimentos = movimentos
+
+
+def _texto(dados: dict, campo: str, local: tuple) -> str:
+    valor = dados.get(campo)
+    if not isinstance(valor, str):
+        raise ErroProjecao((*local, campo), "Campo obrigatório deve ser texto.")
+    return valor
+
+
+def _lista(dados: dict, campo: str) -> list:
+    valor = dados.get(campo)
+    if not isinstance(valor, list):
+        raise ErroProjecao((campo,), "Campo obrigatório deve ser uma lista.")
+    return valor
+
+
+def projetar_processo(corpo: bytes) -> ProcessoCompacto:
+    textos = corpo.count(b'"texto"')
+    posicoes = None
+    try:
+        if textos and len(corpo) // textos >= BYTES_POR_TEXTO_ADIADO:
+            enxuto, posicoes = separar_textos(corpo)
+            dados = json.loads(enxuto)
+        else:
+            dados = json.loads(corpo)
+    except ValueError as e:
+        raise ErroProjecao((), f"JSON inválido: {e}")
+    if not isinstance(dados, dict):
+        raise ErroProjecao((), "O corpo deve ser um objeto JSON.")
+
+    _texto(dados, "numeroProcesso", ())
+    _texto(dados, "esfera", ())
+
+    valor = dados.setdefault("valorCondenacao", None)
+    if valor is not None and (isinstance(valor, bool) or not isinstance(valor, (int, float))):
+        raise ErroProjecao(("valorCondenacao",), "Valor da condenação deve ser numérico.")
+    if valor is not None:
+        dados["valorCondenacao"] = float(valor)
+
+    documentos = []
+    for i, doc in enumerate(_lista(dados, "documentos")):
+        if not isinstance(doc, dict):
+            raise ErroProjecao(("documentos", i), "Documento deve ser um objeto.")
+        texto = doc.get("texto")
+        adiado = None
+        if posicoes is not None and isinstance(texto, str) and texto.startswith("#") and texto[1:].isdigit():
+            adiado = TextoAdiado(corpo, *posicoes[int(texto[1:])])
+            texto = ""
+        documentos.append(
+            DocumentoCompacto(
+                doc.get("id"), doc.get("dataHoraJuntada"), _texto(doc, "nome", ("documentos", i)), texto, adiado
+            )
+        )
+
+    movimentos = []
+    for i, mov in enumerate(_lista(dados, "movimentos")):
+        if not isinstance(mov, dict):
+            raise ErroProjecao(("movimentos", i), "Movimento deve ser um objeto.")
+        movimentos.append(MovimentoCompacto(mov.get("dataHora"), _texto(mov, "descricao", ("movimentos", i))))
+
+    return ProcessoCompacto(dados, documentos, movimentos)
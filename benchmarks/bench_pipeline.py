@@ -0,0 +1,179 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+from benchmarks.gerador import CENARIOS, gerar_cenario
+from benchmarks.llm_falso import ServidorLLMFalso
+
+
+# Benchmark do pipeline de análise, etapa por etapa, em payloads sintéticos de
+# vários tamanhos. O endpoint completo roda contra o LLM falso local, então o
+# número medido é o custo do nosso código + a latência simulada do modelo.
+#
+#     python -m benchmarks.bench_pipeline --saida bench.json
+#     python -m benchmarks.bench_pipeline --cenarios pequeno realista --comparar bench_base.json
+#
+# Sai com código 1 se alguma etapa ficar mais lenta que a base além da tolerância.
+
+SAIDA_LLM_EXEMPLO = (
+    'Segue a decisão:\n{"decisao": "approved", "justificativa": "Requisitos atendidos (POL-1, POL-2).", '
+    '"citacoes": ["POL-1", "POL-2"]}\nFim.'
+)
+
+
+def medir(funcao, repeticoes: int, orcamento_s: float) -> dict:
+    funcao()  # aquecimento
+
+    tempos = []
+    inicio = time.perf_counter()
+    while len(tempos) < repeticoes:
+        t0 = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - t0)
+        # Cenários grandes: para no orçamento de tempo, com no mínimo 3 amostras
+        if len(tempos) >= 3 and time.perf_counter() - inicio > orcamento_s:
+            break
+
+    tempos.sort()
+    return {
+        "amostras": len(tempos),
+        "min_s": tempos[0],
+        "mediana_s": statistics.median(tempos),
+        "p95_s": tempos[min(len(tempos) - 1, int(len(tempos) * 0.95))],
+        "media_s": statistics.fmean(tempos),
+    }
+
+
+def executar(cenarios: list[str], repeticoes: int, orcamento_s: float, latencia_llm: float) -> dict:
+    # O cliente da OpenAI lê OPENAI_BASE_URL na importação do llm_client, por
+    # isso os módulos do projeto só são importados depois do LLM falso subir
+    servidor = ServidorLLMFalso(latencia=latencia_llm).iniciar()
+    os.environ["OPENAI_BASE_URL"] = servidor.url
+    os.environ.setdefault("OPENAI_API_KEY", "chave-falsa")
+    os.environ["JUSCASH_CACHE_DECISOES"] = "0"
+    os.environ.pop("N8N_WEBHOOK_URL", None)
+
+    from fastapi.testclient import TestClient
+
+    from api.app import app
+    from api.schemas.process_schema import Processo
+    from api.schemas.processo_compacto import projetar_processo
+    from verifier.llm_client import _extrair_json, construirPrompt
+    from verifier.opniaoTecnica import gerar_parecer_tecnico
+    from verifier.regras import analisar_processo
+    from verifier.selecao_trechos import selecionar_trechos
+
+    cliente = TestClient(app)
+    resultados = {}
+
+    try:
+        for nome in cenarios:
+            payload = gerar_cenario(nome)
+            corpo = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            processo = Processo.model_validate(payload)
+            parecer = gerar_parecer_tecnico(processo)
+
+            def endpoint():
+                resposta = cliente.post(
+                    "/analisar-processo",
+                    params={"curto_circuito": "false"},
+                    content=corpo,
+                    headers={"content-type": "application/json"},
+                )
+                resposta.raise_for_status()
+
+            etapas = {
+                "validacao_processo": lambda: Processo.model_validate_json(corpo),
+                "projecao_processo": lambda: projetar_processo(corpo),
+                "analisar_processo": lambda: analisar_processo(processo),
+                "gerar_parecer_tecnico": lambda: gerar_parecer_tecnico(processo),
+                "selecionar_trechos": lambda: selecionar_trechos(processo),
+                "construirPrompt": lambda: construirPrompt(parecer),
+                "_extrair_json": lambda: _extrair_json(SAIDA_LLM_EXEMPLO),
+                "endpoint_completo": endpoint,
+            }
+
+            resultados[nome] = {
+                "tamanho_payload_bytes": len(corpo),
+                "etapas": {etapa: medir(funcao, repeticoes, orcamento_s) for etapa, funcao in etapas.items()},
+            }
+            medianas_ms = {e: round(r["mediana_s"] * 1000, 3) for e, r in resultados[nome]["etapas"].items()}
+            print(f"{nome}: mediana (ms) {json.dumps(medianas_ms)}")
+    finally:
+        servidor.parar()
+
+    return resultados
+
+
+def _commit_atual() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar(atual: dict, base: dict, tolerancia: float, minimo_s: float = 0.0) -> list[str]:
+    regressoes = []
+    for cenario, dados in atual["resultados"].items():
+        etapas_base = base.get("resultados", {}).get(cenario, {}).get("etapas", {})
+        for etapa, medida in dados["etapas"].items():
+            anterior = etapas_base.get(etapa)
+            if not anterior:
+                continue
+            razao = medida["mediana_s"] / anterior["mediana_s"] if anterior["mediana_s"] else 1.0
+            marcador = ""
+            # Diferenças absolutas muito pequenas são ruído de medição
+            if razao > 1 + tolerancia and medida["mediana_s"] - anterior["mediana_s"] > minimo_s:
+                marcador = "  <-- REGRESSÃO"
+                regressoes.append(f"{cenario}/{etapa}")
+            print(f"{cenario:16} {etapa:24} {anterior['mediana_s'] * 1000:10.3f}ms -> "
+                  f"{medida['mediana_s'] * 1000:10.3f}ms  ({razao:5.2f}x){marcador}")
+    return regressoes
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_pipeline")
+    parser.add_argument("--cenarios", nargs="+", default=list(CENARIOS), choices=list(CENARIOS))
+    parser.add_argument("--repeticoes", type=int, default=20)
+    parser.add_argument("--orcamento", type=float, default=3.0, help="segundos máximos por etapa")
+    parser.add_argument("--latencia-llm", type=float, default=0.05, help="latência do LLM falso (s)")
+    parser.add_argument("--saida", default="bench_resultado.json")
+    parser.add_argument("--comparar", help="relatório JSON de base para comparação")
+    parser.add_argument("--tolerancia", type=float, default=0.2, help="piora relativa aceita (0.2 = 20%%)")
+    parser.add_argument("--minimo-ms", type=float, default=0.5, help="piora absoluta mínima para contar como regressão")
+    args = parser.parse_args(argv)
+
+    relatorio = {
+        "commit": _commit_atual(),
+        "data": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "plataforma": platform.platform(),
+        "latencia_llm_s": args.latencia_llm,
+        "resultados": executar(args.cenarios, args.repeticoes, args.orcamento, args.latencia_llm),
+    }
+
+    with open(args.saida, "w", encoding="utf-8") as f:
+        json.dump(relatorio, f, indent=2, ensure_ascii=False)
+    print(f"Relatório gravado em {args.saida}")
+
+    if args.comparar:
+        with open(args.comparar, "r", encoding="utf-8") as f:
+            base = json.load(f)
+        regressoes = comparar(relatorio, base, args.tolerancia, args.minimo_ms / 1000)
+        if regressoes:
+            print(f"Regressões acima de {args.tolerancia:.0%}: {', '.join(regressoes)}")
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
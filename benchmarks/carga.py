@@ -0,0 +1,365 @@
+import argparse
+import asyncio
+import glob
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+import httpx
+
+from benchmarks.gerador import gerar_processo
+from benchmarks.llm_falso import ServidorLLMFalso
+
+
+# Teste de carga da API: dispara /analisar-processo numa taxa alvo (fixa ou em
+# rampa), em malha aberta (as requisições saem no horário, sem esperar as
+# anteriores), e relata vazão, percentis de latência, erros e o ponto em que o
+# worker satura. Sem --url, sobe a app num uvicorn local (1 worker) apontada
+# para o LLM falso, e aí também amostra a ocupação do threadpool do Starlette.
+#
+#     python -m benchmarks.carga --rps 5 10 20 40 80 --duracao-passo 20 --latencia-llm 0.8 --taxa-429 0.02
+#     python -m benchmarks.carga --url http://localhost:8000 --rps 10 --duracao-passo 60
+#
+# Use o resultado para dimensionar réplicas: capacidade_sustentavel é a maior
+# taxa testada antes da saturação. No modo local o gerador divide o processo
+# (e o GIL) com a app; para números de dimensionamento, rode contra --url.
+
+TIMEOUT_PADRAO = 60.0
+
+
+def carregar_corpus(padrao: str, variantes: int) -> list[bytes]:
+    corpus = []
+    for caminho in sorted(glob.glob(padrao)):
+        with open(caminho, "rb") as f:
+            corpus.append(f.read())
+
+    # Variantes geradas cobrem os caminhos da decisão: LLM, atalho das regras
+    # (esfera trabalhista) e processo incompleto (sem valor de condenação)
+    perfis = [
+        {"esfera": "Federal", "valor_condenacao": 25000.0},
+        {"esfera": "Federal", "valor_condenacao": 180000.0},
+        {"esfera": "Trabalhista", "valor_condenacao": 25000.0},
+        {"esfera": "Estadual", "valor_condenacao": None},
+    ]
+    for i in range(variantes):
+        payload = gerar_processo(
+            documentos=10 + (i * 7) % 40,
+            movimentos=50 + (i * 31) % 300,
+            tamanho_texto=2_000 + (i * 997) % 20_000,
+            seed=i,
+            numero=f"{i:07d}-00.2024.4.05.8100",
+            **perfis[i % len(perfis)],
+        )
+        corpus.append(json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+
+    if not corpus:
+        raise ValueError("Corpus vazio: nenhum arquivo encontrado e nenhuma variante gerada.")
+    return corpus
+
+
+def percentil(valores: list[float], p: float) -> float | None:
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))]
+
+
+def resumir_passo(rps_alvo: float, duracao: float, amostras: list[dict], ocupacao: list[int] | None = None) -> dict:
+    latencias = [a["latencia_s"] for a in amostras if a["status"] == 200]
+    status = {}
+    for a in amostras:
+        status[str(a["status"])] = status.get(str(a["status"]), 0) + 1
+    erros = len(amostras) - len(latencias)
+
+    return {
+        "rps_alvo": rps_alvo,
+        "enviadas": len(amostras),
+        "vazao_rps": round(len(latencias) / duracao, 3) if duracao else 0.0,
+        "taxa_erro": round(erros / len(amostras), 4) if amostras else 0.0,
+        "status": status,
+        "latencia_s": {
+            "p50": percentil(latencias, 0.50),
+            "p90": percentil(latencias, 0.90),
+            "p95": percentil(latencias, 0.95),
+            "p99": percentil(latencias, 0.99),
+            "media": statistics.fmean(latencias) if latencias else None,
+        },
+        "atraso_envio_max_s": max((a["atraso_s"] for a in amostras), default=0.0),
+        "em_andamento_max": max((a["em_andamento"] for a in amostras), default=0),
+        "threadpool_ocupado_max": max(ocupacao) if ocupacao else None,
+    }
+
+
+# Primeiro passo em que o worker deixou de acompanhar a taxa alvo: erros acima
+# do limite, vazão abaixo do alvo ou p95 muito acima do p95 do primeiro passo
+def detectar_saturacao(
+    passos: list[dict],
+    fator_latencia: float = 3.0,
+    taxa_erro_max: float = 0.01,
+    vazao_min: float = 0.9,
+) -> dict | None:
+    base = next((p["latencia_s"]["p95"] for p in passos if p["latencia_s"]["p95"] is not None), None)
+
+    for passo in passos:
+        motivos = []
+        if passo["taxa_erro"] > taxa_erro_max:
+            motivos.append(f"taxa_erro={passo['taxa_erro']:.2%}")
+        if passo["vazao_rps"] < passo["rps_alvo"] * vazao_min:
+            motivos.append(f"vazao={passo['vazao_rps']:.1f}rps<{vazao_min:.0%} do alvo")
+        p95 = passo["latencia_s"]["p95"]
+        if base and p95 and p95 > base * fator_latencia:
+            motivos.append(f"p95={p95:.2f}s>{fator_latencia:g}x base")
+        if motivos:
+            return {"rps": passo["rps_alvo"], "motivos": motivos}
+    return None
+
+
+class ServidorApp:
+
+    # uvicorn com a app real, num event loop próprio em outra thread, para o
+    # gerador de carga não disputar o mesmo loop com o servidor
+    def __init__(self, porta: int = 0):
+        import uvicorn
+
+        from api.app import app
+
+        self._config = uvicorn.Config(app, host="127.0.0.1", port=porta, log_level="warning", access_log=False)
+        self._servidor = uvicorn.Server(self._config)
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        porta = self._servidor.servers[0].sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{porta}"
+
+    def iniciar(self) -> "ServidorApp":
+        def rodar():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self._servidor.serve())
+
+        self._thread = threading.Thread(target=rodar, name="uvicorn-carga", daemon=True)
+        self._thread.start()
+        while not self._servidor.started:
+            if not self._thread.is_alive():
+                raise RuntimeError("uvicorn não subiu")
+            time.sleep(0.05)
+        return self
+
+    # Tokens em uso do limitador de threads do anyio (o que as rotas síncronas
+    # usam); quando chega ao total, novas requisições esperam na fila
+    def ocupacao_threadpool(self) -> tuple[int, int] | None:
+        if self._loop is None:
+            return None
+
+        async def ler():
+            import anyio.to_thread
+
+            limitador = anyio.to_thread.current_default_thread_limiter()
+            return int(limitador.borrowed_tokens), int(limitador.total_tokens)
+
+        try:
+            return asyncio.run_coroutine_threadsafe(ler(), self._loop).result(timeout=1)
+        except Exception:
+            return None
+
+    def parar(self) -> None:
+        self._servidor.should_exit = True
+        if self._thread is not None:
+            self._thread.join(10)
+
+
+async def rodar_carga(
+    url_base: str,
+    corpus: list[bytes],
+    taxas: list[float],
+    duracao_passo: float,
+    endpoint: str = "/analisar-processo",
+    curto_circuito: bool | None = None,
+    timeout: float = TIMEOUT_PADRAO,
+    servidor: ServidorApp | None = None,
+    parar_na_saturacao: bool = True,
+) -> list[dict]:
+
+    params = {} if curto_circuito is None else {"curto_circuito": str(curto_circuito).lower()}
+    headers = {"content-type": "application/json"}
+    limites = httpx.Limits(max_connections=None, max_keepalive_connections=200)
+
+    amostras: list[dict] = []
+    ocupacao: list[tuple[float, int]] = []
+    tarefas = []
+    estado = {"em_andamento": 0}
+    janelas: list[tuple[float, float, float]] = []
+    passos: list[dict] = []
+
+    async def disparar(cliente, corpo: bytes, horario: float, passo: int):
+        estado["em_andamento"] += 1
+        enviado = time.perf_counter()
+        amostra = {"passo": passo, "atraso_s": enviado - horario, "em_andamento": estado["em_andamento"]}
+        try:
+            resposta = await cliente.post(endpoint, content=corpo, params=params, headers=headers)
+            amostra["status"] = resposta.status_code
+        except httpx.HTTPError as e:
+            amostra["status"] = type(e).__name__
+        finally:
+            estado["em_andamento"] -= 1
+        amostra["fim"] = time.perf_counter()
+        amostra["latencia_s"] = amostra["fim"] - enviado
+        amostras.append(amostra)
+
+    async def amostrar_threadpool():
+        while True:
+            leitura = await asyncio.to_thread(servidor.ocupacao_threadpool)
+            if leitura:
+                ocupacao.append((time.perf_counter(), leitura[0]))
+            await asyncio.sleep(0.2)
+
+    def fechar_passo(indice: int) -> dict:
+        rps, inicio, fim = janelas[indice]
+        do_passo = [a for a in amostras if a["passo"] == indice]
+        # Vazão = respostas 200 concluídas dentro da janela do passo, seja qual
+        # for o passo em que foram enviadas (a carga não para entre passos)
+        concluidas = sum(1 for a in amostras if a["status"] == 200 and inicio <= a["fim"] < fim)
+        passo = resumir_passo(rps, fim - inicio, do_passo, [o for t, o in ocupacao if inicio <= t < fim])
+        passo["vazao_rps"] = round(concluidas / (fim - inicio), 3)
+        return passo
+
+    amostrador = asyncio.create_task(amostrar_threadpool()) if servidor else None
+
+    async with httpx.AsyncClient(base_url=url_base, timeout=timeout, limits=limites) as cliente:
+        enviadas = 0
+        for indice, rps in enumerate(taxas):
+            inicio = time.perf_counter()
+            total = max(1, int(rps * duracao_passo))
+            for i in range(total):
+                horario = inicio + i / rps
+                espera = horario - time.perf_counter()
+                if espera > 0:
+                    await asyncio.sleep(espera)
+                corpo = corpus[enviadas % len(corpus)]
+                enviadas += 1
+                tarefas.append(asyncio.create_task(disparar(cliente, corpo, horario, indice)))
+            await asyncio.sleep(max(0.0, inicio + duracao_passo - time.perf_counter()))
+            janelas.append((rps, inicio, time.perf_counter()))
+
+            # Percentis e status do passo anterior já estão completos o
+            # bastante para decidir se vale continuar a rampa
+            if indice > 0:
+                passos.append(fechar_passo(indice - 1))
+                _imprimir(passos[-1])
+                if parar_na_saturacao and detectar_saturacao(passos):
+                    break
+
+        await asyncio.gather(*tarefas)
+        if amostrador:
+            amostrador.cancel()
+
+    if len(passos) < len(janelas):
+        passos.append(fechar_passo(len(janelas) - 1))
+        _imprimir(passos[-1])
+
+    return passos
+
+
+def _imprimir(passo: dict) -> None:
+    lat = passo["latencia_s"]
+    print(
+        f"rps={passo['rps_alvo']:g} vazao={passo['vazao_rps']:.1f} erro={passo['taxa_erro']:.1%} "
+        f"p50={_ms(lat['p50'])} p95={_ms(lat['p95'])} p99={_ms(lat['p99'])} "
+        f"em_andamento_max={passo['em_andamento_max']} threadpool_max={passo['threadpool_ocupado_max']}"
+    )
+
+
+def _ms(valor: float | None) -> str:
+    return "-" if valor is None else f"{valor * 1000:.0f}ms"
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.carga")
+    parser.add_argument("--url", help="API já em execução; sem isso sobe a app local contra o LLM falso")
+    parser.add_argument("--endpoint", default="/analisar-processo",
+                        choices=["/analisar-processo", "/analisar-processo/async"])
+    parser.add_argument("--rps", type=float, nargs="+", default=[2, 5, 10, 20, 40],
+                        help="taxas alvo, um passo por valor (um valor = carga fixa)")
+    parser.add_argument("--duracao-passo", type=float, default=15.0, help="segundos por passo")
+    parser.add_argument("--corpus", default="tests/jsons/*.json", help="glob de processos JSON")
+    parser.add_argument("--variantes", type=int, default=20, help="processos gerados além do corpus")
+    parser.add_argument("--sem-curto-circuito", action="store_true", help="força todas as análises pelo LLM")
+    parser.add_argument("--latencia-llm", type=float, default=0.8)
+    parser.add_argument("--jitter-llm", type=float, default=0.4)
+    parser.add_argument("--taxa-429", type=float, default=0.0, help="fração aleatória de 429 do LLM falso")
+    parser.add_argument("--rpm-llm", type=int, default=0, help="limite de requisições por minuto do LLM falso")
+    parser.add_argument("--timeout", type=float, default=TIMEOUT_PADRAO)
+    parser.add_argument("--continuar-apos-saturacao", action="store_true")
+    parser.add_argument("--saida", default="carga_resultado.json")
+    args = parser.parse_args(argv)
+
+    corpus = carregar_corpus(args.corpus, args.variantes)
+    llm = servidor = None
+    url = args.url
+
+    if not url:
+        llm = ServidorLLMFalso(
+            latencia=args.latencia_llm, jitter=args.jitter_llm, taxa_429=args.taxa_429, rpm=args.rpm_llm
+        ).iniciar()
+        os.environ["OPENAI_BASE_URL"] = llm.url
+        os.environ.setdefault("OPENAI_API_KEY", "chave-falsa")
+        # Sem cache: o corpus se repete e todas as requisições viram acerto
+        os.environ["JUSCASH_CACHE_DECISOES"] = "0"
+        os.environ.pop("N8N_WEBHOOK_URL", None)
+        servidor = ServidorApp().iniciar()
+        url = servidor.url
+
+    threadpool_total = None
+    try:
+        passos = asyncio.run(rodar_carga(
+            url,
+            corpus,
+            args.rps,
+            args.duracao_passo,
+            endpoint=args.endpoint,
+            curto_circuito=False if args.sem_curto_circuito else None,
+            timeout=args.timeout,
+            servidor=servidor,
+            parar_na_saturacao=not args.continuar_apos_saturacao,
+        ))
+        if servidor:
+            threadpool_total = (servidor.ocupacao_threadpool() or (None, None))[1]
+    finally:
+        if servidor:
+            servidor.parar()
+        if llm:
+            llm.parar()
+
+    saturacao = detectar_saturacao(passos)
+    sustentaveis = [p["rps_alvo"] for p in passos if saturacao is None or p["rps_alvo"] < saturacao["rps"]]
+    relatorio = {
+        "data": datetime.now(timezone.utc).isoformat(),
+        "url": args.url or "local",
+        "endpoint": args.endpoint,
+        "corpus": len(corpus),
+        "llm_falso": None if args.url else {
+            "latencia_s": args.latencia_llm, "jitter_s": args.jitter_llm, "taxa_429": args.taxa_429, "rpm": args.rpm_llm,
+            "chamadas": llm.chamadas, "respostas_429": llm.respostas_429,
+        },
+        "threadpool_total": threadpool_total,
+        "passos": passos,
+        "saturacao": saturacao,
+        "capacidade_sustentavel_rps": max(sustentaveis) if sustentaveis else None,
+    }
+
+    with open(args.saida, "w", encoding="utf-8") as f:
+        json.dump(relatorio, f, indent=2, ensure_ascii=False)
+
+    if saturacao:
+        print(f"Saturação em {saturacao['rps']:g} rps: {', '.join(saturacao['motivos'])}")
+    print(f"Capacidade sustentável: {relatorio['capacidade_sustentavel_rps']} rps | relatório em {args.saida}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
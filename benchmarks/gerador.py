@@ -0,0 +1,108 @@
+import random
+from datetime import datetime, timedelta
+
+
+# Gera payloads sintéticos de Processo (dicts prontos para JSON) em vários
+# tamanhos, com nomes/descrições parecidos com os reais e algumas palavras-chave
+# das políticas espalhadas, para que as regras tenham o que encontrar.
+
+NOMES_DOCUMENTOS = [
+    "Petição Inicial",
+    "Procuração",
+    "Sentença de Mérito",
+    "Certidão de Trânsito em Julgado",
+    "Planilha de Cálculos",
+    "Requisição (RPV)",
+    "Substabelecimento",
+    "Contrato de Honorários",
+    "Despacho",
+    "Manifestação da Parte Autora",
+]
+
+DESCRICOES_MOVIMENTOS = [
+    "Juntada de petição de manifestação",
+    "Conclusos para despacho",
+    "Iniciado cumprimento definitivo de sentença.",
+    "Intimação do ente público para pagamento.",
+    "Expedição de requisição de pequeno valor",
+    "Decorrido prazo sem manifestação",
+    "Publicação de decisão no DJe",
+]
+
+FRASES_TEXTO = [
+    "Certifico, para os devidos fins, que a sentença transitou em julgado.",
+    "A parte exequente apresentou planilha de cálculos atualizada.",
+    "Substabeleço, com reserva de poderes, os poderes que me foram conferidos.",
+    "Os honorários contratuais foram fixados em 30% do valor da condenação.",
+    "Intime-se a parte autora para manifestação no prazo de 15 dias.",
+    "O INSS foi condenado ao pagamento das parcelas vencidas e vincendas.",
+    "Expeça-se a requisição de pequeno valor em favor da parte autora.",
+]
+
+CENARIOS = {
+    "pequeno": {"documentos": 5, "movimentos": 20, "tamanho_texto": 2_000},
+    "realista": {"documentos": 40, "movimentos": 300, "tamanho_texto": 20_000},
+    "grande": {"documentos": 1_000, "movimentos": 5_000, "tamanho_texto": 20_000},
+    "extremo": {"documentos": 20_000, "movimentos": 50_000, "tamanho_texto": 500},
+    "texto_megabyte": {"documentos": 8, "movimentos": 100, "tamanho_texto": 1_000_000},
+}
+
+
+def _texto(aleatorio: random.Random, tamanho: int) -> str:
+    partes = []
+    total = 0
+    while total < tamanho:
+        frase = aleatorio.choice(FRASES_TEXTO)
+        partes.append(frase)
+        total += len(frase) + 1
+    return " ".join(partes)[:tamanho]
+
+
+def gerar_processo(
+    documentos: int,
+    movimentos: int,
+    tamanho_texto: int,
+    seed: int = 42,
+    numero: str = "0001234-56.2023.4.05.8100",
+    esfera: str = "Federal",
+    valor_condenacao: float | None = 25000.0,
+) -> dict:
+    aleatorio = random.Random(seed)
+    inicio = datetime(2020, 1, 1)
+
+    # Textos iguais se repetem bastante em dockets reais; gerar poucos e
+    # reaproveitar deixa a geração rápida mesmo nos cenários grandes
+    textos = [_texto(aleatorio, tamanho_texto) for _ in range(min(documentos, 8))]
+
+    return {
+        "numeroProcesso": numero,
+        "classe": "Cumprimento de Sentença contra a Fazenda Pública",
+        "orgaoJulgador": "19ª VARA FEDERAL - SOBRAL/CE",
+        "ultimaDistribuicao": inicio.isoformat(),
+        "assunto": "Rural (Art. 48/51)",
+        "segredoJustica": False,
+        "justicaGratuita": True,
+        "siglaTribunal": "TRF5",
+        "esfera": esfera,
+        "valorCondenacao": valor_condenacao,
+        "documentos": [
+            {
+                "id": f"DOC-{i}",
+                "dataHoraJuntada": (inicio + timedelta(hours=i)).isoformat(),
+                "nome": NOMES_DOCUMENTOS[i % len(NOMES_DOCUMENTOS)],
+                "texto": textos[i % len(textos)],
+            }
+            for i in range(documentos)
+        ],
+        "movimentos": [
+            {
+                "dataHora": (inicio + timedelta(minutes=i)).isoformat(),
+                "descricao": aleatorio.choice(DESCRICOES_MOVIMENTOS),
+            }
+            for i in range(movimentos)
+        ],
+    }
+
+
+def gerar_cenario(nome: str, seed: int = 42) -> dict:
+    return gerar_processo(seed=seed, **CENARIOS[nome])
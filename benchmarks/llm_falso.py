@@ -0,0 +1,173 @@
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# Servidor HTTP local compatível com POST /v1/chat/completions da OpenAI.
+# Responde sempre uma decisão válida, com latência configurável e, se pedido,
+# 429 (com Retry-After) de dois jeitos: uma fração aleatória das respostas
+# (taxa_429) e/ou um limite real de requisições por minuto (rpm), aplicado em
+# janelas de 1s como a API faz, com os cabeçalhos x-ratelimit-*.
+#
+# Uso em código:
+#     with ServidorLLMFalso(latencia=0.5) as servidor:
+#         os.environ["OPENAI_BASE_URL"] = servidor.url
+#
+# Uso avulso:
+#     python -m benchmarks.llm_falso --porta 8081 --latencia 0.8 --taxa-429 0.05
+
+RESPOSTA_PADRAO = {
+    "decisao": "approved",
+    "justificativa": "Processo transitado em julgado, em execução e com valor informado (POL-1, POL-2).",
+    "citacoes": ["POL-1", "POL-2"],
+}
+
+
+class ServidorLLMFalso:
+
+    def __init__(
+        self,
+        latencia: float = 0.0,
+        jitter: float = 0.0,
+        taxa_429: float = 0.0,
+        porta: int = 0,
+        retry_after: float = 1.0,
+        rpm: int = 0,
+        seed: int | None = None,
+    ):
+        self.latencia = latencia
+        self.jitter = jitter
+        self.taxa_429 = taxa_429
+        self.retry_after = retry_after
+        self.rpm = rpm
+        self._fichas = max(1.0, rpm / 60)
+        self._reposicao = time.monotonic()
+        self.chamadas = 0
+        self.respostas_429 = 0
+        self._aleatorio = random.Random(seed)
+        self._lock = threading.Lock()
+
+        servidor = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Cabeçalho e corpo saem em writes separados; sem isso o Nagle +
+            # ACK atrasado somam ~40ms a cada resposta
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                corpo = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                servidor._atender(self, corpo)
+
+            def log_message(self, *args):
+                pass
+
+        self._http = ThreadingHTTPServer(("127.0.0.1", porta), Handler)
+        self._http.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._http.server_port}/v1"
+
+    def _atender(self, handler: BaseHTTPRequestHandler, corpo: bytes) -> None:
+        with self._lock:
+            self.chamadas += 1
+            espera = self.latencia + self._aleatorio.uniform(0, self.jitter)
+            retry_after = self.retry_after if self._aleatorio.random() < self.taxa_429 else None
+            cabecalhos = {}
+
+            if self.rpm:
+                agora = time.monotonic()
+                capacidade = max(1.0, self.rpm / 60)
+                self._fichas = min(capacidade, self._fichas + (agora - self._reposicao) * self.rpm / 60)
+                self._reposicao = agora
+                if retry_after is None and self._fichas < 1:
+                    retry_after = (1 - self._fichas) * 60 / self.rpm
+                elif retry_after is None:
+                    self._fichas -= 1
+                cabecalhos = {
+                    "x-ratelimit-limit-requests": str(self.rpm),
+                    "x-ratelimit-remaining-requests": str(max(0, int(self._fichas))),
+                }
+            if retry_after is not None:
+                self.respostas_429 += 1
+
+        if retry_after is not None:
+            self._responder(handler, 429, {"error": {"message": "Rate limit", "type": "requests"}},
+                            {**cabecalhos,
+                             "retry-after": f"{retry_after:g}",
+                             "retry-after-ms": str(int(retry_after * 1000)),
+                             "x-ratelimit-remaining-requests": "0"})
+            return
+
+        time.sleep(espera)
+
+        pedido = json.loads(corpo or b"{}")
+        prompt = "".join(m.get("content", "") for m in pedido.get("messages", []))
+        tokens_prompt = max(1, len(prompt) // 4)
+        conteudo = json.dumps(RESPOSTA_PADRAO, ensure_ascii=False)
+
+        self._responder(handler, 200, {
+            "id": "chatcmpl-falso",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": pedido.get("model", "falso"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": conteudo},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": tokens_prompt,
+                "completion_tokens": len(conteudo) // 4,
+                "total_tokens": tokens_prompt + len(conteudo) // 4,
+            },
+        }, cabecalhos)
+
+    @staticmethod
+    def _responder(handler, status: int, corpo: dict, cabecalhos: dict) -> None:
+        dados = json.dumps(corpo).encode("utf-8")
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(dados)))
+        for nome, valor in cabecalhos.items():
+            handler.send_header(nome, valor)
+        handler.end_headers()
+        handler.wfile.write(dados)
+
+    def iniciar(self) -> "ServidorLLMFalso":
+        self._thread = threading.Thread(target=self._http.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def parar(self) -> None:
+        self._http.shutdown()
+        self._http.server_close()
+
+    def __enter__(self) -> "ServidorLLMFalso":
+        return self.iniciar()
+
+    def __exit__(self, *exc) -> None:
+        self.parar()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="LLM falso compatível com a API da OpenAI.")
+    parser.add_argument("--porta", type=int, default=8081)
+    parser.add_argument("--latencia", type=float, default=0.8, help="latência base em segundos")
+    parser.add_argument("--jitter", type=float, default=0.4, help="latência extra aleatória máxima")
+    parser.add_argument("--taxa-429", type=float, default=0.0, help="fração de respostas 429")
+    parser.add_argument("--rpm", type=int, default=0, help="limite de requisições por minuto (0 = sem limite)")
+    args = parser.parse_args()
+
+    servidor = ServidorLLMFalso(args.latencia, args.jitter, args.taxa_429, args.porta, rpm=args.rpm)
+    print(f"LLM falso em {servidor.url} (OPENAI_BASE_URL)")
+    servidor._http.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+import argparse
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import httpx
+
+from benchmarks.bench_pipeline import _commit_atual
+
+
+# Tempo de subida da API: quanto custa importar a app, módulo a módulo
+# (`python -X importtime`), e quanto passa entre iniciar o uvicorn e a
+# primeira resposta de /health. Cada medida roda em um processo novo, então
+# nada vem aquecido de outra rodada (o cache de bytecode sim, como em produção).
+#
+#     python -m benchmarks.tempo_inicializacao --saida inicializacao_base.json
+#     python -m benchmarks.tempo_inicializacao --comparar inicializacao_base.json
+#
+# Sai com código 1 se o import total ou a primeira requisição piorarem além
+# da tolerância.
+
+MODULO_PADRAO = "api.app"
+
+
+# Linhas do -X importtime: "import time: <self us> | <cumulativo us> | <módulo>",
+# com o nome recuado conforme a profundidade do import
+def ler_importtime(saida: str) -> dict[str, tuple[int, int]]:
+    modulos = {}
+    for linha in saida.splitlines():
+        if not linha.startswith("import time:"):
+            continue
+        campos = linha[len("import time:"):].split("|")
+        if len(campos) != 3 or not campos[0].strip().isdigit():
+            continue
+        modulos[campos[2].strip()] = (int(campos[0]), int(campos[1]))
+    return modulos
+
+
+def _ambiente() -> dict:
+    ambiente = dict(os.environ)
+    # O import não chama o LLM, mas a configuração espera uma chave
+    ambiente.setdefault("OPENAI_API_KEY", "falsa")
+    return ambiente
+
+
+def medir_imports(modulo: str, repeticoes: int) -> dict:
+    rodadas = []
+    for _ in range(repeticoes):
+        processo = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+            capture_output=True, text=True, env=_ambiente(), check=True,
+        )
+        rodadas.append(ler_importtime(processo.stderr))
+
+    # Mediana por módulo entre as rodadas
+    modulos = {}
+    for nome in rodadas[0]:
+        medidas = [rodada[nome] for rodada in rodadas if nome in rodada]
+        modulos[nome] = {
+            "proprio_ms": statistics.median(proprio for proprio, _ in medidas) / 1000,
+            "cumulativo_ms": statistics.median(cumulativo for _, cumulativo in medidas) / 1000,
+        }
+    return {"total_ms": modulos[modulo]["cumulativo_ms"], "modulos": modulos}
+
+
+def _porta_livre() -> int:
+    with socket.socket() as soquete:
+        soquete.bind(("127.0.0.1", 0))
+        return soquete.getsockname()[1]
+
+
+# Do início do processo do uvicorn até o primeiro 200 em /health
+def medir_primeira_requisicao(repeticoes: int, timeout_s: float = 30.0) -> dict:
+    tempos = []
+    for _ in range(repeticoes):
+        porta = _porta_livre()
+        inicio = time.perf_counter()
+        servidor = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "api.app:app", "--port", str(porta), "--log-level", "warning"],
+            env=_ambiente(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            while True:
+                if time.perf_counter() - inicio > timeout_s or servidor.poll() is not None:
+                    raise RuntimeError("uvicorn não respondeu a /health")
+                try:
+                    if httpx.get(f"http://127.0.0.1:{porta}/health", timeout=1.0).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    time.sleep(0.01)
+            tempos.append(time.perf_counter() - inicio)
+        finally:
+            servidor.terminate()
+            servidor.wait(timeout=timeout_s)
+
+    return {"amostras": len(tempos), "min_ms": min(tempos) * 1000, "mediana_ms": statistics.median(tempos) * 1000}
+
+
+def _imprimir(relatorio: dict, maiores: int) -> None:
+    imports = relatorio["imports"]
+    print(f"import {relatorio['modulo']}: {imports['total_ms']:.1f}ms")
+    if relatorio.get("primeira_requisicao"):
+        print(f"primeira requisição: {relatorio['primeira_requisicao']['mediana_ms']:.1f}ms")
+
+    print(f"\n{'módulo':48} {'próprio':>10} {'cumulativo':>12}")
+    ordenados = sorted(imports["modulos"].items(), key=lambda item: item[1]["cumulativo_ms"], reverse=True)
+    for nome, medida in ordenados[:maiores]:
+        print(f"{nome:48} {medida['proprio_ms']:8.1f}ms {medida['cumulativo_ms']:10.1f}ms")
+
+
+def comparar(atual: dict, base: dict, tolerancia: float, minimo_ms: float = 0.0) -> list[str]:
+    medidas = [("import", atual["imports"]["total_ms"], base.get("imports", {}).get("total_ms"))]
+    if atual.get("primeira_requisicao") and base.get("primeira_requisicao"):
+        medidas.append(
+            ("primeira_requisicao", atual["primeira_requisicao"]["mediana_ms"], base["primeira_requisicao"]["mediana_ms"])
+        )
+
+    regressoes = []
+    for nome, valor, anterior in medidas:
+        if not anterior:
+            continue
+        razao = valor / anterior
+        marcador = ""
+        if razao > 1 + tolerancia and valor - anterior > minimo_ms:
+            marcador = "  <-- REGRESSÃO"
+            regressoes.append(nome)
+        print(f"{nome:24} {anterior:10.1f}ms -> {valor:10.1f}ms  ({razao:5.2f}x){marcador}")
+    return regressoes
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.tempo_inicializacao")
+    parser.add_argument("--modulo", default=MODULO_PADRAO, help="módulo cujo import é medido")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--maiores", type=int, default=25, help="módulos mais caros exibidos")
+    parser.add_argument("--sem-requisicao", action="store_true", help="não mede a primeira requisição")
+    parser.add_argument("--saida", default="inicializacao_resultado.json")
+    parser.add_argument("--comparar", help="relatório JSON de base para comparação")
+    parser.add_argument("--tolerancia", type=float, default=0.2, help="piora relativa aceita (0.2 = 20%%)")
+    parser.add_argument("--minimo-ms", type=float, default=20.0, help="piora absoluta mínima para contar como regressão")
+    args = parser.parse_args(argv)
+
+    relatorio = {
+        "commit": _commit_atual(),
+        "data": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "plataforma": platform.platform(),
+        "modulo": args.modulo,
+        "imports": medir_imports(args.modulo, args.repeticoes),
+        "primeira_requisicao": None if args.sem_requisicao else medir_primeira_requisicao(args.repeticoes),
+    }
+    _imprimir(relatorio, args.maiores)
+
+    with open(args.saida, "w", encoding="utf-8") as f:
+        json.dump(relatorio, f, indent=2, ensure_ascii=False)
+    print(f"\nRelatório gravado em {args.saida}")
+
+    if args.comparar:
+        with open(args.comparar, "r", encoding="utf-8") as f:
+            base = json.load(f)
+        regressoes = comparar(relatorio, base, args.tolerancia, args.minimo_ms)
+        if regressoes:
+            print(f"Regressões acima de {args.tolerancia:.0%}: {', '.join(regressoes)}")
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,310 @@
+import glob
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+# Métricas em memória, exportadas no formato texto do Prometheus (GET /metrics).
+# Implementação mínima, sem dependência externa: contadores e histogramas com labels.
+
+BUCKETS_PADRAO = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escapar(valor: str) -> str:
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _formatar_labels(nomes: tuple[str, ...], valores: tuple[str, ...], extra: str = "") -> str:
+    partes = [f'{n}="{_escapar(v)}"' for n, v in zip(nomes, valores)]
+    if extra:
+        partes.append(extra)
+    return "{" + ",".join(partes) + "}" if partes else ""
+
+
+def _formatar_numero(valor: float) -> str:
+    if valor == float("inf"):
+        return "+Inf"
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class Contador:
+
+    def __init__(self, nome: str, descricao: str, labels: tuple[str, ...] = ()):
+        self.nome = nome
+        self.descricao = descricao
+        self.labels = tuple(labels)
+        self._valores: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, valor: float = 1, **labels) -> None:
+        chave = tuple(str(labels.get(n, "")) for n in self.labels)
+        with self._lock:
+            self._valores[chave] = self._valores.get(chave, 0) + valor
+
+    def valor(self, **labels) -> float:
+        chave = tuple(str(labels.get(n, "")) for n in self.labels)
+        with self._lock:
+            return self._valores.get(chave, 0)
+
+    # Valores em forma serializável (JSON), para somar com outros processos
+    def instantaneo(self) -> list:
+        with self._lock:
+            return [[list(chave), valor] for chave, valor in self._valores.items()]
+
+    # `outros`: instantâneos da mesma métrica em outros processos, somados aos daqui
+    def exportar(self, outros: list[list] = ()) -> list[str]:
+        with self._lock:
+            valores = dict(self._valores)
+        for instantaneo in outros:
+            for chave, valor in instantaneo:
+                chave = tuple(chave)
+                valores[chave] = valores.get(chave, 0) + valor
+
+        linhas = [f"# HELP {self.nome} {self.descricao}", f"# TYPE {self.nome} counter"]
+        for chave, valor in sorted(valores.items()):
+            linhas.append(f"{self.nome}{_formatar_labels(self.labels, chave)} {_formatar_numero(valor)}")
+        return linhas
+
+
+class Histograma:
+
+    def __init__(
+        self,
+        nome: str,
+        descricao: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = BUCKETS_PADRAO,
+    ):
+        self.nome = nome
+        self.descricao = descricao
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # chave -> [contagens por bucket (não acumuladas), soma, total]
+        self._series: dict[tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observar(self, valor: float, **labels) -> None:
+        chave = tuple(str(labels.get(n, "")) for n in self.labels)
+        indice = next(i for i, limite in enumerate(self.buckets) if valor <= limite)
+        with self._lock:
+            serie = self._series.get(chave)
+            if serie is None:
+                serie = self._series[chave] = [[0] * len(self.buckets), 0.0, 0]
+            serie[0][indice] += 1
+            serie[1] += valor
+            serie[2] += 1
+
+    def contagem(self, **labels) -> int:
+        chave = tuple(str(labels.get(n, "")) for n in self.labels)
+        with self._lock:
+            serie = self._series.get(chave)
+            return serie[2] if serie else 0
+
+    @contextmanager
+    def cronometrar(self, **labels):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(time.perf_counter() - inicio, **labels)
+
+    def instantaneo(self) -> list:
+        with self._lock:
+            return [[list(chave), [list(serie[0]), serie[1], serie[2]]] for chave, serie in self._series.items()]
+
+    def exportar(self, outros: list[list] = ()) -> list[str]:
+        with self._lock:
+            series = {chave: [list(serie[0]), serie[1], serie[2]] for chave, serie in self._series.items()}
+        for instantaneo in outros:
+            for chave, (contagens, soma, total) in instantaneo:
+                # Buckets diferentes (outra versão do código): não dá para somar
+                if len(contagens) != len(self.buckets):
+                    continue
+                serie = series.setdefault(tuple(chave), [[0] * len(self.buckets), 0.0, 0])
+                serie[0] = [a + b for a, b in zip(serie[0], contagens)]
+                serie[1] += soma
+                serie[2] += total
+
+        linhas = [f"# HELP {self.nome} {self.descricao}", f"# TYPE {self.nome} histogram"]
+        for chave, (contagens, soma, total) in sorted(series.items()):
+            acumulado = 0
+            for limite, contagem in zip(self.buckets, contagens):
+                acumulado += contagem
+                le = f'le="{_formatar_numero(limite)}"'
+                linhas.append(
+                    f"{self.nome}_bucket{_formatar_labels(self.labels, chave, le)} {acumulado}"
+                )
+            rotulos = _formatar_labels(self.labels, chave)
+            linhas.append(f"{self.nome}_sum{rotulos} {_formatar_numero(soma)}")
+            linhas.append(f"{self.nome}_count{rotulos} {total}")
+        return linhas
+
+
+class RegistroMetricas:
+
+    def __init__(self):
+        self._metricas: dict[str, Contador | Histograma] = {}
+
+    def contador(self, nome: str, descricao: str, labels: tuple[str, ...] = ()) -> Contador:
+        return self._metricas.setdefault(nome, Contador(nome, descricao, labels))
+
+    def histograma(self, nome: str, descricao: str, labels: tuple[str, ...] = (), **kwargs) -> Histograma:
+        return self._metricas.setdefault(nome, Histograma(nome, descricao, labels, **kwargs))
+
+    def instantaneo(self) -> dict[str, list]:
+        return {nome: metrica.instantaneo() for nome, metrica in self._metricas.items()}
+
+    # `outros`: instantâneos do registro inteiro em outros processos
+    def exportar(self, outros: list[dict] = ()) -> str:
+        linhas = []
+        for nome, metrica in self._metricas.items():
+            linhas.extend(metrica.exportar([instantaneo.get(nome, []) for instantaneo in outros]))
+        return "\n".join(linhas) + "\n"
+
+
+# Com vários workers (serve.py) cada processo tem o seu registro, e o
+# /metrics de um só mostraria a parte dele. Cada worker grava o próprio
+# instantâneo em <diretorio>/<pid>.json a cada `intervalo` segundos e no
+# encerramento; a exportação soma o registro local (ao vivo) com os arquivos
+# dos outros. O arquivo de um worker que morreu fica: os contadores do
+# container não voltam atrás quando ele é recriado
+class MetricasCompartilhadas:
+
+    def __init__(self, registro: RegistroMetricas, diretorio: str, intervalo: float = 1.0):
+        self.registro = registro
+        self.diretorio = diretorio
+        self.intervalo = intervalo
+        self._parar = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    # O pid é lido na hora: o singleton pode ter sido criado antes do fork
+    def _arquivo(self, pid: int | None = None) -> str:
+        return os.path.join(self.diretorio, f"{pid or os.getpid()}.json")
+
+    def iniciar(self) -> None:
+        os.makedirs(self.diretorio, exist_ok=True)
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._laco, name="metricas-compartilhadas", daemon=True)
+        self._thread.start()
+
+    def _laco(self) -> None:
+        while not self._parar.wait(self.intervalo):
+            self.gravar()
+
+    def gravar(self) -> None:
+        arquivo = self._arquivo()
+        temporario = f"{arquivo}.tmp"
+        try:
+            with open(temporario, "w", encoding="utf-8") as f:
+                json.dump(self.registro.instantaneo(), f)
+            os.replace(temporario, arquivo)
+        except OSError:
+            pass
+
+    def outros(self) -> list[dict]:
+        proprio = self._arquivo()
+        instantaneos = []
+        for arquivo in glob.glob(os.path.join(self.diretorio, "*.json")):
+            if arquivo == proprio:
+                continue
+            try:
+                with open(arquivo, "r", encoding="utf-8") as f:
+                    instantaneos.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return instantaneos
+
+    def exportar(self) -> str:
+        return self.registro.exportar(self.outros())
+
+    def encerrar(self) -> None:
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.gravar()
+
+
+# Instantâneos de uma execução anterior do supervisor não entram na soma
+def limpar_metricas_compartilhadas(diretorio: str) -> None:
+    for arquivo in glob.glob(os.path.join(diretorio, "*.json")):
+        try:
+            os.remove(arquivo)
+        except OSError:
+            pass
+
+
+registro_metricas = RegistroMetricas()
+
+# Desligado por padrão: serve.py aponta JUSCASH_METRICAS_DIR para um
+# diretório compartilhado pelos workers
+_diretorio_metricas = os.getenv("JUSCASH_METRICAS_DIR")
+metricas_compartilhadas = (
+    MetricasCompartilhadas(registro_metricas, _diretorio_metricas) if _diretorio_metricas else None
+)
+
+# Latência por etapa do pipeline: evidencias, regras, pool_cpu, trechos, prompt, fila_llm, llm, extracao_json, validacao, entrada, webhook
+LATENCIA_ETAPA = registro_metricas.histograma(
+    "juscash_etapa_duracao_segundos",
+    "Duração de cada etapa da análise, em segundos.",
+    ("etapa",),
+)
+
+LATENCIA_REQUISICAO = registro_metricas.histograma(
+    "juscash_requisicao_duracao_segundos",
+    "Duração total da análise por endpoint, em segundos.",
+    ("endpoint",),
+)
+
+DECISOES = registro_metricas.contador(
+    "juscash_decisoes_total",
+    "Decisões emitidas, por resultado, caminho, versão de prompt e modelo.",
+    ("decisao", "caminho", "versao_prompt", "modelo"),
+)
+
+ERROS_LLM = registro_metricas.contador(
+    "juscash_erros_llm_total",
+    "Erros na obtenção da decisão do LLM, por causa.",
+    ("causa",),
+)
+
+RETENTATIVAS_LLM = registro_metricas.contador(
+    "juscash_llm_retentativas_total",
+    "Chamadas ao LLM repetidas após erro transitório, por causa.",
+    ("causa",),
+)
+
+# Tokens estimados (~4 caracteres por token) dos prompts enviados ao LLM
+TOKENS_PROMPT = registro_metricas.contador(
+    "juscash_prompt_tokens_total",
+    "Tokens estimados dos prompts enviados ao LLM, por versão de prompt.",
+    ("versao_prompt",),
+)
+
+TOKENS_ECONOMIZADOS = registro_metricas.contador(
+    "juscash_prompt_tokens_economizados_total",
+    "Tokens estimados poupados pela serialização compacta do parecer, por versão de prompt.",
+    ("versao_prompt",),
+)
+
+JSON_REPARADO = registro_metricas.contador(
+    "juscash_llm_json_reparado_total",
+    "Respostas do LLM com JSON malformado recuperadas localmente, por técnica de reparo.",
+    ("tecnica",),
+)
+
+ROTEAMENTO_LLM = registro_metricas.contador(
+    "juscash_llm_roteamento_total",
+    "Eventos do roteador de modelos (hedge, hedge_venceu, desvio, disjuntor_aberto), por modelo.",
+    ("evento", "modelo"),
+)
+
+# Análise incremental: "delta" (só itens novos varridos), "completa" (estado
+# ausente ou histórico alterado) e "reaproveitada" (parecer igual, sem LLM)
+ANALISE_INCREMENTAL = registro_metricas.contador(
+    "juscash_analise_incremental_total",
+    "Análises no modo incremental, por tipo de varredura ou reaproveitamento.",
+    ("evento",),
+)
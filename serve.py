@@ -0,0 +1,196 @@
+import gc
+import importlib
+import os
+import signal
+import socket
+import sys
+import tempfile
+import time
+
+import uvicorn
+
+from config.logger import obter_log
+
+
+logger = obter_log("serve")
+
+
+# Modo de produção: um processo supervisor abre o socket, carrega o que é
+# só leitura e cria N workers por fork, todos aceitando conexões no mesmo
+# socket. (`run.py` continua sendo o modo de desenvolvimento, com reload.)
+# - Antes do fork são carregados os registros de prompts e políticas e os
+#   módulos pesados, e o gc é congelado: os workers compartilham essas
+#   páginas copy-on-write em vez de cada um ter a sua cópia.
+# - Nada que abra conexão, arquivo ou thread (cache em SQLite, armazém,
+#   cliente do LLM, pool de CPU) é importado antes do fork: cada worker
+#   importa `api.app` e cria os seus.
+# - O cache de decisões ganha, se não configurado, uma camada SQLite local
+#   compartilhada pelos workers. Os orçamentos do LLM (RPM/TPM) valem por
+#   processo e são divididos entre os workers.
+# - Cada worker publica as próprias métricas num diretório compartilhado
+#   (JUSCASH_METRICAS_DIR) e o /metrics de qualquer um soma as de todos.
+# - SIGTERM/SIGINT: o supervisor repassa aos workers, que param de aceitar
+#   conexões e esperam as requisições em andamento (inclusive chamadas ao
+#   LLM) por até JUSCASH_DRENAGEM_S segundos; depois rodam o encerramento
+#   da API (fila de notificações, pool de CPU). Quem passar do prazo leva
+#   SIGKILL. Worker que morre fora do encerramento é recriado.
+
+HOST = os.getenv("HOST", "0.0.0.0")
+PORTA = int(os.getenv("PORT", "8000"))
+DRENAGEM_S = int(os.getenv("JUSCASH_DRENAGEM_S", "30"))
+
+# Importados no supervisor: só leitura depois de carregados
+MODULOS_PRECARREGADOS = (
+    "fastapi",
+    "openai",
+    "api.schemas.process_schema",
+    "api.schemas.processo_compacto",
+    "api.ingestao",
+    "verifier.registro_prompts",
+    "verifier.regras",
+    "verifier.opniaoTecnica",
+)
+
+# Orçamentos do agendador do LLM, por processo
+_ORCAMENTOS_LLM = ("JUSCASH_LLM_RPM", "JUSCASH_LLM_TPM")
+
+
+# Núcleos disponíveis para este processo (respeita affinity/cpuset)
+def numero_trabalhadores() -> int:
+    configurado = int(os.getenv("JUSCASH_WORKERS", "0"))
+    if configurado > 0:
+        return configurado
+    try:
+        return max(1, len(os.sched_getaffinity(0)))
+    except AttributeError:
+        return max(1, os.cpu_count() or 1)
+
+
+# Ambiente dos workers; precisa ser ajustado antes de qualquer import que
+# leia essas variáveis (os singletons são criados no import)
+def preparar_ambiente(trabalhadores: int, ambiente=os.environ) -> None:
+    ambiente.setdefault(
+        "JUSCASH_CACHE_SQLITE", os.path.join(tempfile.gettempdir(), "juscash_cache_decisoes.db")
+    )
+    ambiente.setdefault("JUSCASH_METRICAS_DIR", os.path.join(tempfile.gettempdir(), "juscash_metricas"))
+    for variavel in _ORCAMENTOS_LLM:
+        valor = float(ambiente.get(variavel, "0") or 0)
+        if valor > 0:
+            ambiente[variavel] = str(valor / trabalhadores)
+
+
+def precarregar() -> None:
+    inicio = time.perf_counter()
+    for modulo in MODULOS_PRECARREGADOS:
+        try:
+            importlib.import_module(modulo)
+        except ImportError as e:
+            logger.warning(f"Módulo não pré-carregado | modulo={modulo} | erro={e}")
+
+    from verifier.registro_prompts import registro_prompts
+    from verifier.regras import registro_politicas
+    from verifier import selecao_trechos
+
+    registro_prompts.obter()
+    registro_politicas.obter()
+    # NumPy e o índice das perguntas do BM25 só com a seleção de trechos ligada
+    if selecao_trechos.SELECAO_HABILITADA:
+        selecao_trechos.indice_perguntas()
+
+    # Objetos já criados saem das gerações do gc: as coletas nos workers não
+    # escrevem nessas páginas e o compartilhamento copy-on-write se mantém
+    gc.collect()
+    gc.freeze()
+    logger.info(f"Pré-carregamento concluído | tempo={time.perf_counter() - inicio:.2f}s")
+
+
+def _executar_worker(soquete: socket.socket, indice: int) -> None:
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+
+    config = uvicorn.Config("api.app:app", lifespan="on", timeout_graceful_shutdown=DRENAGEM_S)
+    logger.info(f"Worker iniciado | indice={indice} | pid={os.getpid()}")
+    uvicorn.Server(config).run(sockets=[soquete])
+
+
+class Supervisor:
+
+    def __init__(self, soquete: socket.socket, trabalhadores: int, drenagem_s: float = DRENAGEM_S):
+        self.soquete = soquete
+        self.trabalhadores = trabalhadores
+        self.drenagem_s = drenagem_s
+        self.filhos: dict[int, int] = {}
+        self.encerrando = False
+
+    def _criar(self, indice: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            codigo = 0
+            try:
+                _executar_worker(self.soquete, indice)
+            except BaseException:
+                logger.exception(f"Worker falhou | indice={indice}")
+                codigo = 1
+            finally:
+                os._exit(codigo)
+        self.filhos[pid] = indice
+
+    def _sinal(self, numero, _quadro) -> None:
+        if not self.encerrando:
+            logger.info(f"Encerrando, drenando requisições | sinal={signal.Signals(numero).name}")
+        self.encerrando = True
+        for pid in list(self.filhos):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def executar(self) -> int:
+        signal.signal(signal.SIGTERM, self._sinal)
+        signal.signal(signal.SIGINT, self._sinal)
+        for indice in range(self.trabalhadores):
+            self._criar(indice)
+
+        prazo = None
+        while self.filhos:
+            if self.encerrando and prazo is None:
+                # Folga para o encerramento da API depois da drenagem
+                prazo = time.monotonic() + self.drenagem_s + 10
+            if prazo is not None and time.monotonic() > prazo:
+                for pid in list(self.filhos):
+                    logger.warning(f"Worker não encerrou no prazo, SIGKILL | pid={pid}")
+                    os.kill(pid, signal.SIGKILL)
+                prazo = float("inf")
+
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                time.sleep(0.2)
+                continue
+            indice = self.filhos.pop(pid, None)
+            if indice is None or self.encerrando:
+                continue
+            logger.warning(f"Worker morreu, recriando | indice={indice} | pid={pid} | status={status}")
+            time.sleep(1)
+            self._criar(indice)
+
+        logger.info("Todos os workers encerrados")
+        return 0
+
+
+def main() -> int:
+    trabalhadores = numero_trabalhadores()
+    preparar_ambiente(trabalhadores)
+
+    from config.metricas import limpar_metricas_compartilhadas
+
+    limpar_metricas_compartilhadas(os.environ["JUSCASH_METRICAS_DIR"])
+
+    soquete = socket.create_server((HOST, PORTA), backlog=2048)
+    logger.info(f"Servindo | endereco={HOST}:{PORTA} | workers={trabalhadores} | drenagem={DRENAGEM_S}s")
+
+    precarregar()
+    return Supervisor(soquete, trabalhadores).executar()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
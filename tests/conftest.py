@@ -6,3 +6,16 @@ ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 if ROOT_DIR not in sys.path:
     sys.path.insert(0, ROOT_DIR)
+
+
+import pytest
+
+
+# Cada teste começa com o cache de decisões vazio, para que um teste não
+# receba a decisão (simulada) guardada por outro
+@pytest.fixture(autouse=True)
+def limpar_cache_decisoes():
+    from verifier.cache_decisoes import cache_decisoes
+
+    cache_decisoes.limpar()
+    yield
@@ -0,0 +1,98 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from openai import OpenAI
+
+from benchmarks.llm_falso import ServidorLLMFalso
+from verifier import llm_client
+from verifier.agendador_llm import AgendadorLLM, TempoEsgotadoFila, estimar_tokens
+
+
+def test_fila_respeita_limite_de_concorrencia_e_ordem():
+    agendador = AgendadorLLM(concorrencia_max=1)
+    primeira = agendador.adquirir(10)
+    ordem = []
+
+    def esperar(nome):
+        ficha = agendador.adquirir(10)
+        ordem.append(nome)
+        agendador.concluir(ficha)
+
+    threads = []
+    for nome in ("a", "b", "c"):
+        thread = threading.Thread(target=esperar, args=(nome,))
+        thread.start()
+        threads.append(thread)
+        time.sleep(0.05)
+
+    assert ordem == []
+    assert agendador.estatisticas()["na_fila"] == 3
+
+    agendador.concluir(primeira)
+    for thread in threads:
+        thread.join(2)
+
+    assert ordem == ["a", "b", "c"]
+
+
+def test_orcamento_de_requisicoes_espaca_as_chamadas():
+    # 600 RPM = 10/s, rajada de 1s: as 10 primeiras saem juntas, as demais a cada 0,1s
+    agendador = AgendadorLLM(rpm=600, margem=1.0)
+    inicio = time.monotonic()
+    for _ in range(13):
+        agendador.concluir(agendador.adquirir(1))
+
+    assert time.monotonic() - inicio >= 0.25
+
+
+def test_aimd_reduz_na_limitacao_e_cresce_no_sucesso():
+    agendador = AgendadorLLM(concorrencia_max=16)
+
+    agendador.concluir(agendador.adquirir(1), limitada=True, cabecalhos={"retry-after-ms": "50"})
+    assert agendador.limite_concorrencia == 8
+
+    for _ in range(8):
+        agendador.concluir(agendador.adquirir(1))
+    assert 8.9 < agendador.limite_concorrencia < 9.1
+
+
+def test_limites_da_conta_aprendidos_dos_cabecalhos():
+    agendador = AgendadorLLM(margem=0.9)
+    agendador.concluir(
+        agendador.adquirir(1),
+        cabecalhos={"x-ratelimit-limit-requests": "500", "x-ratelimit-limit-tokens": "200000"},
+    )
+
+    estatisticas = agendador.estatisticas()
+    assert estatisticas["rpm"] == 450
+    assert estatisticas["tpm"] == 180000
+
+
+def test_espera_na_fila_tem_limite():
+    agendador = AgendadorLLM(concorrencia_max=1, espera_max=0.1)
+    agendador.adquirir(1)
+
+    with pytest.raises(TempoEsgotadoFila):
+        asyncio.run(agendador.adquirir_async(1))
+    assert agendador.estatisticas()["na_fila"] == 0
+
+
+def test_estimar_tokens():
+    assert estimar_tokens("a" * 400) == 100
+    assert estimar_tokens("") == 1
+
+
+def test_chamar_llm_retenta_respostas_429(monkeypatch):
+    agendador = AgendadorLLM(tentativas=10, backoff_base=0.01)
+    monkeypatch.setattr(llm_client, "agendador_llm", agendador)
+
+    with ServidorLLMFalso(taxa_429=0.5, retry_after=0.01, seed=7) as servidor:
+        monkeypatch.setattr(llm_client, "client", OpenAI(api_key="falsa", base_url=servidor.url, max_retries=0))
+        respostas = [llm_client.chamar_llm("prompt") for _ in range(5)]
+
+    assert all('"decisao"' in r for r in respostas)
+    assert servidor.respostas_429 > 0
+    assert agendador.limitadas == servidor.respostas_429
+    assert agendador.estatisticas()["em_voo"] == 0
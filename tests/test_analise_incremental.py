@@ -0,0 +1,151 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from api.app import app
+from api.schemas.process_schema import Processo, ResultadoDecisao
+from api.schemas.processo_compacto import projetar_processo
+from verifier.analise_incremental import EstadosIncrementais, varrer_incremental
+from verifier.registro_prompts import registro_prompts
+from verifier.regras import registro_politicas
+
+
+def _dados(movimentos: list[tuple[str, str]], documentos: list[tuple[str, str]] | None = None) -> dict:
+    documentos = documentos or [("2024-01-01T10:00:00", "Petição Inicial")]
+    return {
+        "numeroProcesso": "0009999-99.2024.4.05.0000",
+        "classe": "Cumprimento de Sentença",
+        "orgaoJulgador": "1ª Vara Federal",
+        "ultimaDistribuicao": "2024-01-01T00:00:00",
+        "assunto": "Cobrança",
+        "segredoJustica": False,
+        "justicaGratuita": True,
+        "siglaTribunal": "TRF5",
+        "esfera": "Federal",
+        "valorCondenacao": 25000.0,
+        "documentos": [
+            {"id": str(i), "dataHoraJuntada": data, "nome": nome, "texto": "..."}
+            for i, (data, nome) in enumerate(documentos)
+        ],
+        "movimentos": [{"dataHora": data, "descricao": descricao} for data, descricao in movimentos],
+    }
+
+
+MOVIMENTOS = [("2024-02-01T10:00:00", "Conclusos para despacho")]
+
+
+def test_delta_da_o_mesmo_resultado_da_varredura_completa():
+    politicas = registro_politicas.obter()
+    estado = EstadosIncrementais().analisar(Processo.model_validate(_dados(MOVIMENTOS)))[2]
+
+    novo = Processo.model_validate(
+        _dados(MOVIMENTOS + [("2024-03-01T10:00:00", "Iniciado cumprimento definitivo de sentença.")])
+    )
+    hits, _, novos = varrer_incremental(novo, politicas, estado)
+
+    assert [indice for indice, _ in novos["movimentos"]] == [1]
+    assert hits == politicas.varrer(novo)
+
+
+def test_item_retroativo_ou_removido_forca_varredura_completa():
+    politicas = registro_politicas.obter()
+    estado = EstadosIncrementais().analisar(Processo.model_validate(_dados(MOVIMENTOS)))[2]
+
+    retroativo = Processo.model_validate(_dados([("2024-01-15T10:00:00", "Juntada")] + MOVIMENTOS))
+    assert varrer_incremental(retroativo, politicas, estado)[2] is None
+
+    removido = Processo.model_validate(_dados([]))
+    assert varrer_incremental(removido, politicas, estado)[2] is None
+
+    # Datas em texto (projeção rápida) contra datetime: sem comparação possível
+    compacto = projetar_processo(json.dumps(_dados(MOVIMENTOS)).encode())
+    assert varrer_incremental(compacto, politicas, estado)[2] is None
+
+
+def test_reaproveita_decisao_quando_parecer_nao_muda():
+    estados = EstadosIncrementais()
+    numero = "0009999-99.2024.4.05.0000"
+    decisao = ResultadoDecisao(decisao="incomplete", justificativa="", citacoes=[])
+
+    _, reaproveitada, estado = estados.analisar(Processo.model_validate(_dados(MOVIMENTOS)))
+    assert reaproveitada is None
+    estados.confirmar(numero, estado, decisao)
+
+    irrelevante = MOVIMENTOS + [("2024-02-02T10:00:00", "Decorrido prazo sem manifestação")]
+    _, reaproveitada, estado = estados.analisar(Processo.model_validate(_dados(irrelevante)))
+    assert reaproveitada == decisao
+    estados.confirmar(numero, estado, decisao)
+
+    relevante = irrelevante + [("2024-03-01T10:00:00", "Iniciado cumprimento definitivo de sentença.")]
+    parecer, reaproveitada, _ = estados.analisar(Processo.model_validate(_dados(relevante)))
+    assert reaproveitada is None
+    assert parecer.analise.em_fase_execucao is True
+
+
+def test_nao_reaproveita_decisao_de_outras_condicoes(monkeypatch):
+    estados = EstadosIncrementais()
+    numero = "0009999-99.2024.4.05.0000"
+    decisao = ResultadoDecisao(decisao="rejected", justificativa="", citacoes=["POL-4"])
+
+    _, _, estado = estados.analisar(Processo.model_validate(_dados(MOVIMENTOS)), curto_circuito=True)
+    estados.confirmar(numero, estado, decisao, "regras")
+
+    # Decisão das regras não vai para quem desligou o atalho
+    _, reaproveitada, _ = estados.analisar(Processo.model_validate(_dados(MOVIMENTOS)))
+    assert reaproveitada is None
+
+    _, reaproveitada, estado = estados.analisar(Processo.model_validate(_dados(MOVIMENTOS)), curto_circuito=True)
+    assert reaproveitada == decisao
+    estados.confirmar(numero, estado, decisao, "incremental")
+    assert estados.obter(numero).caminho == "regras"
+
+    monkeypatch.setattr(registro_prompts, "versao_ativa", "outra")
+    _, reaproveitada, _ = estados.analisar(Processo.model_validate(_dados(MOVIMENTOS)), curto_circuito=True)
+    assert reaproveitada is None
+
+
+def test_api_incremental_so_chama_llm_quando_parecer_muda(monkeypatch):
+    monkeypatch.setattr("api.app.estados_incrementais", EstadosIncrementais())
+    chamadas = []
+
+    def falsa_analise_com_llm(parecer):
+        chamadas.append(parecer)
+        return ResultadoDecisao(decisao="incomplete", justificativa="ok", citacoes=["POL-8"])
+
+    monkeypatch.setattr("api.app.analisar_com_llm", falsa_analise_com_llm)
+    cliente = TestClient(app)
+    params = {"curto_circuito": False}
+
+    cliente.post("/analisar-processo", json=_dados(MOVIMENTOS), params=params)
+    movimentos = MOVIMENTOS + [("2024-02-02T10:00:00", "Publicação de decisão no DJe")]
+    resp = cliente.post("/analisar-processo", json=_dados(movimentos), params=params)
+    assert resp.json()["decisao"] == "incomplete"
+    assert len(chamadas) == 1
+
+    documentos = [
+        ("2024-01-01T10:00:00", "Petição Inicial"),
+        ("2024-02-03T10:00:00", "Certidão de Trânsito em Julgado"),
+    ]
+    cliente.post("/analisar-processo", json=_dados(movimentos, documentos), params=params)
+    assert len(chamadas) == 2
+
+
+def test_api_incremental_nao_devolve_decisao_do_atalho_a_quem_o_desligou(monkeypatch):
+    monkeypatch.setattr("api.app.estados_incrementais", EstadosIncrementais())
+    chamadas = []
+
+    def falsa_analise_com_llm(parecer):
+        chamadas.append(parecer)
+        return ResultadoDecisao(decisao="approved", justificativa="ok", citacoes=["POL-1"])
+
+    monkeypatch.setattr("api.app.analisar_com_llm", falsa_analise_com_llm)
+    cliente = TestClient(app)
+    dados = {**_dados(MOVIMENTOS), "esfera": "Trabalhista"}
+
+    resp = cliente.post("/analisar-processo", json=dados, params={"curto_circuito": True})
+    assert resp.json()["decisao"] == "rejected"
+    assert chamadas == []
+
+    resp = cliente.post("/analisar-processo", json=dados, params={"curto_circuito": False})
+    assert resp.json()["decisao"] == "approved"
+    assert len(chamadas) == 1
@@ -1,8 +1,11 @@
+import asyncio
+import json
 from fastapi.testclient import TestClient
 import pytest
 
 from api.app import app
 from api.schemas.process_schema import Processo, Documento, Movimento, ResultadoDecisao
+from api.schemas.processo_compacto import projetar_processo
 
 
 @pytest.fixture
@@ -63,3 +66,143 @@ def test_analisar_processo_sucesso(api_client: TestClient, payload_processo, mon
     body = resp.json()
     assert body["decisao"] == "approved"
     assert "POL-1" in body["citacoes"]
+
+
+def test_analisar_processos_lote_erro_por_item(api_client: TestClient, payload_processo, monkeypatch):
+    async def falsa_analise_com_llm(parecer):
+        return ResultadoDecisao(
+            decisao="approved",
+            justificativa="Processo elegível.",
+            citacoes=["POL-1"],
+        )
+
+    monkeypatch.setattr("api.app.analisar_com_llm_async", falsa_analise_com_llm)
+
+    invalido = {"numeroProcesso": "999"}
+    resp = api_client.post("/analisar-processos/lote", json=[payload_processo, invalido])
+
+    assert resp.status_code == 200
+    linhas = [json.loads(l) for l in resp.text.splitlines() if l]
+    por_numero = {l["numeroProcesso"]: l for l in linhas}
+
+    assert por_numero[payload_processo["numeroProcesso"]]["status"] == "success"
+    assert por_numero[payload_processo["numeroProcesso"]]["decisao"]["decisao"] == "approved"
+    assert por_numero["999"]["status"] == "error"
+
+
+def test_analisar_processos_lote_ndjson(api_client: TestClient, payload_processo, monkeypatch):
+    async def falsa_analise_com_llm(parecer):
+        return ResultadoDecisao(decisao="rejected", justificativa="x", citacoes=[])
+
+    monkeypatch.setattr("api.app.analisar_com_llm_async", falsa_analise_com_llm)
+
+    corpo = json.dumps(payload_processo) + "\n" + "{não é json}\n"
+    resp = api_client.post(
+        "/analisar-processos/lote",
+        content=corpo.encode("utf-8"),
+        headers={"content-type": "application/x-ndjson"},
+    )
+
+    linhas = [json.loads(l) for l in resp.text.splitlines() if l]
+    assert sorted(l["status"] for l in linhas) == ["error", "success"]
+
+
+def test_analisar_processos_lote_limita_itens_em_andamento(api_client: TestClient, monkeypatch):
+    em_andamento = []
+    maximo = 0
+
+    async def falso_analisar_registro(item, semaforo, curto_circuito=None, analisar=None):
+        nonlocal maximo
+        em_andamento.append(item)
+        maximo = max(maximo, len(em_andamento))
+        await asyncio.sleep(0.001)
+        em_andamento.remove(item)
+        return {"numeroProcesso": item["numeroProcesso"], "status": "success", "decisao": None, "erro": None}
+
+    monkeypatch.setattr("api.app.analisar_registro", falso_analisar_registro)
+
+    itens = [{"numeroProcesso": str(i)} for i in range(20)]
+    resp = api_client.post("/analisar-processos/lote", json=itens, params={"concorrencia": 2})
+
+    linhas = [json.loads(l) for l in resp.text.splitlines() if l]
+    assert sorted(l["indice"] for l in linhas) == list(range(20))
+    assert maximo <= 4
+
+
+def test_analisar_processos_lote_corpo_fora_de_utf8(api_client: TestClient):
+    resp = api_client.post(
+        "/analisar-processos/lote",
+        content=b'[{"numeroProcesso": "\xff"}]',
+        headers={"content-type": "application/json"},
+    )
+
+    assert resp.status_code == 400
+
+
+def test_analisar_processo_async_sucesso(api_client: TestClient, payload_processo, monkeypatch):
+    async def falsa_analise_com_llm(parecer):
+        return ResultadoDecisao(
+            decisao="approved",
+            justificativa="Processo elegível.",
+            citacoes=["POL-1", "POL-2"],
+        )
+
+    monkeypatch.setattr("api.app.analisar_com_llm_async", falsa_analise_com_llm)
+
+    resp = api_client.post("/analisar-processo/async", json=payload_processo)
+
+    assert resp.status_code == 200
+    assert resp.json()["decisao"] == "approved"
+
+
+def test_estado_llm(api_client: TestClient):
+    resposta = api_client.get("/llm/estado")
+
+    assert resposta.status_code == 200
+    assert {"agendador", "modelos", "modelo_secundario"} <= set(resposta.json())
+
+
+def test_analisar_processo_rapido_e_auditoria(api_client: TestClient, payload_processo, monkeypatch):
+    async def falsa_analise_com_llm(parecer):
+        return ResultadoDecisao(decisao="approved", justificativa="ok", citacoes=["POL-1"])
+
+    monkeypatch.setattr("api.app.analisar_com_llm_async", falsa_analise_com_llm)
+
+    for auditoria in (False, True):
+        resp = api_client.post("/analisar-processo/rapido", json=payload_processo, params={"auditoria": auditoria})
+        assert resp.status_code == 200
+        assert resp.json()["decisao"] == "approved"
+
+    # A auditoria valida campos que a projeção não olha
+    payload_processo["documentos"][0]["dataHoraJuntada"] = "ontem"
+    assert api_client.post("/analisar-processo/rapido", json=payload_processo).status_code == 200
+    resp = api_client.post("/analisar-processo/rapido", json=payload_processo, params={"auditoria": True})
+    assert resp.status_code == 422
+
+
+def test_analisar_processo_rapido_le_corpo_grande_fora_do_event_loop(
+    api_client: TestClient, payload_processo, monkeypatch
+):
+    async def falsa_analise_com_llm(parecer):
+        return ResultadoDecisao(decisao="approved", justificativa="ok", citacoes=["POL-1"])
+
+    no_event_loop = []
+
+    def projetar(corpo):
+        try:
+            asyncio.get_running_loop()
+            no_event_loop.append(True)
+        except RuntimeError:
+            no_event_loop.append(False)
+        return projetar_processo(corpo)
+
+    monkeypatch.setattr("api.app.analisar_com_llm_async", falsa_analise_com_llm)
+    monkeypatch.setattr("api.app.projetar_processo", projetar)
+    monkeypatch.setattr("api.app.RAPIDO_ENTRADA_INLINE_BYTES", 0)
+
+    assert api_client.post("/analisar-processo/rapido", json=payload_processo).status_code == 200
+    assert no_event_loop == [False]
+
+    payload_processo["documentos"][0]["dataHoraJuntada"] = "ontem"
+    resp = api_client.post("/analisar-processo/rapido", json=payload_processo, params={"auditoria": True})
+    assert resp.status_code == 422
@@ -0,0 +1,108 @@
+from fastapi.testclient import TestClient
+
+from api.app import app
+from api.schemas.process_schema import Processo, ResultadoDecisao
+from benchmarks.gerador import gerar_processo
+from verifier.armazem_decisoes import ArmazemDecisoes, impressao_processo
+from verifier.opniaoTecnica import gerar_parecer_tecnico
+
+
+def _processo(**alteracoes) -> Processo:
+    dados = gerar_processo(documentos=3, movimentos=3, tamanho_texto=100)
+    dados.update(alteracoes)
+    return Processo.model_validate(dados)
+
+
+def test_impressao_muda_com_entradas_e_versoes():
+    base = impressao_processo(_processo(), "3", "1", "gpt-4.1-mini")
+
+    assert impressao_processo(_processo(), "3", "1", "gpt-4.1-mini") == base
+    assert impressao_processo(_processo(valorCondenacao=10.0), "3", "1", "gpt-4.1-mini") != base
+    assert impressao_processo(_processo(), "4", "1", "gpt-4.1-mini") != base
+    assert impressao_processo(_processo(), "3", "2", "gpt-4.1-mini") != base
+    assert impressao_processo(_processo(), "3", "1", "gpt-4.1-mini", curto_circuito=True) != base
+
+    alterado = _processo()
+    alterado.documentos[0].texto += " adendo"
+    assert impressao_processo(alterado, "3", "1", "gpt-4.1-mini") != base
+
+
+def test_armazem_busca_e_historico(tmp_path):
+    armazem = ArmazemDecisoes(str(tmp_path / "decisoes.db"))
+    processo = _processo()
+    parecer = gerar_parecer_tecnico(processo)
+
+    assert armazem.buscar(processo.numeroProcesso, "abc") is None
+
+    for decisao in ("incomplete", "approved"):
+        armazem.registrar(
+            processo.numeroProcesso, "abc", parecer,
+            ResultadoDecisao(decisao=decisao, justificativa="ok", citacoes=[]),
+            caminho="llm", versao_prompt="3", versao_politicas="1", modelo="m", tempo_total=0.5,
+        )
+
+    assert armazem.buscar(processo.numeroProcesso, "abc").decisao == "approved"
+    assert armazem.buscar(processo.numeroProcesso, "outra") is None
+
+    historico = armazem.historico(processo.numeroProcesso)
+    assert [h["decisao"] for h in historico] == ["approved", "incomplete"]
+    assert historico[0]["opiniao"]["numero_processo"] == processo.numeroProcesso
+    assert armazem.estatisticas() == {"decisoes": 2, "hits": 1, "misses": 2}
+    armazem.fechar()
+
+
+def test_api_reaproveita_decisao_de_processo_sem_mudancas(tmp_path, monkeypatch):
+    armazem = ArmazemDecisoes(str(tmp_path / "decisoes.db"))
+    monkeypatch.setattr("api.app.armazem_decisoes", armazem)
+    chamadas = []
+
+    def falsa_analise_com_llm(parecer):
+        chamadas.append(parecer)
+        return ResultadoDecisao(decisao="approved", justificativa="ok", citacoes=["POL-1"])
+
+    monkeypatch.setattr("api.app.analisar_com_llm", falsa_analise_com_llm)
+    cliente = TestClient(app)
+    dados = gerar_processo(documentos=3, movimentos=3, tamanho_texto=100)
+    params = {"curto_circuito": False}
+
+    assert cliente.post("/analisar-processo", json=dados, params=params).json()["decisao"] == "approved"
+    assert cliente.post("/analisar-processo", json=dados, params=params).json()["decisao"] == "approved"
+    assert len(chamadas) == 1
+
+    cliente.post("/analisar-processo", json=dados, params={**params, "reprocessar": True})
+    assert len(chamadas) == 2
+
+    resp = cliente.get(f"/decisoes/{dados['numeroProcesso']}")
+    assert resp.status_code == 200
+    assert len(resp.json()["decisoes"]) == 2
+    armazem.fechar()
+
+
+def test_historico_sem_armazem_configurado(monkeypatch):
+    monkeypatch.setattr("api.app.armazem_decisoes", None)
+
+    assert TestClient(app).get("/decisoes/123").status_code == 404
+
+
+def test_api_nao_devolve_decisao_do_atalho_a_quem_o_desligou(tmp_path, monkeypatch):
+    armazem = ArmazemDecisoes(str(tmp_path / "decisoes.db"))
+    monkeypatch.setattr("api.app.armazem_decisoes", armazem)
+    chamadas = []
+
+    def falsa_analise_com_llm(parecer):
+        chamadas.append(parecer)
+        return ResultadoDecisao(decisao="approved", justificativa="ok", citacoes=["POL-1"])
+
+    monkeypatch.setattr("api.app.analisar_com_llm", falsa_analise_com_llm)
+    cliente = TestClient(app)
+    dados = gerar_processo(documentos=3, movimentos=3, tamanho_texto=100)
+    dados["esfera"] = "Trabalhista"
+
+    atalho = cliente.post("/analisar-processo", json=dados, params={"curto_circuito": True}).json()
+    assert atalho["decisao"] == "rejected"
+    assert chamadas == []
+
+    sem_atalho = cliente.post("/analisar-processo", json=dados, params={"curto_circuito": False}).json()
+    assert sem_atalho["decisao"] == "approved"
+    assert len(chamadas) == 1
+    armazem.fechar()
@@ -0,0 +1,79 @@
+import json
+import os
+
+import pytest
+
+from api.schemas.process_schema import Movimento
+from verifier.avaliador_politicas import ConjuntoPoliticas, ErroPoliticas, RegistroPoliticas
+from verifier.regras import ParecerTecnico, analisar_processo
+from verifier.opniaoTecnica import gerar_parecer_tecnico
+from tests.test_regras_parecer import criar_processo_basico
+
+
+CAMINHO_V1 = os.path.join(os.path.dirname(__file__), "..", "verifier", "politicas", "politicas_v1.json")
+
+
+def carregar_definicao() -> dict:
+    with open(CAMINHO_V1, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_politicas_seguem_ordem_do_arquivo():
+    parecer = gerar_parecer_tecnico(criar_processo_basico(esfera="Trabalhista", valor_condenacao=500.0))
+
+    assert parecer.politicas_potencialmente_violadas == ["POL-3", "POL-4"]
+    assert parecer.politicas_atendidas == ["POL-1", "POL-2", "POL-8"]
+
+
+def test_campo_desconhecido_falha_na_compilacao():
+    definicao = carregar_definicao()
+    definicao["politicas"][0]["condicao"] = "campo_que_nao_existe"
+
+    with pytest.raises(ErroPoliticas):
+        ConjuntoPoliticas(definicao, ParecerTecnico.model_fields)
+
+
+def test_novo_termo_sem_mudar_codigo():
+    definicao = carregar_definicao()
+    definicao["sinais"]["em_fase_execucao"]["termos"].append("expedição de precatório")
+    politicas = ConjuntoPoliticas(definicao, ParecerTecnico.model_fields)
+
+    processo = criar_processo_basico(em_execucao=False)
+    assert analisar_processo(processo, politicas).em_fase_execucao is False
+
+    processo.movimentos = [Movimento(dataHora="2024-01-01T00:00:00", descricao="Expedição de Precatório")]
+    assert analisar_processo(processo, politicas).em_fase_execucao is True
+
+
+def test_troca_a_quente_e_tempos_por_regra(tmp_path):
+    caminho = tmp_path / "politicas.json"
+    definicao = carregar_definicao()
+    caminho.write_text(json.dumps(definicao), encoding="utf-8")
+    registro = RegistroPoliticas(ParecerTecnico.model_fields, caminho=str(caminho), intervalo_verificacao=0)
+
+    processo = criar_processo_basico(valor_condenacao=5000.0)
+    assert analisar_processo(processo, registro.obter()).valor_muito_baixo is False
+
+    definicao["versao"] = "2"
+    definicao["sinais"]["valor_muito_baixo"]["menor_que"] = 10000
+    caminho.write_text(json.dumps(definicao), encoding="utf-8")
+    mtime = os.stat(caminho).st_mtime
+    os.utime(caminho, (mtime + 10, mtime + 10))
+
+    conjunto = registro.obter()
+    assert conjunto.versao == "2"
+    assert analisar_processo(processo, conjunto).valor_muito_baixo is True
+    assert conjunto.estatisticas()["sinal:valor_muito_baixo"]["avaliacoes"] == 1
+
+
+def test_arquivo_invalido_mantem_versao_anterior(tmp_path):
+    caminho = tmp_path / "politicas.json"
+    caminho.write_text(json.dumps(carregar_definicao()), encoding="utf-8")
+    registro = RegistroPoliticas(ParecerTecnico.model_fields, caminho=str(caminho), intervalo_verificacao=0)
+    anterior = registro.obter()
+
+    caminho.write_text("{ quebrado", encoding="utf-8")
+    mtime = os.stat(caminho).st_mtime
+    os.utime(caminho, (mtime + 10, mtime + 10))
+
+    assert registro.obter() is anterior
@@ -0,0 +1,51 @@
+import json
+
+import verifier.llm_client as llm_module
+from verifier import batch
+from tests.test_regras_parecer import criar_processo_basico
+
+
+def escrever_entrada(caminho, processos):
+    with open(caminho, "w", encoding="utf-8") as f:
+        for processo in processos:
+            f.write(processo.model_dump_json() + "\n")
+        f.write("linha quebrada\n")
+
+
+def ler_saida(caminho):
+    with open(caminho, encoding="utf-8") as f:
+        return [json.loads(l) for l in f]
+
+
+def test_cli_grava_decisoes_e_retoma(tmp_path, monkeypatch):
+    chamadas = []
+
+    async def falsa_analise(parecer):
+        chamadas.append(parecer.numero_processo)
+        return llm_module.ResultadoDecisao(decisao="approved", justificativa="ok", citacoes=["POL-1"])
+
+    monkeypatch.setattr(llm_module, "analisar_com_llm_async", falsa_analise)
+
+    processos = []
+    for i, esfera in enumerate(["cível", "trabalhista", "cível"]):
+        processo = criar_processo_basico(esfera=esfera)
+        processo.numeroProcesso = f"000{i}"
+        processos.append(processo)
+
+    entrada = tmp_path / "entrada.ndjson"
+    saida = tmp_path / "saida.ndjson"
+    escrever_entrada(entrada, processos)
+
+    codigo = batch.main([str(entrada), "-o", str(saida), "-c", "2", "--curto-circuito"])
+
+    linhas = ler_saida(saida)
+    por_numero = {l["numeroProcesso"]: l for l in linhas}
+    assert codigo == 1  # a linha quebrada vira erro
+    assert por_numero["0001"]["caminho"] == "regras"
+    assert por_numero["0000"]["decisao"]["decisao"] == "approved"
+    assert sorted(chamadas) == ["0000", "0002"]
+
+    # Segunda rodada: só a linha inválida é reprocessada
+    batch.main([str(entrada), "-o", str(saida), "--curto-circuito"])
+    assert len(ler_saida(saida)) == len(linhas) + 1
+    assert sorted(chamadas) == ["0000", "0002"]
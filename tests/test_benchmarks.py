@@ -0,0 +1,63 @@
+from openai import OpenAI
+
+from api.schemas.process_schema import Processo
+from benchmarks.carga import detectar_saturacao, resumir_passo
+from benchmarks.gerador import gerar_processo
+from benchmarks.llm_falso import ServidorLLMFalso
+from benchmarks.tempo_inicializacao import ler_importtime, medir_imports
+from verifier.regras import analisar_processo
+
+
+def test_gerador_produz_processo_valido():
+    payload = gerar_processo(documentos=30, movimentos=100, tamanho_texto=500)
+    processo = Processo.model_validate(payload)
+
+    assert len(processo.documentos) == 30
+    assert analisar_processo(processo).transitado_em_julgado is True
+
+
+def test_llm_falso_compativel_com_cliente_openai():
+    with ServidorLLMFalso(latencia=0.0) as servidor:
+        cliente = OpenAI(api_key="falsa", base_url=servidor.url, max_retries=0)
+        resposta = cliente.chat.completions.create(
+            model="gpt-4.1-mini", messages=[{"role": "user", "content": "oi"}]
+        )
+
+    assert '"decisao": "approved"' in resposta.choices[0].message.content
+    assert servidor.chamadas == 1
+
+
+def _passo(rps, vazao, p95, erros=0, total=100):
+    amostras = [{"status": 200, "latencia_s": p95, "atraso_s": 0.0, "em_andamento": 1}] * (total - erros)
+    amostras += [{"status": 500, "latencia_s": 0.01, "atraso_s": 0.0, "em_andamento": 1}] * erros
+    passo = resumir_passo(rps, 10, amostras)
+    passo["vazao_rps"] = vazao
+    return passo
+
+
+def test_detectar_saturacao_pela_latencia_e_pela_vazao():
+    passos = [_passo(5, 5, 0.8), _passo(10, 10, 0.9), _passo(20, 19.5, 3.0), _passo(40, 25, 9.0)]
+
+    saturacao = detectar_saturacao(passos)
+
+    assert saturacao["rps"] == 20
+    assert detectar_saturacao(passos[:2]) is None
+    assert detectar_saturacao([_passo(5, 5, 0.8, erros=5)])["motivos"] == ["taxa_erro=5.00%"]
+
+
+def test_ler_importtime():
+    saida = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |     api.schemas\n"
+        "import time:      2400 |       9000 |   api.app\n"
+        "aviso qualquer\n"
+    )
+    assert ler_importtime(saida) == {"api.schemas": (120, 120), "api.app": (2400, 9000)}
+
+
+def test_import_da_api_nao_carrega_sdk_nem_dependencias_opcionais():
+    relatorio = medir_imports("api.app", repeticoes=1)
+
+    assert relatorio["total_ms"] > 0
+    for modulo in ("openai", "numpy", "requests"):
+        assert modulo not in relatorio["modulos"]
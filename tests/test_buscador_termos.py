@@ -0,0 +1,42 @@
+from verifier.buscador_termos import BuscadorTermos, normalizar
+from verifier.regras import analisar_processo, varrer_processo
+from tests.test_regras_parecer import criar_processo_basico
+
+
+def test_normalizar_preserva_tamanho():
+    texto = "Certidão de TRÂNSITO em Julgado – Execução"
+    normalizado = normalizar(texto)
+
+    assert normalizado == "certidao de transito em julgado ? execucao"
+    assert len(normalizado) == len(texto)
+
+
+def test_termos_sobrepostos_sao_todos_encontrados():
+    buscador = BuscadorTermos(["Trânsito em Julgado", "Certidão de Trânsito", "inexistente"])
+
+    hits = buscador.buscar_em(["Petição", "CERTIDAO DE TRANSITO EM JULGADO"])
+
+    assert hits == {
+        "Trânsito em Julgado": True,
+        "Certidão de Trânsito": True,
+        "inexistente": False,
+    }
+
+
+def test_termo_nao_atravessa_textos():
+    buscador = BuscadorTermos(["cumprimento definitivo"])
+
+    assert buscador.buscar_em(["cumprimento", "definitivo"]) == {"cumprimento definitivo": False}
+
+
+def test_regras_usam_mapa_unico():
+    processo = criar_processo_basico()
+    processo.documentos[0].nome = "CERTIDAO DE TRANSITO EM JULGADO"
+
+    hits = varrer_processo(processo)
+    parecer = analisar_processo(processo)
+
+    assert hits["documentos.nome"]["Certidão de Trânsito"]
+    assert hits["movimentos.descricao"]["cumprimento definitivo"]
+    assert parecer.transitado_em_julgado is True
+    assert parecer.em_fase_execucao is True
@@ -0,0 +1,109 @@
+import asyncio
+import threading
+import time
+
+from api.schemas.process_schema import ResultadoDecisao
+from verifier.cache_decisoes import CacheDecisoes, chave_decisao
+from verifier.opniaoTecnica import gerar_parecer_tecnico
+import verifier.llm_client as llm_module
+from tests.test_regras_parecer import criar_processo_basico
+
+
+DECISAO = ResultadoDecisao(decisao="approved", justificativa="ok", citacoes=["POL-1"])
+
+
+def test_chave_ignora_numero_do_processo():
+    p1 = criar_processo_basico()
+    p2 = criar_processo_basico()
+    p2.numeroProcesso = "9999999-99.2024.4.01.0000"
+
+    c1 = chave_decisao(gerar_parecer_tecnico(p1), "3", "gpt-4.1-mini")
+    c2 = chave_decisao(gerar_parecer_tecnico(p2), "3", "gpt-4.1-mini")
+    c3 = chave_decisao(gerar_parecer_tecnico(p1), "3", "outro-modelo")
+    c4 = chave_decisao(gerar_parecer_tecnico(criar_processo_basico(valor_condenacao=500.0)), "3", "gpt-4.1-mini")
+
+    assert c1 == c2
+    assert c1 != c3
+    assert c1 != c4
+
+
+def test_lru_e_ttl():
+    cache = CacheDecisoes(capacidade=2, ttl=0.05)
+    cache.guardar("a", DECISAO)
+    cache.guardar("b", DECISAO)
+    cache.obter("a")
+    cache.guardar("c", DECISAO)
+
+    assert cache.obter("b") is None  # menos usado recentemente
+    assert cache.obter("a") == DECISAO
+
+    time.sleep(0.06)
+    assert cache.obter("a") is None
+    assert cache.estatisticas()["misses"] == 2
+
+
+def test_camada_sqlite_sobrevive_a_reinicio(tmp_path):
+    caminho = str(tmp_path / "cache.db")
+    CacheDecisoes(caminho_sqlite=caminho).guardar("a", DECISAO)
+
+    novo = CacheDecisoes(caminho_sqlite=caminho)
+    assert novo.obter("a") == DECISAO
+    assert novo.estatisticas()["hits_disco"] == 1
+
+
+def test_analisar_com_llm_usa_cache(monkeypatch):
+    chamadas = []
+
+    def falsa_chamada_llm(prompt: str) -> str:
+        chamadas.append(prompt)
+        return '{"decisao": "approved", "justificativa": "ok", "citacoes": ["POL-1"]}'
+
+    monkeypatch.setattr(llm_module, "chamar_llm", falsa_chamada_llm)
+
+    parecer = gerar_parecer_tecnico(criar_processo_basico())
+    primeira = llm_module.analisar_com_llm(parecer)
+    segunda = llm_module.analisar_com_llm(parecer)
+
+    assert primeira == segunda
+    assert len(chamadas) == 1
+
+
+def test_justificativa_servida_com_o_numero_do_processo_que_pediu(monkeypatch):
+    chamadas = []
+
+    def falsa_chamada_llm(prompt: str) -> str:
+        chamadas.append(prompt)
+        return '{"decisao": "approved", "justificativa": "Processo 0000000-00.0000.0.00.0000 apto.", "citacoes": []}'
+
+    monkeypatch.setattr(llm_module, "chamar_llm", falsa_chamada_llm)
+
+    p1 = criar_processo_basico()
+    p2 = criar_processo_basico()
+    p2.numeroProcesso = "9999999-99.2024.4.01.0000"
+
+    primeira = llm_module.analisar_com_llm(gerar_parecer_tecnico(p1))
+    segunda = llm_module.analisar_com_llm(gerar_parecer_tecnico(p2))
+
+    assert primeira.justificativa == "Processo 0000000-00.0000.0.00.0000 apto."
+    # Mesmo parecer: servida do cache, com o número do segundo processo
+    assert len(chamadas) == 1
+    assert segunda.justificativa == "Processo 9999999-99.2024.4.01.0000 apto."
+
+
+def test_camada_sqlite_fora_do_event_loop(tmp_path, monkeypatch):
+    cache = CacheDecisoes(caminho_sqlite=str(tmp_path / "cache.db"))
+    threads = []
+    original = cache._obter_valor
+
+    def obter_valor(chave):
+        threads.append(threading.current_thread())
+        return original(chave)
+
+    monkeypatch.setattr(cache, "_obter_valor", obter_valor)
+
+    async def rodar():
+        await cache.guardar_async("a", DECISAO)
+        return await cache.obter_async("a")
+
+    assert asyncio.run(rodar()) == DECISAO
+    assert threads and threads[0] is not threading.main_thread()
@@ -0,0 +1,109 @@
+import tempfile
+
+from api.ingestao import CorpoSpool, ingerir_processo
+from api.schemas.process_schema import Documento, Movimento, Processo
+from verifier.extracao_evidencias import MAX_POR_TIPO, extrair_evidencias, sinais_evidencias
+from verifier.opniaoTecnica import gerar_parecer_tecnico
+from verifier.serializacao import serializar_completa
+
+
+TEXTO = (
+    "Informa-se nos autos que o autor faleceu em 10/03/2024. "
+    "Substabeleço, sem reserva de poderes, ao Dr. Fulano. "
+    "Os honorários contratuais são de 30% sobre o crédito."
+)
+
+
+def _processo(textos: list[str], movimentos: list[str] | None = None) -> Processo:
+    return Processo(
+        numeroProcesso="0000000-00.0000.0.00.0000",
+        classe="Cumprimento de Sentença",
+        orgaoJulgador="1ª Vara Federal",
+        ultimaDistribuicao="2020-01-15T00:00:00",
+        assunto="Cobrança",
+        segredoJustica=False,
+        justicaGratuita=True,
+        siglaTribunal="TRF1",
+        esfera="Federal",
+        valorCondenacao=25000.0,
+        documentos=[
+            Documento(id=str(i), dataHoraJuntada="2024-01-01T12:00:00", nome="Petição", texto=texto)
+            for i, texto in enumerate(textos)
+        ],
+        movimentos=[
+            Movimento(dataHora="2024-02-01T10:00:00", descricao=descricao) for descricao in movimentos or []
+        ],
+    )
+
+
+def test_sinais_e_posicoes_no_texto_original():
+    processo = _processo([TEXTO])
+    evidencias = extrair_evidencias(processo)
+
+    assert {e.tipo for e in evidencias} == {"obito", "substabelecimento_sem_reserva", "honorarios"}
+    for evidencia in evidencias:
+        assert TEXTO[evidencia.inicio:evidencia.fim] == evidencia.trecho
+    assert sinais_evidencias(evidencias) == {
+        "obito_autor_sem_habilitacao": True,
+        "substabelecimento_sem_reserva": True,
+        "possui_informacao_honorarios": True,
+    }
+
+
+def test_habilitacao_afasta_obito_mas_negativa_nao():
+    habilitado = _processo([TEXTO], ["Deferida a habilitação dos herdeiros do autor"])
+    assert not sinais_evidencias(extrair_evidencias(habilitado))["obito_autor_sem_habilitacao"]
+
+    negativa = _processo([TEXTO], ["Não houve habilitação de herdeiros até o momento"])
+    evidencias = extrair_evidencias(negativa)
+    assert "habilitacao" not in {e.tipo for e in evidencias}
+    assert sinais_evidencias(evidencias)["obito_autor_sem_habilitacao"]
+
+
+def test_honorarios_em_reais_trazem_valor():
+    processo = _processo(["Fixo os honorários advocatícios em R$ 2.300,50."])
+    [evidencia] = extrair_evidencias(processo)
+    assert evidencia.tipo == "honorarios"
+    assert evidencia.valor == 2300.5
+
+
+def test_blocos_pequenos_dao_o_mesmo_resultado():
+    texto = ("Texto de preenchimento sem relevância. " * 40 + TEXTO) * 2
+    processo = _processo([texto, "Juntada de procuração."])
+
+    inteiro = extrair_evidencias(processo, bloco=10**6)
+    em_blocos = extrair_evidencias(processo, bloco=300)
+    assert em_blocos == inteiro
+    for evidencia in em_blocos:
+        assert texto[evidencia.inicio:evidencia.fim] == evidencia.trecho
+
+
+def test_limite_de_evidencias_por_tipo():
+    processo = _processo([TEXTO] * (MAX_POR_TIPO + 2))
+    evidencias = extrair_evidencias(processo)
+    assert sum(e.tipo == "obito" for e in evidencias) == MAX_POR_TIPO
+
+
+def test_texto_adiado_da_o_mesmo_resultado():
+    processo = _processo(["Petição sem nada relevante.", TEXTO * 50])
+    corpo = processo.model_dump_json().encode()
+    arquivo = tempfile.TemporaryFile()
+    arquivo.write(corpo)
+    arquivo.flush()
+    spool = CorpoSpool(arquivo, len(corpo))
+    try:
+        adiado = ingerir_processo(spool)
+        assert extrair_evidencias(adiado, bloco=512) == extrair_evidencias(processo)
+    finally:
+        spool.fechar()
+
+
+def test_parecer_preenche_politicas_5_6_7():
+    parecer = gerar_parecer_tecnico(_processo([TEXTO]))
+
+    assert parecer.analise.obito_autor_sem_habilitacao
+    assert parecer.analise.substabelecimento_sem_reserva
+    assert parecer.analise.possui_informacao_honorarios
+    assert parecer.analise.evidencias
+    # Evidências ficam fora do que vai para o LLM
+    assert "evidencias" not in serializar_completa(parecer)
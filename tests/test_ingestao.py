@@ -0,0 +1,107 @@
+import json
+import tempfile
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.app import app
+from api.ingestao import CorpoSpool, TextoAdiado, ingerir_processo, separar_textos
+from api.schemas.process_schema import Processo, ResultadoDecisao
+from benchmarks.gerador import gerar_processo
+
+
+def _spool(dados: dict | bytes) -> CorpoSpool:
+    corpo = dados if isinstance(dados, bytes) else json.dumps(dados, ensure_ascii=False).encode()
+    arquivo = tempfile.TemporaryFile()
+    arquivo.write(corpo)
+    arquivo.flush()
+    return CorpoSpool(arquivo, len(corpo))
+
+
+def test_ingestao_preguicosa_devolve_os_mesmos_textos():
+    dados = gerar_processo(documentos=20, movimentos=5, tamanho_texto=2000)
+    corpo = _spool(dados)
+    try:
+        processo = ingerir_processo(corpo)
+        esperado = Processo.model_validate(dados)
+
+        assert processo.numeroProcesso == esperado.numeroProcesso
+        assert all(doc.texto == "" for doc in processo.documentos)
+        assert [doc.carregar_texto() for doc in processo.documentos] == [
+            doc.texto for doc in esperado.documentos
+        ]
+    finally:
+        corpo.fechar()
+
+
+def test_ingestao_resolve_escapes_e_ignora_chave_dentro_de_string():
+    dados = gerar_processo(documentos=2, movimentos=1, tamanho_texto=10)
+    dados["documentos"][0]["texto"] = 'aspas "internas", barra \\ e "texto": "falso"\nfim ç'
+    dados["documentos"][1]["texto"] = "\\"
+    dados["assunto"] = 'trecho com "texto": "não é documento"'
+    corpo = _spool(dados)
+    try:
+        processo = ingerir_processo(corpo)
+
+        assert processo.assunto == dados["assunto"]
+        assert processo.documentos[0].carregar_texto() == dados["documentos"][0]["texto"]
+        assert processo.documentos[1].carregar_texto() == "\\"
+    finally:
+        corpo.fechar()
+
+
+def test_separar_textos_troca_valores_por_referencias():
+    enxuto, posicoes = separar_textos(b'{"documentos": [{"texto": "abc"}, {"texto" : "d\\"e"}]}')
+
+    assert enxuto == b'{"documentos": [{"texto": "#0"}, {"texto" : "#1"}]}'
+    assert len(posicoes) == 2
+
+
+def test_texto_adiado_respeita_limite_sem_partir_escape():
+    corpo = b'abcd\\u00e7efgh'
+    texto = TextoAdiado(corpo, 0, len(corpo), limite=7)
+
+    # O corte em 7 bytes cairia no meio de ç
+    assert texto.ler() == "abcd"
+    assert TextoAdiado(corpo, 0, len(corpo), limite=100).ler() == "abcdçefgh"
+    # Escape completo no fim do corte é mantido
+    assert TextoAdiado(b"ab\\ncd", 0, 6, limite=4).ler() == "ab\n"
+
+
+def test_rota_grande_analisa_processo(monkeypatch):
+    async def falsa_analise_com_llm(parecer):
+        return ResultadoDecisao(decisao="approved", justificativa="ok", citacoes=["POL-1"])
+
+    monkeypatch.setattr("api.app.analisar_com_llm_async", falsa_analise_com_llm)
+    dados = gerar_processo(documentos=50, movimentos=10, tamanho_texto=5000)
+
+    resp = TestClient(app).post("/analisar-processo/grande", json=dados, params={"curto_circuito": False})
+
+    assert resp.status_code == 200
+    assert resp.json()["decisao"] == "approved"
+
+
+def test_rota_grande_recusa_corpo_acima_do_limite(monkeypatch):
+    monkeypatch.setattr("api.ingestao.LIMITE_CORPO_BYTES", 1024)
+    dados = gerar_processo(documentos=5, movimentos=1, tamanho_texto=2000)
+
+    resp = TestClient(app).post("/analisar-processo/grande", json=dados)
+
+    assert resp.status_code == 413
+
+
+@pytest.mark.parametrize("corpo", [b"", b"{nao e json", b'{"numeroProcesso": "1"}'])
+def test_rota_grande_valida_corpo(corpo):
+    resp = TestClient(app).post("/analisar-processo/grande", content=corpo)
+
+    assert resp.status_code == 422
+
+
+def test_texto_adiado_em_partes_reconstroi_o_texto():
+    texto = 'início "citado" \\ barra\nção ' * 50
+
+    for ascii in (False, True):
+        corpo = json.dumps(texto, ensure_ascii=ascii).encode()
+        adiado = TextoAdiado(corpo, 1, len(corpo) - 1)
+        for tamanho in (1, 7, 64):
+            assert "".join(adiado.partes(tamanho)) == texto
@@ -1,3 +1,4 @@
+import asyncio
 import pytest
 
 from api.schemas.process_schema import ResultadoDecisao
@@ -95,3 +96,54 @@ def test_analisar_com_llm_resposta_invalida(monkeypatch):
         analisar_com_llm(parecer)
 
 
+
+
+def test_analisar_com_llm_async_sucesso(monkeypatch):
+    async def falsa_chamada_llm(prompt: str) -> str:
+        return '{"decisao": "rejected", "justificativa": "POL-4.", "citacoes": ["POL-4"]}'
+
+    monkeypatch.setattr(llm_module, "chamar_llm_async", falsa_chamada_llm)
+
+    parecer = gerar_parecer_tecnico(criar_processo_basico(esfera="trabalhista"))
+    decisao = asyncio.run(llm_module.analisar_com_llm_async(parecer))
+
+    assert decisao.decisao == "rejected"
+    assert decisao.citacoes == ["POL-4"]
+
+
+def test_analisar_com_llm_chama_de_novo_quando_saida_invalida(monkeypatch):
+    processo = criar_processo_basico()
+    parecer = gerar_parecer_tecnico(processo)
+    respostas = iter(["sem json aqui", '{"decisao": "approved", "justificativa": "ok", "citacoes": []}'])
+
+    monkeypatch.setattr(llm_module, "chamar_llm", lambda prompt: next(respostas))
+    monkeypatch.setattr(llm_module, "RECHAMADAS_SAIDA_INVALIDA", 1)
+
+    resultado = analisar_com_llm(parecer)
+
+    assert resultado.decisao == "approved"
+
+
+def test_esquema_saida_estruturada():
+    esquema = llm_module.esquema_resultado_decisao()
+
+    assert esquema["properties"]["decisao"]["enum"] == ["approved", "rejected", "incomplete"]
+    assert set(esquema["required"]) == {"decisao", "justificativa", "citacoes"}
+    assert esquema["additionalProperties"] is False
+
+
+def test_cliente_criado_no_primeiro_uso(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "teste")
+    monkeypatch.setattr(llm_module, "client", None)
+    monkeypatch.setattr(llm_module, "aclient", None)
+
+    cliente = llm_module.obter_cliente()
+    assert llm_module.obter_cliente() is cliente
+    assert llm_module.obter_cliente_async() is llm_module.aclient is not None
+
+    # Sem chave o erro é do LLM (tratado pela API), não do import
+    monkeypatch.setattr(llm_module, "client", None)
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    with pytest.raises(ErroLLM) as erro:
+        llm_module.obter_cliente()
+    assert erro.value.causa == "configuracao"
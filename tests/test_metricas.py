@@ -0,0 +1,77 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from api.app import app
+from config.metricas import Contador, Histograma, MetricasCompartilhadas, RegistroMetricas
+import verifier.llm_client as llm_module
+import verifier.motor_decisao as motor_decisao
+from tests.test_regras_parecer import criar_processo_basico
+
+
+def test_histograma_formato_prometheus():
+    histograma = Histograma("teste_duracao_segundos", "Duração.", ("etapa",), buckets=(0.1, 1.0))
+    histograma.observar(0.05, etapa="llm")
+    histograma.observar(0.5, etapa="llm")
+    histograma.observar(5, etapa="llm")
+
+    linhas = histograma.exportar()
+
+    assert "# TYPE teste_duracao_segundos histogram" in linhas
+    assert 'teste_duracao_segundos_bucket{etapa="llm",le="0.1"} 1' in linhas
+    assert 'teste_duracao_segundos_bucket{etapa="llm",le="1.0"} 2' in linhas
+    assert 'teste_duracao_segundos_bucket{etapa="llm",le="+Inf"} 3' in linhas
+    assert 'teste_duracao_segundos_count{etapa="llm"} 3' in linhas
+
+
+def test_contador_escapa_labels():
+    contador = Contador("teste_total", "Total.", ("causa",))
+    contador.inc(causa='a"b')
+
+    assert 'teste_total{causa="a\\"b"} 1' in contador.exportar()
+
+
+def _registro_worker(total: int) -> RegistroMetricas:
+    registro = RegistroMetricas()
+    registro.contador("teste_total", "Total.", ("causa",)).inc(total, causa="x")
+    registro.histograma("teste_duracao_segundos", "Duração.", buckets=(0.1, 1.0)).observar(0.05)
+    return registro
+
+
+def test_metricas_somadas_entre_workers(tmp_path):
+    # Instantâneo de outro worker, como gravado por ele
+    (tmp_path / "1.json").write_text(json.dumps(_registro_worker(3).instantaneo()), encoding="utf-8")
+    compartilhadas = MetricasCompartilhadas(_registro_worker(2), str(tmp_path))
+
+    linhas = compartilhadas.exportar().splitlines()
+    assert 'teste_total{causa="x"} 5' in linhas
+    assert 'teste_duracao_segundos_bucket{le="0.1"} 2' in linhas
+    assert "teste_duracao_segundos_count 2" in linhas
+
+    # O próprio arquivo não entra duas vezes na soma
+    compartilhadas.iniciar()
+    compartilhadas.encerrar()
+    assert 'teste_total{causa="x"} 5' in compartilhadas.exportar().splitlines()
+    assert len(list(tmp_path.glob("*.json"))) == 2
+
+
+def test_endpoint_metrics_apos_analise(monkeypatch):
+    monkeypatch.setattr(motor_decisao, "CURTO_CIRCUITO_PADRAO", True)
+    monkeypatch.setattr(llm_module, "chamar_llm", lambda prompt: "isso não é JSON")
+    client = TestClient(app)
+    payload_processo = criar_processo_basico().model_dump(mode="json")
+
+    payload_processo["valorCondenacao"] = 500.0
+    assert client.post("/analisar-processo", json=payload_processo).status_code == 200
+
+    payload_processo["valorCondenacao"] = 50000.0
+    payload_processo["numeroProcesso"] = "sem-execucao"
+    payload_processo["movimentos"] = []
+    assert client.post("/analisar-processo", json=payload_processo).status_code == 500
+
+    corpo = client.get("/metrics").text
+
+    assert 'juscash_etapa_duracao_segundos_count{etapa="regras"}' in corpo
+    assert 'juscash_etapa_duracao_segundos_count{etapa="llm"}' in corpo
+    assert 'juscash_decisoes_total{decisao="rejected",caminho="regras"' in corpo
+    assert 'juscash_erros_llm_total{causa="json_invalido"}' in corpo
@@ -0,0 +1,56 @@
+import pytest
+
+from api.schemas.process_schema import ResultadoDecisao
+from verifier.motor_decisao import decidir, decisao_deterministica
+from verifier.opniaoTecnica import gerar_parecer_tecnico
+from tests.test_regras_parecer import criar_processo_basico
+
+
+def llm_nao_deve_ser_chamado(parecer):
+    pytest.fail("LLM chamado para um caso decidido pelas regras")
+
+
+def llm_falso(parecer):
+    return ResultadoDecisao(decisao="approved", justificativa="ok", citacoes=["POL-1"])
+
+
+def test_trabalhista_rejeitado_sem_llm():
+    parecer = gerar_parecer_tecnico(criar_processo_basico(esfera="trabalhista"))
+
+    decisao = decidir(parecer, analisar=llm_nao_deve_ser_chamado, curto_circuito=True)
+
+    assert decisao.caminho == "regras"
+    assert decisao.resultado.decisao == "rejected"
+    assert decisao.resultado.citacoes == ["POL-4"]
+
+
+def test_valor_ausente_incompleto_sem_llm():
+    parecer = gerar_parecer_tecnico(criar_processo_basico(valor_condenacao=None))
+
+    decisao = decidir(parecer, analisar=llm_nao_deve_ser_chamado, curto_circuito=True)
+
+    assert decisao.caminho == "regras"
+    assert decisao.resultado.decisao == "incomplete"
+
+
+def test_caso_ambiguo_vai_para_o_llm():
+    parecer = gerar_parecer_tecnico(criar_processo_basico(com_transito=False))
+
+    assert decisao_deterministica(parecer) is None
+
+    decisao = decidir(parecer, analisar=llm_falso)
+    assert decisao.caminho == "llm"
+
+
+def test_curto_circuito_desligado_por_padrao():
+    parecer = gerar_parecer_tecnico(criar_processo_basico(esfera="trabalhista"))
+
+    assert decidir(parecer, analisar=llm_falso).caminho == "llm"
+
+
+def test_curto_circuito_desligado_por_requisicao():
+    parecer = gerar_parecer_tecnico(criar_processo_basico(valor_condenacao=500.0))
+
+    decisao = decidir(parecer, analisar=llm_falso, curto_circuito=False)
+
+    assert decisao.caminho == "llm"
@@ -0,0 +1,72 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from api.notificacoes import DespachanteNotificacoes
+
+
+@pytest.fixture
+def servidor_n8n():
+    recebidos = []
+    falhas = {"restantes": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            corpo = self.rfile.read(int(self.headers["Content-Length"]))
+            if falhas["restantes"] > 0:
+                falhas["restantes"] -= 1
+                self.send_response(503)
+            else:
+                recebidos.append(json.loads(corpo))
+                self.send_response(200)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{servidor.server_port}/webhook", recebidos, falhas
+    servidor.shutdown()
+
+
+def test_envio_em_segundo_plano_com_retentativa(servidor_n8n):
+    url, recebidos, falhas = servidor_n8n
+    falhas["restantes"] = 1
+    despachante = DespachanteNotificacoes(url, tentativas=3, backoff_base=0.01)
+
+    inicio = time.perf_counter()
+    despachante.enviar({"status": "success", "n": 1})
+    assert time.perf_counter() - inicio < 0.05  # não espera o webhook
+
+    despachante.encerrar()
+    assert recebidos == [{"status": "success", "n": 1}]
+
+
+def test_varios_eventos_por_post(servidor_n8n):
+    url, recebidos, _ = servidor_n8n
+    despachante = DespachanteNotificacoes(url, tamanho_lote=10)
+
+    for n in range(5):
+        despachante._fila.put_nowait({"n": n})
+    despachante._garantir_worker()
+    despachante.encerrar()
+
+    assert [e["n"] for lote in recebidos for e in lote] == list(range(5))
+    assert all(isinstance(lote, list) for lote in recebidos)
+
+
+def test_spool_quando_fila_cheia(tmp_path):
+    spool = tmp_path / "spool.ndjson"
+    despachante = DespachanteNotificacoes(
+        "http://127.0.0.1:9/fora", tamanho_fila=1, tentativas=1, timeout=0.2, caminho_spool=str(spool)
+    )
+    despachante._garantir_worker = lambda: None  # worker parado: a fila enche
+
+    assert despachante.enviar({"n": 1}) is True
+    assert despachante.enviar({"n": 2}) is False
+
+    assert [json.loads(l) for l in spool.read_text().splitlines()] == [{"n": 2}]
@@ -0,0 +1,58 @@
+import asyncio
+import json
+import pickle
+import tempfile
+
+import pytest
+
+from api.ingestao import CorpoSpool, ingerir_processo
+from tests.test_extracao_evidencias import TEXTO, _processo
+from verifier.opniaoTecnica import gerar_parecer_tecnico
+from verifier.pool_cpu import PoolCPU, compactar_processo, descompactar_processo
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = PoolCPU(1, min_caracteres=1000)
+    pool.aquecer()
+    yield pool
+    pool.encerrar()
+
+
+def test_parecer_no_pool_igual_ao_local(pool):
+    processo = _processo(["Petição inicial.", TEXTO * 100], ["Deferida a habilitação dos herdeiros"])
+
+    assert pool.vale_a_pena(processo)
+    assert pool.gerar_parecer(processo) == gerar_parecer_tecnico(processo)
+    assert asyncio.run(pool.gerar_parecer_async(processo)) == gerar_parecer_tecnico(processo)
+    assert pool.estatisticas()["tarefas"] == 2
+
+
+def test_textos_adiados_vao_sem_decodificar(pool):
+    processo = _processo([TEXTO * 100])
+    corpo = json.dumps(processo.model_dump(mode="json"), ensure_ascii=False).encode()
+    arquivo = tempfile.TemporaryFile()
+    arquivo.write(corpo)
+    arquivo.flush()
+    spool = CorpoSpool(arquivo, len(corpo))
+    try:
+        adiado = ingerir_processo(spool)
+        _, documentos, _ = compactar_processo(adiado)
+
+        assert isinstance(documentos[0][3], bytes)
+        assert descompactar_processo(compactar_processo(adiado)).documentos[0].carregar_texto() == TEXTO * 100
+        assert pool.gerar_parecer(adiado) == gerar_parecer_tecnico(processo)
+        # Pela API, o texto em arquivo continua sendo lido em partes aqui
+        assert not pool.vale_a_pena(adiado)
+    finally:
+        spool.fechar()
+
+
+def test_payload_menor_que_o_pickle_do_modelo():
+    processo = _processo([f"Documento {i}. " + TEXTO for i in range(200)])
+
+    assert len(pickle.dumps(compactar_processo(processo))) < len(pickle.dumps(processo))
+
+
+def test_processo_pequeno_fica_no_processo_principal(pool):
+    assert not pool.vale_a_pena(_processo(["curto"]))
@@ -0,0 +1,54 @@
+import json
+
+import pytest
+
+from api.schemas.process_schema import Processo
+from api.schemas.processo_compacto import ErroProjecao, projetar_processo
+from benchmarks.gerador import gerar_processo
+from verifier.opniaoTecnica import gerar_parecer_tecnico
+
+
+@pytest.mark.parametrize("tamanho_texto", [50, 20_000])
+def test_projecao_gera_o_mesmo_parecer_da_validacao_completa(tamanho_texto):
+    dados = gerar_processo(documentos=30, movimentos=40, tamanho_texto=tamanho_texto)
+    corpo = json.dumps(dados, ensure_ascii=False).encode()
+
+    completo = Processo.model_validate_json(corpo)
+    projetado = projetar_processo(corpo)
+
+    assert gerar_parecer_tecnico(projetado) == gerar_parecer_tecnico(completo)
+    assert [d.carregar_texto() for d in projetado.documentos] == [d.texto for d in completo.documentos]
+
+
+def test_projecao_converte_valor_inteiro_e_aceita_valor_ausente():
+    dados = gerar_processo(documentos=1, movimentos=1, tamanho_texto=10)
+    dados["valorCondenacao"] = 500
+
+    assert projetar_processo(json.dumps(dados).encode()).valorCondenacao == 500.0
+
+    del dados["valorCondenacao"]
+    assert projetar_processo(json.dumps(dados).encode()).valorCondenacao is None
+
+
+@pytest.mark.parametrize(
+    "alterar, local",
+    [
+        (lambda d: d.pop("esfera"), ("esfera",)),
+        (lambda d: d.update(valorCondenacao="muito"), ("valorCondenacao",)),
+        (lambda d: d["documentos"][0].update(nome=None), ("documentos", 0, "nome")),
+        (lambda d: d.update(movimentos={}), ("movimentos",)),
+    ],
+)
+def test_projecao_recusa_campos_lidos_pelas_regras_invalidos(alterar, local):
+    dados = gerar_processo(documentos=2, movimentos=2, tamanho_texto=10)
+    alterar(dados)
+
+    with pytest.raises(ErroProjecao) as erro:
+        projetar_processo(json.dumps(dados).encode())
+
+    assert erro.value.local == local
+
+
+def test_projecao_recusa_json_invalido():
+    with pytest.raises(ErroProjecao):
+        projetar_processo(b'{"texto": "sem fim')
@@ -0,0 +1,39 @@
+import os
+
+from verifier.registro_prompts import RegistroPrompts, PLACEHOLDER_OPINIAO
+
+
+def criar_registro(tmp_path, conteudo: str) -> RegistroPrompts:
+    (tmp_path / "prompt_v1.txt").write_text(conteudo, encoding="utf-8")
+    return RegistroPrompts(diretorio=str(tmp_path), versao_ativa="1", intervalo_verificacao=0)
+
+
+def test_renderizar_equivale_ao_replace(tmp_path):
+    conteudo = f"antes\n{PLACEHOLDER_OPINIAO}\ndepois {PLACEHOLDER_OPINIAO}"
+    registro = criar_registro(tmp_path, conteudo)
+
+    assert registro.renderizar('{"a": 1}') == conteudo.replace(PLACEHOLDER_OPINIAO, '{"a": 1}')
+    assert registro.obter().texto == conteudo
+
+
+def test_template_sem_placeholder(tmp_path):
+    registro = criar_registro(tmp_path, "sem dados do caso")
+
+    assert registro.renderizar('{"a": 1}') == "sem dados do caso"
+
+
+def test_recarrega_quando_mtime_muda(tmp_path):
+    registro = criar_registro(tmp_path, f"v1 {PLACEHOLDER_OPINIAO}")
+    caminho = tmp_path / "prompt_v1.txt"
+
+    caminho.write_text(f"v1 editado {PLACEHOLDER_OPINIAO}", encoding="utf-8")
+    mtime = os.stat(caminho).st_mtime
+    os.utime(caminho, (mtime + 10, mtime + 10))
+
+    assert registro.renderizar("{}") == "v1 editado {}"
+
+
+def test_prompts_do_repositorio_carregados():
+    from verifier.registro_prompts import registro_prompts
+
+    assert {"1", "2", "3"} <= set(registro_prompts.versoes())
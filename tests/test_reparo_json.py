@@ -0,0 +1,32 @@
+import pytest
+
+from verifier.reparo_json import reparar_json
+
+
+ESPERADO = {"decisao": "approved", "justificativa": "POL-1 atendida.", "citacoes": ["POL-1"]}
+
+
+@pytest.mark.parametrize(
+    "texto, tecnica",
+    [
+        ('```json\n{"decisao": "approved", "justificativa": "POL-1 atendida.", "citacoes": ["POL-1"]}\n```',
+         "cercas"),
+        ('{"decisao": "approved", "justificativa": "POL-1 atendida.", "citacoes": ["POL-1",],}', "pontuacao"),
+        ('{“decisao”: “approved”, “justificativa”: “POL-1 atendida.”, “citacoes”: [“POL-1”]}', "pontuacao"),
+        ('{"decisao": "approved", "justificativa": "POL-1 atendida.", "citacoes": ["POL-1"', "truncado"),
+        ("{'decisao': 'approved', 'justificativa': 'POL-1 atendida.', 'citacoes': ['POL-1']}", "literal_python"),
+    ],
+)
+def test_reparar_json(texto, tecnica):
+    assert reparar_json(texto) == (ESPERADO, tecnica)
+
+
+def test_reparar_json_truncado_no_meio_da_string():
+    valor, tecnica = reparar_json('{"decisao": "rejected", "justificativa": "Esfera trab')
+
+    assert tecnica == "truncado"
+    assert valor == {"decisao": "rejected", "justificativa": "Esfera trab"}
+
+
+def test_reparar_json_sem_objeto():
+    assert reparar_json("não sei decidir") is None
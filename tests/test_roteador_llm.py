@@ -0,0 +1,209 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from tests.test_regras_parecer import criar_processo_basico
+from verifier import llm_client
+from verifier.llm_client import ErroLLM
+from verifier.motor_decisao import decidir
+from verifier.opniaoTecnica import gerar_parecer_tecnico
+from verifier.roteador_llm import Disjuntor, ErroRoteamento, RoteadorLLM, chamada_abandonada
+
+
+def criar_roteador(**kwargs) -> RoteadorLLM:
+    opcoes = {"secundario": "modelo-b", "prazo": 5, "atraso_hedge_padrao": 0.05, "atraso_hedge_min": 0.01}
+    opcoes.update(kwargs)
+    return RoteadorLLM(**opcoes)
+
+
+def test_hedge_no_secundario_quando_primario_demora():
+    roteador = criar_roteador()
+
+    def tentar(modelo, prazo):
+        if modelo == "modelo-a":
+            time.sleep(0.5)
+        return modelo
+
+    inicio = time.monotonic()
+    assert roteador.executar(tentar, "modelo-a") == ("modelo-b", "modelo-b")
+    assert time.monotonic() - inicio < 0.4
+    roteador._executor.shutdown(wait=True)
+
+
+def test_hedge_sincrono_avisa_a_perdedora_e_respeita_as_threads():
+    roteador = criar_roteador(threads_hedge=2)
+    abandonos = []
+
+    def tentar(modelo, prazo):
+        if modelo == "modelo-a":
+            time.sleep(0.3)
+            abandonos.append(chamada_abandonada())
+        return modelo
+
+    assert roteador.executar(tentar, "modelo-a") == ("modelo-b", "modelo-b")
+    roteador._executor.shutdown(wait=True)
+    assert abandonos == [True]
+    assert roteador._threads_ocupadas == 0
+
+    # Sem thread livre: roda na thread da requisição, sem hedge
+    sem_threads = criar_roteador(threads_hedge=0)
+    threads = []
+
+    def tentar_lento(modelo, prazo):
+        threads.append(threading.current_thread())
+        time.sleep(0.1)
+        return modelo
+
+    assert sem_threads.executar(tentar_lento, "modelo-a") == ("modelo-a", "modelo-a")
+    assert threads == [threading.current_thread()]
+
+
+def test_sem_hedge_quando_primario_responde_a_tempo():
+    roteador = criar_roteador(atraso_hedge_padrao=1.0)
+    chamados = []
+
+    def tentar(modelo, prazo):
+        chamados.append(modelo)
+        return modelo
+
+    assert roteador.executar(tentar, "modelo-a") == ("modelo-a", "modelo-a")
+    assert chamados == ["modelo-a"]
+
+
+def test_hedge_async_cancela_a_chamada_perdedora():
+    roteador = criar_roteador()
+    cancelados = []
+
+    async def tentar(modelo, prazo):
+        try:
+            await asyncio.sleep(1.0 if modelo == "modelo-a" else 0.01)
+        except asyncio.CancelledError:
+            cancelados.append(modelo)
+            raise
+        return modelo
+
+    async def rodar():
+        resultado = await roteador.executar_async(tentar, "modelo-a")
+        await asyncio.sleep(0)
+        return resultado
+
+    assert asyncio.run(rodar()) == ("modelo-b", "modelo-b")
+    assert cancelados == ["modelo-a"]
+
+
+def test_prazo_da_chamada_async():
+    roteador = criar_roteador(secundario=None, prazo=0.05)
+
+    async def tentar(modelo, prazo):
+        await asyncio.sleep(1)
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(roteador.executar_async(tentar, "modelo-a"))
+
+
+def test_prazo_estourado_conta_como_falha_e_hedge_perdido_nao():
+    roteador = criar_roteador(secundario=None, prazo=0.05, falhas_disjuntor=1, tempo_disjuntor=60)
+
+    async def travado(modelo, prazo):
+        await asyncio.sleep(1)
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(roteador.executar_async(travado, "modelo-a"))
+    assert roteador.disjuntor("modelo-a").estado == Disjuntor.ABERTO
+
+    roteador = criar_roteador(falhas_disjuntor=1)
+
+    async def lento_no_primario(modelo, prazo):
+        await asyncio.sleep(1.0 if modelo == "modelo-a" else 0.01)
+        return modelo
+
+    assert asyncio.run(roteador.executar_async(lento_no_primario, "modelo-a")) == ("modelo-b", "modelo-b")
+    assert roteador.disjuntor("modelo-a").estado == Disjuntor.FECHADO
+
+
+def test_prazo_sincrono_conta_uma_falha_por_chamada():
+    roteador = criar_roteador(prazo=0.1, falhas_disjuntor=3, tempo_disjuntor=60)
+    liberar = threading.Event()
+
+    # As duas chamadas passam do prazo; depois a primária falha e a secundária responde
+    def tentar(modelo, prazo):
+        liberar.wait(1)
+        if modelo == "modelo-a":
+            raise ErroLLM("timeout", causa="timeout")
+        return modelo
+
+    with pytest.raises(TimeoutError):
+        roteador.executar(tentar, "modelo-a")
+    liberar.set()
+    roteador._executor.shutdown(wait=True)
+
+    assert roteador.disjuntor("modelo-a")._falhas == 1
+    assert roteador.disjuntor("modelo-b")._falhas == 1
+
+
+def test_disjuntor_desvia_do_modelo_que_falha():
+    roteador = criar_roteador(falhas_disjuntor=2, tempo_disjuntor=60, atraso_hedge_padrao=5)
+    chamados = []
+
+    def tentar(modelo, prazo):
+        chamados.append(modelo)
+        if modelo == "modelo-a":
+            raise ErroLLM("fora do ar", causa="conexao")
+        return modelo
+
+    # Falha rápida do primário já dispara o secundário
+    assert roteador.executar(tentar, "modelo-a") == ("modelo-b", "modelo-b")
+    assert roteador.executar(tentar, "modelo-a") == ("modelo-b", "modelo-b")
+    chamados.clear()
+
+    assert roteador.executar(tentar, "modelo-a") == ("modelo-b", "modelo-b")
+    assert chamados == ["modelo-b"]
+    assert roteador.disjuntor("modelo-a").estado == Disjuntor.ABERTO
+
+
+def test_disjuntor_ignora_saida_malformada_e_reabre_com_teste():
+    disjuntor = Disjuntor("m", falhas_max=1, tempo_aberto=0)
+    disjuntor.falha()
+    assert disjuntor.estado == Disjuntor.ABERTO
+
+    assert disjuntor.permite() is True
+    assert disjuntor.permite() is False
+    disjuntor.sucesso()
+    assert disjuntor.estado == Disjuntor.FECHADO
+
+    roteador = criar_roteador(secundario=None, falhas_disjuntor=1)
+    with pytest.raises(ErroLLM):
+        roteador.executar(lambda m, p: (_ for _ in ()).throw(ErroLLM("x", causa="json_invalido")), "modelo-a")
+    assert roteador.disjuntor("modelo-a").estado == Disjuntor.FECHADO
+
+
+def test_sem_modelo_disponivel():
+    roteador = criar_roteador(secundario=None, falhas_disjuntor=1, tempo_disjuntor=60)
+    roteador.disjuntor("modelo-a").falha()
+
+    with pytest.raises(ErroRoteamento):
+        roteador.executar(lambda m, p: m, "modelo-a")
+
+
+def test_analisar_com_llm_usa_o_modelo_do_hedge(monkeypatch):
+    roteador = criar_roteador()
+    monkeypatch.setattr(llm_client, "roteador_llm", roteador)
+
+    def falsa_chamada_llm(prompt):
+        modelo, prazo = llm_client._rota_chamada.get()
+        if modelo != "modelo-b":
+            time.sleep(0.5)
+        return f'{{"decisao": "approved", "justificativa": "{modelo}", "citacoes": []}}'
+
+    monkeypatch.setattr(llm_client, "chamar_llm", falsa_chamada_llm)
+    parecer = gerar_parecer_tecnico(criar_processo_basico())
+
+    assert llm_client.analisar_com_llm(parecer).justificativa == "modelo-b"
+    assert llm_client.modelo_resposta() == "modelo-b"
+    # O modelo que respondeu é o registrado na decisão (métrica e armazém)
+    decisao = decidir(parecer, curto_circuito=False)
+    assert (decisao.caminho, decisao.modelo) == ("llm", "modelo-b")
+    # A chamada perdedora (síncrona) é abandonada, não interrompida
+    roteador._executor.shutdown(wait=True)
@@ -0,0 +1,106 @@
+import json
+import math
+
+import numpy as np
+
+from api.schemas.process_schema import Documento, ResultadoDecisao
+from verifier import selecao_trechos
+from verifier.agendador_llm import estimar_tokens
+from verifier.cache_decisoes import chave_decisao
+from verifier.motor_decisao import decidir
+from verifier.opniaoTecnica import gerar_parecer_tecnico
+from verifier.selecao_trechos import pontuar, selecionar_trechos
+from verifier.serializacao import serializar_compacta
+from tests.test_regras_parecer import criar_processo_basico
+
+
+ENCHIMENTO = "O juízo determinou a intimação das partes para manifestação no prazo legal. " * 30
+
+
+def _processo(textos: dict[str, str], com_transito: bool = True):
+    processo = criar_processo_basico(com_transito=com_transito)
+    processo.documentos += [
+        Documento(id=id_documento, dataHoraJuntada="2024-03-01T10:00:00", nome="Petição", texto=texto)
+        for id_documento, texto in textos.items()
+    ]
+    return processo
+
+
+def test_trechos_certos_com_id_do_documento_e_posicoes():
+    textos = {
+        "DOC-A": ENCHIMENTO + "Substabeleço, sem reserva de poderes, ao advogado Fulano. " + ENCHIMENTO,
+        "DOC-B": ENCHIMENTO + "Os honorários advocatícios contratuais são de 30% sobre o crédito. " + ENCHIMENTO,
+        "DOC-C": ENCHIMENTO * 3,
+    }
+    trechos = selecionar_trechos(_processo(textos), tamanho=400)
+
+    por_politica = {trecho.politica: trecho for trecho in trechos}
+    assert por_politica["POL-6"].documento_id == "DOC-A"
+    assert "sem reserva" in por_politica["POL-6"].texto
+    assert por_politica["POL-7"].documento_id == "DOC-B"
+    assert "DOC-C" not in {trecho.documento_id for trecho in trechos}
+    for trecho in trechos:
+        texto = textos.get(trecho.documento_id)
+        if texto is not None:
+            assert texto[trecho.inicio:trecho.fim] == trecho.texto
+
+
+def test_orcamento_limita_o_prompt_qualquer_que_seja_o_processo():
+    texto = "Certidão: a sentença transitou em julgado. Honorários de 20% sobre o valor da condenação. " * 200
+    pequeno = selecionar_trechos(_processo({"1": texto}), orcamento_tokens=300)
+    grande = selecionar_trechos(_processo({str(i): texto for i in range(50)}), orcamento_tokens=300)
+
+    for trechos in (pequeno, grande):
+        assert trechos
+        assert sum(estimar_tokens(trecho.texto) for trecho in trechos) <= 300
+    assert len(grande) <= len(pequeno) + 1
+
+
+def test_pontuacao_igual_ao_bm25_direto():
+    # 3 trechos, 2 termos, 1 consulta com os dois termos
+    trechos_ocorrencia = np.array([0, 0, 1, 2, 2, 2])
+    termos_ocorrencia = np.array([0, 0, 1, 0, 1, 1])
+    tamanhos = np.array([10.0, 5.0, 20.0])
+    pesos = np.array([[1.0, 1.0]])
+
+    obtido = pontuar(trechos_ocorrencia, termos_ocorrencia, tamanhos, pesos)[0]
+
+    k1, b, media = selecao_trechos.K1, selecao_trechos.B, tamanhos.mean()
+    tf = [{0: 2}, {1: 1}, {0: 1, 1: 2}]
+    df = {0: 2, 1: 2}
+    esperado = [
+        sum(
+            math.log(1 + (3 - df[t] + 0.5) / (df[t] + 0.5)) * f * (k1 + 1)
+            / (f + k1 * (1 - b + b * tamanhos[i] / media))
+            for t, f in tf[i].items()
+        )
+        for i in range(3)
+    ]
+    assert np.allclose(obtido, esperado)
+
+
+def test_trechos_so_no_caminho_do_llm(monkeypatch):
+    monkeypatch.setattr(selecao_trechos, "SELECAO_HABILITADA", True)
+    textos = {"DOC-A": ENCHIMENTO + "Substabeleço, com reserva de poderes, ao advogado Fulano."}
+
+    # Trabalhista: decidido pelas regras, sem seleção
+    regras = gerar_parecer_tecnico(_processo(textos))
+    regras.politicas_potencialmente_violadas.append("POL-4")
+    decidir(regras, analisar=lambda _: None, curto_circuito=True, processo=_processo(textos))
+    assert regras.trechos_relevantes == []
+
+    recebidos = []
+
+    def llm_falso(parecer):
+        recebidos.append(parecer)
+        return ResultadoDecisao(decisao="approved", justificativa="ok", citacoes=["POL-1"])
+
+    processo = _processo(textos, com_transito=False)
+    parecer = gerar_parecer_tecnico(processo)
+    chave_sem_trechos = chave_decisao(parecer, "5", "modelo")
+    decisao = decidir(parecer, analisar=llm_falso, processo=processo)
+
+    assert decisao.caminho == "llm"
+    assert recebidos[0].trechos_relevantes
+    assert json.loads(serializar_compacta(parecer))["tc"][0]["d"] == "DOC-A"
+    assert chave_decisao(parecer, "5", "modelo") != chave_sem_trechos
@@ -0,0 +1,60 @@
+import itertools
+import json
+
+from config.metricas import TOKENS_ECONOMIZADOS
+from tests.test_regras_parecer import criar_processo_basico
+from verifier import llm_client
+from verifier.agendador_llm import estimar_tokens
+from verifier.opniaoTecnica import gerar_parecer_tecnico
+from verifier.registro_prompts import (
+    PLACEHOLDER_OPINIAO,
+    PLACEHOLDER_OPINIAO_COMPACTA,
+    SERIALIZACAO_COMPACTA,
+    SERIALIZACAO_COMPLETA,
+    RegistroPrompts,
+)
+from verifier.serializacao import serializar_compacta, serializar_completa
+
+
+def test_serializacao_compacta_so_com_campos_de_decisao():
+    opiniao = gerar_parecer_tecnico(criar_processo_basico())
+
+    compacta = serializar_compacta(opiniao)
+    dados = json.loads(compacta)
+
+    assert set(dados) == {"te", "ex", "vc", "vb", "tr", "ob", "sb", "ho", "df", "pv"}
+    assert dados["te"] == int(opiniao.analise.transitado_em_julgado)
+    assert dados["pv"] == opiniao.politicas_potencialmente_violadas
+    assert opiniao.numero_processo not in compacta
+    assert len(compacta) < len(serializar_completa(opiniao)) / 4
+
+
+def test_placeholder_escolhe_serializacao_da_versao(tmp_path):
+    (tmp_path / "prompt_v1.txt").write_text(f"a {PLACEHOLDER_OPINIAO} b", encoding="utf-8")
+    (tmp_path / "prompt_v2.txt").write_text(f"a {PLACEHOLDER_OPINIAO_COMPACTA} b", encoding="utf-8")
+    registro = RegistroPrompts(diretorio=str(tmp_path), versao_ativa="2", intervalo_verificacao=0)
+
+    assert registro.obter("1").serializacao == SERIALIZACAO_COMPLETA
+    assert registro.obter("2").serializacao == SERIALIZACAO_COMPACTA
+    assert registro.obter("2").texto == f"a {PLACEHOLDER_OPINIAO_COMPACTA} b"
+
+
+def test_construir_prompt_compacto_registra_economia(tmp_path, monkeypatch):
+    (tmp_path / "prompt_v9.txt").write_text(f"dados: {PLACEHOLDER_OPINIAO_COMPACTA}", encoding="utf-8")
+    registro = RegistroPrompts(diretorio=str(tmp_path), versao_ativa="9", intervalo_verificacao=0)
+    monkeypatch.setattr(llm_client, "registro_prompts", registro)
+    monkeypatch.setattr(llm_client, "AMOSTRA_ECONOMIA", 3)
+    monkeypatch.setattr(llm_client, "_prompts_compactos", itertools.count())
+    opiniao = gerar_parecer_tecnico(criar_processo_basico())
+    antes = TOKENS_ECONOMIZADOS.valor(versao_prompt="9")
+
+    prompt = llm_client.construirPrompt(opiniao)
+
+    assert prompt == f"dados: {serializar_compacta(opiniao)}"
+    por_prompt = estimar_tokens(serializar_completa(opiniao)) - estimar_tokens(serializar_compacta(opiniao))
+    assert TOKENS_ECONOMIZADOS.valor(versao_prompt="9") - antes == por_prompt * 3
+
+    # Os dois prompts seguintes já foram contados pela amostra
+    llm_client.construirPrompt(opiniao)
+    llm_client.construirPrompt(opiniao)
+    assert TOKENS_ECONOMIZADOS.valor(versao_prompt="9") - antes == por_prompt * 3
@@ -0,0 +1,97 @@
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+import pytest
+
+import serve
+from benchmarks.llm_falso import ServidorLLMFalso
+from tests.test_regras_parecer import criar_processo_basico
+
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_numero_de_workers(monkeypatch):
+    monkeypatch.setenv("JUSCASH_WORKERS", "3")
+    assert serve.numero_trabalhadores() == 3
+
+    monkeypatch.delenv("JUSCASH_WORKERS")
+    assert serve.numero_trabalhadores() >= 1
+
+
+def test_ambiente_divide_orcamentos_e_compartilha_cache():
+    ambiente = {"JUSCASH_LLM_RPM": "600", "JUSCASH_LLM_TPM": "0"}
+    serve.preparar_ambiente(4, ambiente)
+
+    assert float(ambiente["JUSCASH_LLM_RPM"]) == 150
+    assert ambiente["JUSCASH_LLM_TPM"] == "0"
+    assert ambiente["JUSCASH_CACHE_SQLITE"].endswith(".db")
+    assert ambiente["JUSCASH_METRICAS_DIR"]
+
+    ambiente = {"JUSCASH_CACHE_SQLITE": "/dados/cache.db"}
+    serve.preparar_ambiente(4, ambiente)
+    assert ambiente["JUSCASH_CACHE_SQLITE"] == "/dados/cache.db"
+
+
+def _porta_livre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.mark.integration
+def test_sigterm_drena_chamada_ao_llm_em_andamento(tmp_path):
+    llm = ServidorLLMFalso(latencia=1.0).iniciar()
+    porta = _porta_livre()
+    ambiente = {
+        **os.environ,
+        "OPENAI_API_KEY": "chave-falsa",
+        "OPENAI_BASE_URL": llm.url,
+        "HOST": "127.0.0.1",
+        "PORT": str(porta),
+        "JUSCASH_WORKERS": "2",
+        "JUSCASH_CACHE_SQLITE": str(tmp_path / "cache.db"),
+        "JUSCASH_DRENAGEM_S": "10",
+    }
+    ambiente.pop("N8N_WEBHOOK_URL", None)
+    servidor = subprocess.Popen(
+        [sys.executable, "serve.py"], cwd=RAIZ, env=ambiente, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    base = f"http://127.0.0.1:{porta}"
+
+    try:
+        for _ in range(100):
+            try:
+                urllib.request.urlopen(base + "/health", timeout=1).read()
+                break
+            except OSError:
+                time.sleep(0.1)
+
+        respostas = []
+
+        def analisar():
+            requisicao = urllib.request.Request(
+                base + "/analisar-processo/async?curto_circuito=false",
+                data=criar_processo_basico(com_transito=False).model_dump_json().encode(),
+                headers={"content-type": "application/json"},
+            )
+            respostas.append(urllib.request.urlopen(requisicao, timeout=30).status)
+
+        chamada = threading.Thread(target=analisar)
+        chamada.start()
+        time.sleep(0.5)
+        servidor.send_signal(signal.SIGTERM)
+        chamada.join()
+
+        assert respostas == [200]
+        assert servidor.wait(timeout=30) == 0
+    finally:
+        if servidor.poll() is None:
+            servidor.kill()
+        llm.parar()
@@ -0,0 +1,338 @@
+import asyncio
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from typing import Callable, Mapping
+
+from config.logger import obter_log
+
+
+logger = obter_log("agendador_llm")
+
+
+# Agendador das chamadas ao LLM, compartilhado por threads (rota síncrona) e
+# pelo event loop (rotas async/lote):
+# - orçamentos de requisições e tokens por minuto (baldes de fichas com
+#   reposição contínua; ficam um pouco abaixo do limite da conta, pela margem)
+# - fila FIFO: quem pediu primeiro sai primeiro, inclusive prompts grandes
+# - limite de concorrência AIMD: +1/limite a cada sucesso, metade a cada 429
+# - cabeçalhos x-ratelimit-* e retry-after ajustam os baldes e pausam a fila
+# Sem RPM/TPM configurados, os limites são aprendidos dos cabeçalhos da API.
+
+TOKENS_POR_CARACTERE = 0.25
+
+
+def estimar_tokens(texto: str) -> int:
+    # Aproximação barata (~4 caracteres por token); a diferença para o uso
+    # real é acertada no balde quando a resposta traz `usage`
+    return max(1, int(len(texto) * TOKENS_POR_CARACTERE))
+
+
+_DURACAO = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_UNIDADES = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+# "1s", "6m0s", "120ms" (x-ratelimit-reset-*) ou segundos puros (retry-after)
+def _segundos(valor: str | None) -> float | None:
+    if not valor:
+        return None
+    try:
+        return float(valor)
+    except ValueError:
+        pass
+    partes = _DURACAO.findall(valor)
+    if not partes:
+        return None
+    return sum(float(n) * _UNIDADES[u] for n, u in partes)
+
+
+def _inteiro(valor: str | None) -> int | None:
+    try:
+        return int(valor) if valor is not None else None
+    except ValueError:
+        return None
+
+
+def espera_sugerida(cabecalhos: Mapping[str, str] | None) -> float | None:
+    if not cabecalhos:
+        return None
+    ms = cabecalhos.get("retry-after-ms")
+    if ms is not None:
+        try:
+            return float(ms) / 1000
+        except ValueError:
+            pass
+    return _segundos(cabecalhos.get("retry-after"))
+
+
+class _Balde:
+
+    # Fichas por minuto, repostas continuamente; a capacidade (rajada) é
+    # `rajada_s` segundos de reposição, já que a API aplica o limite em
+    # janelas mais curtas que um minuto
+    def __init__(self, por_minuto: float, rajada_s: float):
+        self.rajada_s = rajada_s
+        self.configurar(por_minuto)
+
+    def configurar(self, por_minuto: float) -> None:
+        self.por_minuto = por_minuto
+        self.taxa = por_minuto / 60
+        self.capacidade = max(1.0, self.taxa * self.rajada_s)
+        self.disponivel = self.capacidade
+        self.atualizado = time.monotonic()
+
+    @property
+    def ilimitado(self) -> bool:
+        return self.por_minuto <= 0
+
+    def repor(self, agora: float) -> None:
+        if self.ilimitado:
+            return
+        self.disponivel = min(self.capacidade, self.disponivel + (agora - self.atualizado) * self.taxa)
+        self.atualizado = agora
+
+    # Segundos até haver `quantidade` fichas (0 = já há). Um pedido maior que
+    # a rajada inteira passa com o balde cheio e deixa saldo negativo
+    def espera(self, quantidade: float) -> float:
+        if self.ilimitado:
+            return 0.0
+        falta = min(quantidade, self.capacidade) - self.disponivel
+        return max(0.0, falta / self.taxa)
+
+
+class _Ficha:
+    __slots__ = ("tokens", "liberada", "acordar")
+
+    def __init__(self, tokens: int, acordar: Callable[[], None]):
+        self.tokens = tokens
+        self.liberada = False
+        self.acordar = acordar
+
+
+class TempoEsgotadoFila(Exception):
+    pass
+
+
+class AgendadorLLM:
+
+    def __init__(
+        self,
+        rpm: float = 0,
+        tpm: float = 0,
+        margem: float = 0.9,
+        concorrencia_inicial: int | None = None,
+        concorrencia_min: int = 1,
+        concorrencia_max: int = 64,
+        tentativas: int = 4,
+        backoff_base: float = 0.5,
+        backoff_max: float = 20.0,
+        espera_max: float = 60.0,
+        rajada_s: float = 1.0,
+    ):
+        self.margem = margem
+        self.concorrencia_min = max(1, concorrencia_min)
+        self.concorrencia_max = max(self.concorrencia_min, concorrencia_max)
+        self.tentativas = max(1, tentativas)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.espera_max = espera_max
+
+        self._rpm_configurado = rpm > 0
+        self._tpm_configurado = tpm > 0
+        self._requisicoes = _Balde(rpm * margem, rajada_s)
+        self._tokens = _Balde(tpm * margem, rajada_s)
+
+        self.limite_concorrencia = float(concorrencia_inicial or self.concorrencia_max)
+        self._em_voo = 0
+        self._pausa_ate = 0.0
+        self._fila: deque[_Ficha] = deque()
+        self._lock = threading.Lock()
+
+        self.liberadas = 0
+        self.limitadas = 0
+
+    # ---- entrada e saída da fila
+
+    # `espera_max` limita a espera desta chamada (ex.: o que resta do prazo)
+    def adquirir(self, tokens: int, espera_max: float | None = None) -> _Ficha:
+        evento = threading.Event()
+        ficha = self._enfileirar(tokens, evento.set)
+        prazo = time.monotonic() + (self.espera_max if espera_max is None else min(self.espera_max, espera_max))
+
+        while True:
+            evento.clear()
+            espera = self._despachar()
+            if ficha.liberada:
+                return ficha
+            restante = prazo - time.monotonic()
+            if restante <= 0:
+                return self._desistir(ficha)
+            evento.wait(min(espera or 1.0, restante))
+
+    async def adquirir_async(self, tokens: int, espera_max: float | None = None) -> _Ficha:
+        loop = asyncio.get_running_loop()
+        evento = asyncio.Event()
+        ficha = self._enfileirar(tokens, lambda: loop.call_soon_threadsafe(evento.set))
+        prazo = time.monotonic() + (self.espera_max if espera_max is None else min(self.espera_max, espera_max))
+
+        try:
+            while True:
+                evento.clear()
+                espera = self._despachar()
+                if ficha.liberada:
+                    return ficha
+                restante = prazo - time.monotonic()
+                if restante <= 0:
+                    return self._desistir(ficha)
+                try:
+                    await asyncio.wait_for(evento.wait(), min(espera or 1.0, restante))
+                except asyncio.TimeoutError:
+                    pass
+        except asyncio.CancelledError:
+            # Requisição cancelada (cliente desconectou) não pode segurar vaga
+            with self._lock:
+                if ficha in self._fila:
+                    self._fila.remove(ficha)
+                    ficha = None
+            if ficha is not None:
+                self.concluir(ficha, falhou=True)
+            raise
+
+    def _enfileirar(self, tokens: int, acordar: Callable[[], None]) -> _Ficha:
+        ficha = _Ficha(tokens, acordar)
+        with self._lock:
+            self._fila.append(ficha)
+        return ficha
+
+    def _desistir(self, ficha: _Ficha) -> _Ficha:
+        with self._lock:
+            if ficha.liberada:
+                return ficha
+            self._fila.remove(ficha)
+        raise TempoEsgotadoFila("Chamada ao LLM esgotou o tempo de espera na fila")
+
+    # Libera, em ordem, as fichas do início da fila que cabem nos orçamentos.
+    # Devolve quantos segundos faltam para a próxima poder sair (None = só
+    # quando uma chamada em voo terminar)
+    def _despachar(self) -> float | None:
+        liberadas = []
+        espera = None
+
+        with self._lock:
+            agora = time.monotonic()
+            self._requisicoes.repor(agora)
+            self._tokens.repor(agora)
+
+            while self._fila:
+                ficha = self._fila[0]
+                if self._em_voo >= int(self.limite_concorrencia):
+                    break
+                if agora < self._pausa_ate:
+                    espera = self._pausa_ate - agora
+                    break
+                espera = max(self._requisicoes.espera(1), self._tokens.espera(ficha.tokens))
+                if espera > 0:
+                    break
+
+                espera = None
+                self._fila.popleft()
+                self._requisicoes.disponivel -= 1
+                self._tokens.disponivel -= ficha.tokens
+                self._em_voo += 1
+                self.liberadas += 1
+                ficha.liberada = True
+                liberadas.append(ficha)
+
+        for ficha in liberadas:
+            ficha.acordar()
+        return espera
+
+    def concluir(
+        self,
+        ficha: _Ficha,
+        tokens_usados: int | None = None,
+        cabecalhos: Mapping[str, str] | None = None,
+        limitada: bool = False,
+        falhou: bool = False,
+    ) -> None:
+        with self._lock:
+            agora = time.monotonic()
+            self._em_voo -= 1
+
+            # Acerta a estimativa com o uso real informado pela API
+            if tokens_usados is not None and not self._tokens.ilimitado:
+                self._tokens.disponivel += ficha.tokens - tokens_usados
+
+            if cabecalhos:
+                self._aplicar_cabecalhos(cabecalhos, agora)
+
+            if limitada:
+                self.limitadas += 1
+                anterior = self.limite_concorrencia
+                self.limite_concorrencia = max(float(self.concorrencia_min), anterior / 2)
+                self._pausa_ate = max(self._pausa_ate, agora + (espera_sugerida(cabecalhos) or self.backoff_base))
+                logger.warning(
+                    f"LLM limitou a taxa | concorrencia={anterior:.1f}->{self.limite_concorrencia:.1f} "
+                    f"| pausa={self._pausa_ate - agora:.2f}s"
+                )
+            elif not falhou:
+                # Aumento aditivo: ~+1 a cada `limite` sucessos
+                self.limite_concorrencia = min(
+                    float(self.concorrencia_max), self.limite_concorrencia + 1 / self.limite_concorrencia
+                )
+
+        self._despachar()
+
+    def _aplicar_cabecalhos(self, cabecalhos: Mapping[str, str], agora: float) -> None:
+        # Limites da conta, quando não configurados por env
+        limite_req = _inteiro(cabecalhos.get("x-ratelimit-limit-requests"))
+        if limite_req and not self._rpm_configurado and self._requisicoes.por_minuto != limite_req * self.margem:
+            self._requisicoes.configurar(limite_req * self.margem)
+        limite_tok = _inteiro(cabecalhos.get("x-ratelimit-limit-tokens"))
+        if limite_tok and not self._tpm_configurado and self._tokens.por_minuto != limite_tok * self.margem:
+            self._tokens.configurar(limite_tok * self.margem)
+
+        # O saldo informado pela API vale mais que a nossa conta local
+        for balde, sufixo in ((self._requisicoes, "requests"), (self._tokens, "tokens")):
+            restante = _inteiro(cabecalhos.get(f"x-ratelimit-remaining-{sufixo}"))
+            if restante is None:
+                continue
+            if not balde.ilimitado:
+                balde.disponivel = min(balde.disponivel, restante)
+            if restante == 0:
+                reset = _segundos(cabecalhos.get(f"x-ratelimit-reset-{sufixo}"))
+                if reset:
+                    self._pausa_ate = max(self._pausa_ate, agora + reset)
+
+    # ---- retentativas
+
+    def espera_retentativa(self, tentativa: int, cabecalhos: Mapping[str, str] | None = None) -> float:
+        espera = min(self.backoff_max, self.backoff_base * (2 ** (tentativa - 1)))
+        espera *= random.uniform(0.5, 1.5)
+        sugerida = espera_sugerida(cabecalhos)
+        return max(espera, sugerida) if sugerida else espera
+
+    def estatisticas(self) -> dict:
+        with self._lock:
+            return {
+                "em_voo": self._em_voo,
+                "na_fila": len(self._fila),
+                "limite_concorrencia": round(self.limite_concorrencia, 2),
+                "rpm": self._requisicoes.por_minuto,
+                "tpm": self._tokens.por_minuto,
+                "liberadas": self.liberadas,
+                "limitadas": self.limitadas,
+            }
+
+
+agendador_llm = AgendadorLLM(
+    rpm=float(os.getenv("JUSCASH_LLM_RPM", "0")),
+    tpm=float(os.getenv("JUSCASH_LLM_TPM", "0")),
+    margem=float(os.getenv("JUSCASH_LLM_MARGEM", "0.9")),
+    concorrencia_max=int(os.getenv("JUSCASH_LLM_CONCORRENCIA_MAX", "64")),
+    tentativas=int(os.getenv("JUSCASH_LLM_TENTATIVAS", "4")),
+    espera_max=float(os.getenv("JUSCASH_LLM_ESPERA_MAX", "60")),
+)
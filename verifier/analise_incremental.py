@@ -0,0 +1,235 @@
+import os
+import threading
+from collections import OrderedDict
+from types import SimpleNamespace
+from typing import Any
+
+from api.schemas.process_schema import ResultadoDecisao
+from verifier.avaliador_politicas import ConjuntoPoliticas
+from verifier.extracao_evidencias import extrair_evidencias, extrair_evidencias_itens, limitar_evidencias
+from verifier.opniaoTecnica import OpniaoTecnica, gerar_parecer_tecnico
+from verifier.registro_prompts import registro_prompts
+from verifier.regras import registro_politicas
+from config.logger import obter_log
+from config.metricas import ANALISE_INCREMENTAL
+
+
+logger = obter_log("incremental")
+
+
+# Análise incremental: o crawler reenvia o processo inteiro a cada movimento
+# novo, mas os itens antigos já foram varridos. Por processo guardamos:
+# - os termos já encontrados em cada campo ({campo: {termo: bool}})
+# - por coleção, a maior data vista e quantos itens tinham data até ela
+# - o parecer (com as evidências textuais) e a decisão da última análise,
+#   com o caminho que a produziu, a versão do prompt e se o atalho valia
+# Na próxima chegada só os itens com data posterior são varridos e os termos
+# e evidências encontrados somam-se aos anteriores. Se a contagem de itens antigos mudou
+# (item removido, data editada, item novo com data retroativa), ou a versão
+# das políticas é outra, a varredura é completa. Se o parecer derivado não
+# mudou e a decisão foi tomada nas mesmas condições (versões de prompt e
+# políticas, atalho ligado ou não), ela é devolvida sem chamar o LLM.
+# Edição do texto de um item antigo, mantendo a data, não é detectada: para
+# isso use `reprocessar` (armazém) ou desligue o modo incremental.
+
+# Atributo de data de cada coleção varrida pelas políticas
+CAMPOS_DATA = {"documentos": "dataHoraJuntada", "movimentos": "dataHora"}
+
+
+class EstadoProcesso:
+    __slots__ = (
+        "versao_politicas", "hits", "vistos", "opiniao", "resultado", "caminho", "versao_prompt", "curto_circuito"
+    )
+
+    def __init__(
+        self,
+        versao_politicas: str,
+        hits: dict[str, dict[str, bool]],
+        vistos: dict[str, tuple[Any, int]],
+        opiniao: OpniaoTecnica,
+        resultado: ResultadoDecisao | None = None,
+        caminho: str = "",
+        versao_prompt: str = "",
+        curto_circuito: bool = False,
+    ):
+        self.versao_politicas = versao_politicas
+        self.hits = hits
+        self.vistos = vistos
+        self.opiniao = opiniao
+        self.resultado = resultado
+        self.caminho = caminho
+        self.versao_prompt = versao_prompt
+        self.curto_circuito = curto_circuito
+
+
+# Datas vêm como datetime (Processo) ou texto ISO (projeção rápida, em que a
+# ordem lexicográfica é a cronológica) e são comparadas como vieram. Tipos
+# misturados (TypeError) levam à varredura completa
+def _ultimo_e_quantidade(itens: list, atributo: str) -> tuple[Any, int]:
+    if not itens:
+        return None, 0
+    return max(getattr(item, atributo) for item in itens), len(itens)
+
+
+# Quantos itens são antigos e os novos, com o índice de cada um no processo
+def _separar_novos(itens: list, atributo: str, ultimo: Any) -> tuple[int, list[tuple[int, Any]]]:
+    if ultimo is None:
+        return 0, list(enumerate(itens))
+    antigos, recentes = 0, []
+    for indice, item in enumerate(itens):
+        if getattr(item, atributo) <= ultimo:
+            antigos += 1
+        else:
+            recentes.append((indice, item))
+    return antigos, recentes
+
+
+# Hits do processo inteiro, varrendo só o que é novo quando o estado permite.
+# Devolve (hits, vistos, novos), com os itens novos (e seus índices) por
+# coleção, ou None quando a varredura foi completa
+def varrer_incremental(
+    processo: Any, politicas: ConjuntoPoliticas, anterior: EstadoProcesso | None
+) -> tuple[dict[str, dict[str, bool]], dict[str, tuple[Any, int]], dict[str, list] | None]:
+
+    # Documentos e movimentos sempre entram: as evidências textuais leem os dois
+    colecoes = set(CAMPOS_DATA) | {campo.split(".", 1)[0] for campo in politicas.campos_varridos}
+    try:
+        vistos = {
+            colecao: _ultimo_e_quantidade(getattr(processo, colecao), CAMPOS_DATA[colecao])
+            for colecao in colecoes
+            if colecao in CAMPOS_DATA
+        }
+    except TypeError:
+        vistos = {}
+
+    if (
+        anterior is None
+        or anterior.versao_politicas != politicas.versao
+        or len(vistos) != len(colecoes)
+        or set(anterior.vistos) != set(vistos)
+    ):
+        return politicas.varrer(processo), vistos, None
+
+    novos = {}
+    for colecao, (ultimo, quantidade) in anterior.vistos.items():
+        try:
+            antigos, recentes = _separar_novos(getattr(processo, colecao), CAMPOS_DATA[colecao], ultimo)
+        except TypeError:
+            antigos, recentes = -1, []
+        if antigos != quantidade:
+            return politicas.varrer(processo), vistos, None
+        novos[colecao] = recentes
+
+    if not any(novos.values()):
+        return anterior.hits, vistos, novos
+
+    delta = politicas.varrer(SimpleNamespace(**{c: [item for _, item in itens] for c, itens in novos.items()}))
+    hits = {
+        campo: {termo: encontrado or delta[campo][termo] for termo, encontrado in termos.items()}
+        for campo, termos in anterior.hits.items()
+    }
+    return hits, vistos, novos
+
+
+# Evidências novas do mesmo tipo não mudam a decisão: só os sinais contam.
+# Os trechos para o LLM são escolhidos depois, só no caminho do LLM
+def _mesmo_parecer(anterior: OpniaoTecnica, atual: OpniaoTecnica) -> bool:
+    excluir = {"analise": {"evidencias"}, "trechos_relevantes": True}
+    return anterior.model_dump(exclude=excluir) == atual.model_dump(exclude=excluir)
+
+
+# A decisão anterior só vale para quem pede nas mesmas condições: outra
+# versão de prompt ou de políticas, ou o atalho em outra posição, podem dar
+# outra decisão para o mesmo parecer. Decisão das regras nunca vai para quem
+# desligou o atalho
+def _pode_reaproveitar(anterior: EstadoProcesso, atual: EstadoProcesso) -> bool:
+    return (
+        anterior.resultado is not None
+        and anterior.versao_prompt == atual.versao_prompt
+        and anterior.versao_politicas == atual.versao_politicas
+        and anterior.curto_circuito == atual.curto_circuito
+        and (anterior.caminho != "regras" or atual.curto_circuito)
+        and _mesmo_parecer(anterior.opiniao, atual.opiniao)
+    )
+
+
+# Estados por número de processo, em LRU local a cada worker
+class EstadosIncrementais:
+
+    def __init__(self, capacidade: int = 10000):
+        self.capacidade = capacidade
+        self._estados: OrderedDict[str, EstadoProcesso] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obter(self, numero_processo: str) -> EstadoProcesso | None:
+        with self._lock:
+            estado = self._estados.get(numero_processo)
+            if estado is not None:
+                self._estados.move_to_end(numero_processo)
+            return estado
+
+    def guardar(self, numero_processo: str, estado: EstadoProcesso) -> None:
+        with self._lock:
+            self._estados[numero_processo] = estado
+            self._estados.move_to_end(numero_processo)
+            while len(self._estados) > self.capacidade:
+                self._estados.popitem(last=False)
+
+    # Parecer do processo (varrendo só o delta quando possível), a decisão
+    # anterior se o parecer não mudou e o novo estado, que só deve ser
+    # guardado (`confirmar`) depois que a decisão sair. `curto_circuito` é se
+    # o atalho das regras vale para esta chamada
+    def analisar(
+        self, processo: Any, curto_circuito: bool = False
+    ) -> tuple[OpniaoTecnica, ResultadoDecisao | None, EstadoProcesso]:
+        politicas = registro_politicas.obter()
+        anterior = self.obter(processo.numeroProcesso)
+
+        hits, vistos, novos = varrer_incremental(processo, politicas, anterior)
+        completa = novos is None
+        if completa:
+            evidencias = extrair_evidencias(processo)
+        else:
+            evidencias = limitar_evidencias(
+                anterior.opiniao.analise.evidencias
+                + extrair_evidencias_itens((d for _, d in novos["documentos"]), novos["movimentos"])
+            )
+        opiniao = gerar_parecer_tecnico(processo, politicas, hits, evidencias)
+        ANALISE_INCREMENTAL.inc(evento="completa" if completa else "delta")
+
+        estado = EstadoProcesso(
+            politicas.versao, hits, vistos, opiniao,
+            versao_prompt=registro_prompts.versao_ativa, curto_circuito=curto_circuito,
+        )
+        reaproveitada = None
+        if anterior is not None and _pode_reaproveitar(anterior, estado):
+            reaproveitada = anterior.resultado
+            estado.caminho = anterior.caminho
+            ANALISE_INCREMENTAL.inc(evento="reaproveitada")
+
+        logger.info(
+            f"Análise incremental | numero_processo={processo.numeroProcesso} | "
+            f"varredura={'completa' if completa else 'delta'} | parecer_mudou={reaproveitada is None}"
+        )
+        return opiniao, reaproveitada, estado
+
+    # Decisão reaproveitada (caminho "incremental") mantém o caminho de origem
+    def confirmar(
+        self, numero_processo: str, estado: EstadoProcesso, resultado: ResultadoDecisao, caminho: str = "llm"
+    ) -> None:
+        estado.resultado = resultado
+        if caminho != "incremental":
+            estado.caminho = caminho
+        self.guardar(numero_processo, estado)
+
+    def estatisticas(self) -> dict:
+        with self._lock:
+            return {"processos": len(self._estados), "capacidade": self.capacidade}
+
+
+# Desligado por padrão (JUSCASH_INCREMENTAL=1 liga)
+estados_incrementais = (
+    EstadosIncrementais(capacidade=int(os.getenv("JUSCASH_INCREMENTAL_CAPACIDADE", "10000")))
+    if os.getenv("JUSCASH_INCREMENTAL", "0") == "1"
+    else None
+)
@@ -0,0 +1,169 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Any
+
+from api.schemas.process_schema import ResultadoDecisao
+from verifier.opniaoTecnica import OpniaoTecnica
+from config.logger import obter_log
+
+
+logger = obter_log("armazem")
+
+
+# Impressão digital das entradas da análise: o processo inteiro (metadados,
+# documentos com texto, movimentos) mais as versões de prompt, políticas, o
+# modelo e se o atalho das regras valia. Mesma impressão => mesma decisão,
+# sem refazer parecer nem LLM; quem desliga o atalho não recebe a decisão
+# que ele deu.
+# Os textos entram um a um no hash, então documentos adiados
+# (api/ingestao.py) são lidos um por vez e não ficam todos na memória.
+def impressao_processo(
+    processo: Any, versao_prompt: str, versao_politicas: str, modelo: str, curto_circuito: bool = False
+) -> str:
+    h = hashlib.sha256()
+
+    def somar(*valores) -> None:
+        for valor in valores:
+            if isinstance(valor, datetime):
+                valor = valor.isoformat()
+            h.update(str(valor).encode("utf-8"))
+            h.update(b"\x1f")
+
+    somar(versao_prompt, versao_politicas, modelo, curto_circuito)
+    somar(
+        processo.numeroProcesso, processo.classe, processo.orgaoJulgador, processo.ultimaDistribuicao,
+        processo.assunto, processo.segredoJustica, processo.justicaGratuita, processo.siglaTribunal,
+        processo.esfera, processo.valorCondenacao,
+    )
+    for doc in processo.documentos:
+        somar("doc", doc.id, doc.dataHoraJuntada, doc.nome, doc.carregar_texto())
+    for mov in processo.movimentos:
+        somar("mov", mov.dataHora, mov.descricao)
+
+    return h.hexdigest()
+
+
+# Histórico de decisões por processo em SQLite (WAL): cada análise concluída
+# vira uma linha com a impressão das entradas, o parecer, a decisão, versões
+# e latências. Serve para devolver a decisão de um processo que não mudou e
+# para consultar o histórico sem reprocessar.
+class ArmazemDecisoes:
+
+    def __init__(self, caminho_sqlite: str):
+        self.caminho_sqlite = caminho_sqlite
+        self._lock = threading.Lock()
+
+        self._conexao = sqlite3.connect(caminho_sqlite, check_same_thread=False, timeout=5)
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        # Em WAL, NORMAL só sincroniza no checkpoint: perder as últimas
+        # decisões numa queda de energia custa apenas reprocessá-las
+        self._conexao.execute("PRAGMA synchronous=NORMAL")
+        self._conexao.executescript(
+            "CREATE TABLE IF NOT EXISTS decisoes ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " numero_processo TEXT NOT NULL,"
+            " impressao TEXT NOT NULL,"
+            " decisao TEXT NOT NULL,"
+            " caminho TEXT NOT NULL,"
+            " versao_prompt TEXT NOT NULL,"
+            " versao_politicas TEXT NOT NULL,"
+            " modelo TEXT NOT NULL,"
+            " opiniao TEXT NOT NULL,"
+            " resultado TEXT NOT NULL,"
+            " tempo_parecer_s REAL,"
+            " tempo_decisao_s REAL,"
+            " tempo_total_s REAL,"
+            " criado_em TEXT NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS idx_decisoes_processo ON decisoes (numero_processo, impressao);"
+            "CREATE INDEX IF NOT EXISTS idx_decisoes_decisao ON decisoes (decisao);"
+            "CREATE INDEX IF NOT EXISTS idx_decisoes_data ON decisoes (criado_em);"
+        )
+        self._conexao.commit()
+
+        self.hits = 0
+        self.misses = 0
+
+    # Última decisão gravada para este processo com exatamente estas entradas
+    def buscar(self, numero_processo: str, impressao: str) -> ResultadoDecisao | None:
+        with self._lock:
+            linha = self._conexao.execute(
+                "SELECT resultado FROM decisoes WHERE numero_processo = ? AND impressao = ? "
+                "ORDER BY id DESC LIMIT 1",
+                (numero_processo, impressao),
+            ).fetchone()
+            if linha is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return ResultadoDecisao.model_validate_json(linha[0])
+
+    def registrar(
+        self,
+        numero_processo: str,
+        impressao: str,
+        opiniao: OpniaoTecnica,
+        resultado: ResultadoDecisao,
+        caminho: str,
+        versao_prompt: str,
+        versao_politicas: str,
+        modelo: str,
+        tempo_parecer: float | None = None,
+        tempo_decisao: float | None = None,
+        tempo_total: float | None = None,
+    ) -> None:
+        linha = (
+            numero_processo, impressao, resultado.decisao, caminho, versao_prompt, versao_politicas, modelo,
+            opiniao.model_dump_json(), resultado.model_dump_json(),
+            tempo_parecer, tempo_decisao, tempo_total,
+            datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+        )
+        with self._lock:
+            try:
+                self._conexao.execute(
+                    "INSERT INTO decisoes (numero_processo, impressao, decisao, caminho, versao_prompt, "
+                    "versao_politicas, modelo, opiniao, resultado, tempo_parecer_s, tempo_decisao_s, "
+                    "tempo_total_s, criado_em) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    linha,
+                )
+                self._conexao.commit()
+            except sqlite3.Error as e:
+                # O histórico é um registro a mais: falha aqui não derruba a análise
+                logger.warning(f"Falha ao gravar decisão | numero_processo={numero_processo} | erro={e}")
+
+    # Histórico de um processo, da decisão mais recente para a mais antiga
+    def historico(self, numero_processo: str, limite: int = 50) -> list[dict]:
+        with self._lock:
+            cursor = self._conexao.execute(
+                "SELECT impressao, decisao, caminho, versao_prompt, versao_politicas, modelo, opiniao, "
+                "resultado, tempo_parecer_s, tempo_decisao_s, tempo_total_s, criado_em "
+                "FROM decisoes WHERE numero_processo = ? ORDER BY id DESC LIMIT ?",
+                (numero_processo, limite),
+            )
+            colunas = [c[0] for c in cursor.description]
+            linhas = cursor.fetchall()
+
+        historico = []
+        for linha in linhas:
+            item = dict(zip(colunas, linha))
+            item["opiniao"] = json.loads(item["opiniao"])
+            item["resultado"] = json.loads(item["resultado"])
+            historico.append(item)
+        return historico
+
+    def estatisticas(self) -> dict:
+        with self._lock:
+            total = self._conexao.execute("SELECT COUNT(*) FROM decisoes").fetchone()[0]
+            return {"decisoes": total, "hits": self.hits, "misses": self.misses}
+
+    def fechar(self) -> None:
+        with self._lock:
+            self._conexao.close()
+
+
+# Desligado por padrão: só existe com JUSCASH_ARMAZEM_SQLITE apontando para o arquivo
+_caminho = os.getenv("JUSCASH_ARMAZEM_SQLITE")
+armazem_decisoes = ArmazemDecisoes(_caminho) if _caminho else None
@@ -0,0 +1,258 @@
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Iterable
+
+from verifier.buscador_termos import BuscadorTermos, normalizar
+from config.logger import obter_log
+
+
+logger = obter_log("politicas")
+
+DIRETORIO_POLITICAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "politicas")
+
+
+class ErroPoliticas(Exception):
+    # Arquivo de políticas inválido
+    pass
+
+
+# Condição de política já compilada em uma função sobre o ParecerTecnico.
+# Formatos aceitos no arquivo:
+#   "campo"                      -> campo verdadeiro
+#   {"campo": "x"}               -> idem
+#   {"preenchido": "x"}          -> campo diferente de None
+#   {"todos": [...]}             -> todas as condições
+#   {"algum": [...]}             -> pelo menos uma
+#   {"nao": condicao}            -> negação
+def _compilar_condicao(condicao: Any, campos_validos: set[str] | None) -> Callable[[Any], bool]:
+
+    def checar_campo(campo: str) -> str:
+        if campos_validos is not None and campo not in campos_validos:
+            raise ErroPoliticas(f"Campo desconhecido no ParecerTecnico: {campo}")
+        return campo
+
+    if isinstance(condicao, str):
+        campo = checar_campo(condicao)
+        return lambda analise: bool(getattr(analise, campo))
+
+    if not isinstance(condicao, dict) or len(condicao) != 1:
+        raise ErroPoliticas(f"Condição inválida: {condicao!r}")
+
+    operador, argumento = next(iter(condicao.items()))
+
+    if operador == "campo":
+        return _compilar_condicao(argumento, campos_validos)
+
+    if operador == "preenchido":
+        campo = checar_campo(argumento)
+        return lambda analise: getattr(analise, campo) is not None
+
+    if operador in ("todos", "algum"):
+        partes = [_compilar_condicao(c, campos_validos) for c in argumento]
+        agregador = all if operador == "todos" else any
+        return lambda analise: agregador(p(analise) for p in partes)
+
+    if operador == "nao":
+        parte = _compilar_condicao(argumento, campos_validos)
+        return lambda analise: not parte(analise)
+
+    raise ErroPoliticas(f"Operador de condição desconhecido: {operador}")
+
+
+# Conjunto de políticas compilado a partir do arquivo versionado.
+# Sinais são avaliados sobre o Processo; políticas, sobre o ParecerTecnico.
+class ConjuntoPoliticas:
+
+    def __init__(self, definicao: dict, campos_parecer: Iterable[str] | None = None):
+        self.versao = str(definicao.get("versao", "?"))
+        campos_validos = set(campos_parecer) if campos_parecer is not None else None
+
+        # Sinais por termos: um único buscador por campo (ex.: "documentos.nome"),
+        # com os termos de todos os sinais que olham para aquele campo
+        self._termos_por_sinal: dict[str, tuple[str, list[str]]] = {}
+        self._sinais_escalares: dict[str, Callable[[Any], bool]] = {}
+        termos_por_campo: dict[str, list[str]] = {}
+
+        for nome, sinal in definicao.get("sinais", {}).items():
+            campo = sinal.get("campo")
+            if not campo:
+                raise ErroPoliticas(f"Sinal sem campo: {nome}")
+
+            if "termos" in sinal:
+                if "." not in campo:
+                    raise ErroPoliticas(f"Sinal de termos precisa de campo 'colecao.atributo': {nome}")
+                self._termos_por_sinal[nome] = (campo, list(sinal["termos"]))
+                termos_por_campo.setdefault(campo, []).extend(sinal["termos"])
+            elif "igual_a" in sinal:
+                self._sinais_escalares[nome] = _sinal_igual_a(campo, sinal["igual_a"])
+            elif "menor_que" in sinal:
+                self._sinais_escalares[nome] = _sinal_menor_que(campo, sinal["menor_que"])
+            else:
+                raise ErroPoliticas(f"Tipo de sinal desconhecido: {nome}")
+
+        self._buscadores = {campo: BuscadorTermos(termos) for campo, termos in termos_por_campo.items()}
+        # Campos "colecao.atributo" percorridos por `varrer`
+        self.campos_varridos = list(self._buscadores)
+        self.sinais = list(self._termos_por_sinal) + list(self._sinais_escalares)
+
+        self.documentos_essenciais: list[tuple[str, str]] = []
+        for item in definicao.get("documentos_essenciais", []):
+            if item["sinal"] not in self.sinais:
+                raise ErroPoliticas(f"Documento essencial aponta para sinal inexistente: {item['sinal']}")
+            self.documentos_essenciais.append((item["sinal"], item["descricao"]))
+
+        self.politicas: list[tuple[str, Callable[[Any], bool], str | None, str | None]] = []
+        for politica in definicao.get("politicas", []):
+            resultados = (politica.get("se_verdadeiro"), politica.get("se_falso"))
+            if any(r not in (None, "violada", "atendida") for r in resultados):
+                raise ErroPoliticas(f"Resultado inválido na política {politica.get('id')}")
+            self.politicas.append(
+                (politica["id"], _compilar_condicao(politica["condicao"], campos_validos), *resultados)
+            )
+
+        self._tempos: dict[str, list[float]] = {}
+        self._lock_tempos = threading.Lock()
+
+    # Varre as coleções de texto do processo, uma passada por campo.
+    # Devolve {campo: {termo: encontrado}}.
+    def varrer(self, processo: Any) -> dict[str, dict[str, bool]]:
+        hits = {}
+        for campo, buscador in self._buscadores.items():
+            inicio = time.perf_counter()
+            colecao, atributo = campo.split(".", 1)
+            hits[campo] = buscador.buscar_em(getattr(item, atributo) for item in getattr(processo, colecao))
+            self._registrar_tempo(f"varredura:{campo}", inicio)
+        return hits
+
+    def avaliar_sinais(self, processo: Any, hits: dict[str, dict[str, bool]] | None = None) -> dict[str, bool]:
+        if hits is None:
+            hits = self.varrer(processo)
+
+        sinais = {}
+        for nome, (campo, termos) in self._termos_por_sinal.items():
+            sinais[nome] = any(hits[campo][t] for t in termos)
+
+        for nome, avaliar in self._sinais_escalares.items():
+            inicio = time.perf_counter()
+            sinais[nome] = avaliar(processo)
+            self._registrar_tempo(f"sinal:{nome}", inicio)
+
+        return sinais
+
+    def documentos_faltantes(self, sinais: dict[str, bool]) -> list[str]:
+        return [descricao for sinal, descricao in self.documentos_essenciais if not sinais[sinal]]
+
+    def mapear(self, analise: Any) -> tuple[list[str], list[str]]:
+        violadas: list[str] = []
+        atendidas: list[str] = []
+
+        for id_politica, condicao, se_verdadeiro, se_falso in self.politicas:
+            inicio = time.perf_counter()
+            resultado = se_verdadeiro if condicao(analise) else se_falso
+            self._registrar_tempo(f"politica:{id_politica}", inicio)
+
+            if resultado == "violada":
+                violadas.append(id_politica)
+            elif resultado == "atendida":
+                atendidas.append(id_politica)
+
+        return violadas, atendidas
+
+    def _registrar_tempo(self, regra: str, inicio: float) -> None:
+        decorrido = time.perf_counter() - inicio
+        with self._lock_tempos:
+            acumulado = self._tempos.setdefault(regra, [0, 0.0])
+            acumulado[0] += 1
+            acumulado[1] += decorrido
+
+    # Tempo acumulado por regra desde que este conjunto foi compilado
+    def estatisticas(self) -> dict[str, dict[str, float]]:
+        with self._lock_tempos:
+            return {
+                regra: {
+                    "avaliacoes": n,
+                    "tempo_total_s": total,
+                    "tempo_medio_us": (total / n) * 1e6 if n else 0.0,
+                }
+                for regra, (n, total) in self._tempos.items()
+            }
+
+
+def _sinal_igual_a(campo: str, valores: list[str]) -> Callable[[Any], bool]:
+    aceitos = {normalizar(v).strip() for v in valores}
+
+    def avaliar(processo: Any) -> bool:
+        valor = getattr(processo, campo)
+        return valor is not None and normalizar(str(valor)).strip() in aceitos
+
+    return avaliar
+
+
+def _sinal_menor_que(campo: str, limite: float) -> Callable[[Any], bool]:
+
+    def avaliar(processo: Any) -> bool:
+        valor = getattr(processo, campo)
+        return valor is not None and valor < limite
+
+    return avaliar
+
+
+def compilar_arquivo(caminho: str, campos_parecer: Iterable[str] | None = None) -> ConjuntoPoliticas:
+    with open(caminho, "r", encoding="utf-8") as f:
+        definicao = json.load(f)
+    return ConjuntoPoliticas(definicao, campos_parecer)
+
+
+# Mantém o conjunto de políticas ativo e troca por um novo, já compilado,
+# quando o arquivo muda. Se a nova versão não compilar, a anterior continua.
+class RegistroPoliticas:
+
+    def __init__(
+        self,
+        campos_parecer: Iterable[str] | None = None,
+        caminho: str | None = None,
+        intervalo_verificacao: float | None = None,
+    ):
+        if caminho is None:
+            versao = os.getenv("POLITICAS_VERSAO", "1")
+            caminho = os.path.join(DIRETORIO_POLITICAS, f"politicas_v{versao}.json")
+        if intervalo_verificacao is None:
+            intervalo_verificacao = float(os.getenv("POLITICAS_RELOAD_INTERVALO", "2"))
+
+        self.caminho = caminho
+        self.intervalo_verificacao = intervalo_verificacao
+        self._campos_parecer = list(campos_parecer) if campos_parecer is not None else None
+        self._lock = threading.Lock()
+
+        self._mtime = os.stat(caminho).st_mtime
+        self._conjunto = compilar_arquivo(caminho, self._campos_parecer)
+        self._ultima_verificacao = time.monotonic()
+
+        logger.info(
+            f"Políticas compiladas | versao={self._conjunto.versao} | "
+            f"politicas={len(self._conjunto.politicas)} | sinais={len(self._conjunto.sinais)}"
+        )
+
+    def obter(self) -> ConjuntoPoliticas:
+        agora = time.monotonic()
+        if agora - self._ultima_verificacao < self.intervalo_verificacao:
+            return self._conjunto
+
+        with self._lock:
+            self._ultima_verificacao = agora
+            try:
+                mtime = os.stat(self.caminho).st_mtime
+            except FileNotFoundError:
+                return self._conjunto
+
+            if mtime != self._mtime:
+                self._mtime = mtime
+                try:
+                    self._conjunto = compilar_arquivo(self.caminho, self._campos_parecer)
+                    logger.info(f"Políticas recarregadas | versao={self._conjunto.versao}")
+                except (OSError, ValueError, KeyError, ErroPoliticas) as e:
+                    logger.error(f"Falha ao recarregar políticas, mantendo versão anterior | erro={e}")
+
+        return self._conjunto
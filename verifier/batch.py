@@ -0,0 +1,219 @@
+"""Análise em massa, fora da API.
+
+Lê processos em NDJSON (arquivos ou stdin), analisa com N chamadas simultâneas
+ao LLM e grava uma decisão por linha no arquivo de saída à medida que cada
+análise termina. A memória usada não depende do tamanho da entrada: só há
+no máximo 2*N processos em andamento. Processos que já têm decisão com
+sucesso no arquivo de saída são pulados, então basta rodar de novo para
+retomar um backfill interrompido.
+
+Uso:
+    python -m verifier.batch entrada.ndjson [outra.ndjson ...] -o decisoes.ndjson -c 8
+    cat entrada.ndjson | python -m verifier.batch - -o decisoes.ndjson
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from typing import Any, Awaitable, Callable, Iterable, Iterator
+
+from pydantic import ValidationError
+
+from api.schemas.process_schema import Processo, ResultadoDecisao
+from verifier.opniaoTecnica import OpniaoTecnica, gerar_parecer_tecnico
+from verifier.motor_decisao import decidir_async
+from verifier.pool_cpu import pool_cpu
+from verifier import llm_client
+from config.logger import obter_log
+
+
+logger = obter_log("batch")
+
+
+# Analisa um registro já decodificado (dict) e devolve o resultado como dict,
+# com o erro no próprio item em vez de exceção. Usado pelo CLI e pelo
+# endpoint de lote.
+async def analisar_registro(
+    item: Any,
+    semaforo: asyncio.Semaphore,
+    curto_circuito: bool | None = None,
+    analisar: Callable[[OpniaoTecnica], Awaitable[ResultadoDecisao]] | None = None,
+) -> dict:
+
+    numero_processo = item.get("numeroProcesso") if isinstance(item, dict) else None
+    resultado = {"numeroProcesso": numero_processo}
+
+    if isinstance(item, Exception):
+        return {**resultado, "status": "error", "erro": str(item)}
+
+    try:
+        processo = Processo.model_validate(item)
+    except ValidationError as e:
+        return {
+            **resultado,
+            "status": "error",
+            "erro": "Processo inválido.",
+            "detalhes": e.errors(include_url=False, include_context=False, include_input=False),
+        }
+
+    analisar = analisar or llm_client.analisar_com_llm_async
+
+    # O semáforo só limita chamadas reais ao LLM; o atalho das regras não espera
+    async def analisar_limitado(opiniao):
+        async with semaforo:
+            return await analisar(opiniao)
+
+    try:
+        if pool_cpu is not None and pool_cpu.vale_a_pena(processo):
+            parecer = await pool_cpu.gerar_parecer_async(processo)
+        else:
+            # Regras e evidências textuais são CPU: fora do event loop
+            parecer = await asyncio.to_thread(gerar_parecer_tecnico, processo)
+        decisao = await decidir_async(
+            parecer, analisar=analisar_limitado, curto_circuito=curto_circuito, processo=processo
+        )
+
+    except llm_client.ErroLLM as e:
+        logger.error(f"Erro na decisão do LLM | numero_processo={numero_processo} | erro={e}")
+        return {**resultado, "status": "error", "erro": "Falha ao obter decisão do LLM."}
+
+    except Exception:
+        logger.exception(f"Erro inesperado ao analisar processo | numero_processo={numero_processo}")
+        return {**resultado, "status": "error", "erro": "Erro interno ao analisar o processo."}
+
+    return {
+        **resultado,
+        "status": "success",
+        "caminho": decisao.caminho,
+        "decisao": decisao.resultado.model_dump(),
+    }
+
+
+# Gera os registros das entradas, uma linha por vez ("-" = stdin)
+def ler_registros(entradas: Iterable[str]) -> Iterator[Any]:
+    for entrada in entradas:
+        arquivo = sys.stdin if entrada == "-" else open(entrada, "r", encoding="utf-8")
+        try:
+            for linha in arquivo:
+                linha = linha.strip()
+                if not linha:
+                    continue
+                try:
+                    yield json.loads(linha)
+                except json.JSONDecodeError as e:
+                    yield ValueError(f"Linha NDJSON inválida: {e}")
+        finally:
+            if arquivo is not sys.stdin:
+                arquivo.close()
+
+
+# Números de processo que já têm decisão com sucesso na saída (para retomar)
+def ja_processados(caminho_saida: str) -> set[str]:
+    feitos = set()
+    try:
+        with open(caminho_saida, "r", encoding="utf-8") as f:
+            for linha in f:
+                try:
+                    registro = json.loads(linha)
+                except json.JSONDecodeError:
+                    # Última linha pode ter ficado pela metade numa interrupção
+                    continue
+                if registro.get("status") == "success" and registro.get("numeroProcesso"):
+                    feitos.add(registro["numeroProcesso"])
+    except FileNotFoundError:
+        pass
+    return feitos
+
+
+async def processar(
+    registros: Iterable[Any],
+    saida,
+    concorrencia: int = 8,
+    pular: set[str] | None = None,
+    curto_circuito: bool | None = None,
+) -> dict:
+
+    pular = pular or set()
+    semaforo = asyncio.Semaphore(concorrencia)
+    # Limita quantos registros ficam lidos/em andamento ao mesmo tempo
+    max_pendentes = concorrencia * 2
+
+    contadores = {"lidos": 0, "pulados": 0, "sucesso": 0, "erro": 0}
+    pendentes: set[asyncio.Task] = set()
+    inicio = time.perf_counter()
+
+    def escrever(tarefas):
+        for tarefa in tarefas:
+            resultado = tarefa.result()
+            contadores["sucesso" if resultado["status"] == "success" else "erro"] += 1
+            saida.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+        saida.flush()
+
+    for registro in registros:
+        contadores["lidos"] += 1
+
+        if isinstance(registro, dict) and registro.get("numeroProcesso") in pular:
+            contadores["pulados"] += 1
+            continue
+
+        pendentes.add(asyncio.create_task(analisar_registro(registro, semaforo, curto_circuito)))
+
+        if len(pendentes) >= max_pendentes:
+            prontas, pendentes = await asyncio.wait(pendentes, return_when=asyncio.FIRST_COMPLETED)
+            escrever(prontas)
+
+        if contadores["lidos"] % 1000 == 0:
+            logger.info(f"Progresso | {contadores} | tempo={time.perf_counter() - inicio:.1f}s")
+
+    if pendentes:
+        prontas, _ = await asyncio.wait(pendentes)
+        escrever(prontas)
+
+    contadores["tempo_total_s"] = round(time.perf_counter() - inicio, 3)
+    return contadores
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m verifier.batch",
+        description="Analisa processos em NDJSON e grava as decisões em NDJSON.",
+    )
+    parser.add_argument("entradas", nargs="*", default=["-"], help="arquivos NDJSON de entrada ('-' = stdin)")
+    parser.add_argument("-o", "--saida", required=True, help="arquivo NDJSON de saída (aberto em modo append)")
+    parser.add_argument("-c", "--concorrencia", type=int, default=8, help="chamadas simultâneas ao LLM")
+    atalho = parser.add_mutually_exclusive_group()
+    atalho.add_argument(
+        "--curto-circuito",
+        action="store_true",
+        help="decide só pelas regras os casos claros, sem chamar o LLM",
+    )
+    atalho.add_argument(
+        "--sem-curto-circuito",
+        action="store_true",
+        help="envia todos os processos ao LLM, mesmo os decididos pelas regras",
+    )
+    args = parser.parse_args(argv)
+
+    pular = ja_processados(args.saida)
+    if pular:
+        logger.info(f"Retomando | processos já decididos na saída={len(pular)}")
+
+    with open(args.saida, "a", encoding="utf-8") as saida:
+        contadores = asyncio.run(
+            processar(
+                ler_registros(args.entradas),
+                saida,
+                concorrencia=args.concorrencia,
+                pular=pular,
+                curto_circuito=True if args.curto_circuito else False if args.sem_curto_circuito else None,
+            )
+        )
+
+    logger.info(f"Backfill concluído | {contadores}")
+    return 0 if contadores["erro"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+import re
+import unicodedata
+from typing import Iterable
+
+
+def _montar_tabela_normalizacao() -> bytes:
+    tabela = bytearray(range(256))
+    for codigo in range(256):
+        caractere = chr(codigo)
+        decomposto = unicodedata.normalize("NFD", caractere)
+        base = "".join(c for c in decomposto if not unicodedata.combining(c)).lower()
+        if len(base) == 1 and ord(base) < 256:
+            tabela[codigo] = ord(base)
+    return bytes(tabela)
+
+
+# Tabela de bytes.translate da normalização (Latin-1 -> sem acento, caixa
+# baixa); pública para quem precisa derivar outra tabela dela
+TABELA_NORMALIZACAO = _montar_tabela_normalizacao()
+
+
+# Caixa baixa + remoção de acentos ("Trânsito" -> "transito").
+# Trabalha byte a byte sobre Latin-1 (bytes.translate é ordens de grandeza mais
+# rápido que str.translate): caracteres fora do Latin-1 viram "?". Cada
+# caractere vira exatamente um caractere, então as posições no texto
+# normalizado continuam valendo no texto original.
+def normalizar(texto: str) -> str:
+    return texto.encode("latin-1", "replace").translate(TABELA_NORMALIZACAO).decode("latin-1")
+
+
+# Busca vários termos de uma vez: uma única expressão regular (alternação dos
+# termos normalizados) percorre o texto uma vez. Cada posição candidata é
+# conferida contra todos os termos e a busca recomeça na posição seguinte,
+# então termos que se sobrepõem ("certidão de trânsito" / "trânsito em
+# julgado") são todos encontrados.
+class BuscadorTermos:
+
+    def __init__(self, termos: Iterable[str]):
+        self.termos = list(dict.fromkeys(termos))
+        self._normalizados = {termo: normalizar(termo) for termo in self.termos}
+
+        alternativas = sorted(set(self._normalizados.values()), key=len, reverse=True)
+        self._padrao = re.compile(
+            "|".join(re.escape(t) for t in alternativas)
+        ) if alternativas else None
+
+    def buscar(self, texto: str) -> dict[str, bool]:
+        encontrados = dict.fromkeys(self.termos, False)
+        if self._padrao is None or not texto:
+            return encontrados
+
+        texto = normalizar(texto)
+        pendentes = dict(self._normalizados)
+
+        ocorrencia = self._padrao.search(texto)
+        while ocorrencia is not None and pendentes:
+            posicao = ocorrencia.start()
+            for termo, normalizado in list(pendentes.items()):
+                if texto.startswith(normalizado, posicao):
+                    encontrados[termo] = True
+                    del pendentes[termo]
+            # Recomeça logo após o início, e não após o fim, da ocorrência
+            ocorrencia = self._padrao.search(texto, posicao + 1)
+
+        return encontrados
+
+    # Junta os textos com quebra de linha (nenhum termo contém "\n") e varre uma vez só
+    def buscar_em(self, textos: Iterable[str]) -> dict[str, bool]:
+        return self.buscar("\n".join(textos))
@@ -0,0 +1,174 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from api.schemas.process_schema import ResultadoDecisao
+from verifier.opniaoTecnica import OpniaoTecnica
+from config.logger import obter_log
+
+
+logger = obter_log("cache")
+
+# Campos do parecer que não influenciam a decisão: o número do processo, o
+# resumo (que é derivado da análise + políticas e só repete o número) e as
+# evidências textuais (as posições mudam, os sinais que elas geram não).
+# O número vai no prompt e o modelo pode citá-lo na justificativa: a decisão
+# é guardada com o número trocado por MARCADOR_PROCESSO e devolvida com o
+# número do processo que pediu
+_CAMPOS_FORA_DA_CHAVE = {"numero_processo": True, "resumo_tecnico": True, "analise": {"evidencias"}}
+# Trechos dos documentos mudam o prompt e entram na chave; sem trechos, a
+# chave fica igual à de antes da seleção de trechos existir
+_SEM_TRECHOS = {**_CAMPOS_FORA_DA_CHAVE, "trechos_relevantes": True}
+
+MARCADOR_PROCESSO = "{numero_processo}"
+# Muda quando o formato do valor guardado muda (entradas antigas deixam de valer)
+_VERSAO_CHAVE = "2"
+
+
+# Chave endereçada por conteúdo: mesma versão de prompt, mesmo modelo e mesmo
+# parecer canônico => mesmo prompt => mesma decisão
+def chave_decisao(opiniao_tecnica: OpniaoTecnica, versao_prompt: str, modelo: str) -> str:
+    canonico = json.dumps(
+        opiniao_tecnica.model_dump(
+            exclude=_CAMPOS_FORA_DA_CHAVE if opiniao_tecnica.trechos_relevantes else _SEM_TRECHOS
+        ),
+        ensure_ascii=False,
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    base = f"{_VERSAO_CHAVE}\x1f{versao_prompt}\x1f{modelo}\x1f{canonico}"
+    return hashlib.sha256(base.encode("utf-8")).hexdigest()
+
+
+# Cache de decisões em duas camadas:
+# - memória: LRU com TTL, local a cada worker
+# - disco (opcional): SQLite, sobrevive a reinícios e pode ser compartilhado
+class CacheDecisoes:
+
+    def __init__(self, capacidade: int = 4096, ttl: float = 86400, caminho_sqlite: str | None = None):
+        self.capacidade = capacidade
+        self.ttl = ttl
+        self.caminho_sqlite = caminho_sqlite
+
+        self._memoria: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._conexao = None
+
+        self.hits_memoria = 0
+        self.hits_disco = 0
+        self.misses = 0
+
+        if caminho_sqlite:
+            self._conexao = sqlite3.connect(caminho_sqlite, check_same_thread=False, timeout=5)
+            self._conexao.execute("PRAGMA journal_mode=WAL")
+            self._conexao.execute(
+                "CREATE TABLE IF NOT EXISTS cache_decisoes ("
+                "chave TEXT PRIMARY KEY, valor TEXT NOT NULL, expira_em REAL NOT NULL)"
+            )
+            self._conexao.commit()
+
+    def obter(self, chave: str, numero_processo: str | None = None) -> ResultadoDecisao | None:
+        valor = self._obter_valor(chave)
+        if valor is None:
+            return None
+        decisao = ResultadoDecisao.model_validate_json(valor)
+        if numero_processo:
+            decisao.justificativa = decisao.justificativa.replace(MARCADOR_PROCESSO, numero_processo)
+        return decisao
+
+    # Rotas async: com a camada SQLite, leitura e escrita em disco rodam fora
+    # do event loop (só memória não precisa)
+    async def obter_async(self, chave: str, numero_processo: str | None = None) -> ResultadoDecisao | None:
+        if self._conexao is None:
+            return self.obter(chave, numero_processo)
+        return await asyncio.to_thread(self.obter, chave, numero_processo)
+
+    async def guardar_async(self, chave: str, decisao: ResultadoDecisao, numero_processo: str | None = None) -> None:
+        if self._conexao is None:
+            self.guardar(chave, decisao, numero_processo)
+        else:
+            await asyncio.to_thread(self.guardar, chave, decisao, numero_processo)
+
+    def _obter_valor(self, chave: str) -> str | None:
+        agora = time.time()
+
+        with self._lock:
+            item = self._memoria.get(chave)
+            if item is not None:
+                expira_em, valor = item
+                if expira_em > agora:
+                    self._memoria.move_to_end(chave)
+                    self.hits_memoria += 1
+                    return valor
+                del self._memoria[chave]
+
+            if self._conexao is not None:
+                linha = self._conexao.execute(
+                    "SELECT valor, expira_em FROM cache_decisoes WHERE chave = ?", (chave,)
+                ).fetchone()
+                if linha is not None and linha[1] > agora:
+                    self._guardar_memoria(chave, linha[0], linha[1])
+                    self.hits_disco += 1
+                    return linha[0]
+
+            self.misses += 1
+            return None
+
+    def guardar(self, chave: str, decisao: ResultadoDecisao, numero_processo: str | None = None) -> None:
+        if numero_processo:
+            decisao = decisao.model_copy(
+                update={"justificativa": decisao.justificativa.replace(numero_processo, MARCADOR_PROCESSO)}
+            )
+        valor = decisao.model_dump_json()
+        expira_em = time.time() + self.ttl
+
+        with self._lock:
+            self._guardar_memoria(chave, valor, expira_em)
+
+            if self._conexao is not None:
+                try:
+                    self._conexao.execute(
+                        "INSERT OR REPLACE INTO cache_decisoes (chave, valor, expira_em) VALUES (?, ?, ?)",
+                        (chave, valor, expira_em),
+                    )
+                    self._conexao.commit()
+                except sqlite3.Error as e:
+                    # O disco é só uma camada extra: falha aqui não derruba a análise
+                    logger.warning(f"Falha ao gravar cache em disco | erro={e}")
+
+    def _guardar_memoria(self, chave: str, valor: str, expira_em: float) -> None:
+        self._memoria[chave] = (expira_em, valor)
+        self._memoria.move_to_end(chave)
+        while len(self._memoria) > self.capacidade:
+            self._memoria.popitem(last=False)
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._memoria.clear()
+            self.hits_memoria = self.hits_disco = self.misses = 0
+            if self._conexao is not None:
+                self._conexao.execute("DELETE FROM cache_decisoes")
+                self._conexao.commit()
+
+    def estatisticas(self) -> dict:
+        with self._lock:
+            return {
+                "hits_memoria": self.hits_memoria,
+                "hits_disco": self.hits_disco,
+                "misses": self.misses,
+                "itens_memoria": len(self._memoria),
+            }
+
+
+CACHE_HABILITADO = os.getenv("JUSCASH_CACHE_DECISOES", "1") == "1"
+
+cache_decisoes = CacheDecisoes(
+    capacidade=int(os.getenv("JUSCASH_CACHE_CAPACIDADE", "4096")),
+    ttl=float(os.getenv("JUSCASH_CACHE_TTL", "86400")),
+    caminho_sqlite=os.getenv("JUSCASH_CACHE_SQLITE") or None,
+)
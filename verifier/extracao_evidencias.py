@@ -0,0 +1,229 @@
+import os
+import re
+from bisect import bisect_right
+from itertools import chain
+from typing import Any, Iterable, Iterator, List, Optional
+
+from pydantic import BaseModel
+
+from verifier.buscador_termos import normalizar
+
+
+# Extração local de evidências textuais para as políticas que dependem do
+# conteúdo dos documentos, e não só de nomes e movimentos:
+# - POL-5: óbito do autor sem habilitação de herdeiros/inventário
+# - POL-6: substabelecimento sem reserva de poderes
+# - POL-7: cláusula de honorários com valor ou percentual
+# Os textos são lidos em blocos de BLOCO_CARACTERES com sobreposição, para que
+# textos enormes (ou adiados, api/ingestao.py) nunca precisem existir inteiros
+# normalizados (sem acento, caixa baixa; mesmas posições do original).
+# Cada padrão tem uma âncora literal: str.find acha as âncoras (busca em C,
+# muito mais rápida que uma alternação de regex varrendo o texto todo) e o
+# padrão só é conferido em volta delas. Como os sinais dependem apenas de
+# existir evidência, um tipo que já tem MAX_POR_TIPO evidências deixa de ser
+# procurado no resto do processo.
+# Cada evidência traz a origem, o id, o campo e as posições no texto.
+
+BLOCO_CARACTERES = int(os.getenv("JUSCASH_EVIDENCIAS_BLOCO", "65536"))
+# Maior trecho que um padrão consegue casar; blocos se sobrepõem nessa medida
+SOBREPOSICAO = 256
+# Evidências guardadas por tipo
+MAX_POR_TIPO = int(os.getenv("JUSCASH_EVIDENCIAS_MAX_POR_TIPO", "3"))
+
+_SUJEITO = r"(?:autor|autora|requerente|exequente|parte autora|credor|credora|beneficiari[oa])"
+_VALOR = r"r\$ ?\d{1,3}(?:\.?\d{3})*(?:,\d{2})?|\d{1,3}(?:,\d+)? ?(?:%|por cento)"
+
+# (tipo, âncora, padrão, recuo): o padrão precisa cobrir a âncora e pode
+# começar até `recuo` caracteres antes dela
+_REGRAS = [
+    ("obito", "obito", rf"certidao de obito|obito d[oa] {_SUJEITO}|{_SUJEITO} veio a obito", 24),
+    ("obito", "falec", rf"falecimento d[oa] {_SUJEITO}|{_SUJEITO} (?:faleceu|falecid[oa])", 16),
+    (
+        "habilitacao", "habilita",
+        r"(?<!sem )(?<!nao houve )(?<!ausencia de )"
+        r"(?:habilitacao (?:d[eoa]s? )?(?:herdeir[oa]s?|sucessor(?:es|a)?|espolio)"
+        r"|habilitad[oa]s? (?:no|nos autos do) inventario)",
+        0,
+    ),
+    ("habilitacao", "inventariante", r"inventariante", 0),
+    ("habilitacao", "formal de partilha", r"formal de partilha", 0),
+    ("substabelecimento_sem_reserva", "substabele", r"substabele\w*[^.\n]{0,80}?sem (?:a |qualquer )?reservas?", 0),
+    ("honorarios", "honorarios", rf"honorarios[^.\n]{{0,120}}?(?P<valor>{_VALOR})", 0),
+]
+_REGRAS = [(tipo, ancora, re.compile(padrao), recuo) for tipo, ancora, padrao, recuo in _REGRAS]
+
+TIPOS = tuple(dict.fromkeys(tipo for tipo, *_ in _REGRAS))
+
+
+class Evidencia(BaseModel):
+    tipo: str
+    origem: str                 # "documento" ou "movimento"
+    id: str                     # id do documento ou índice do movimento
+    campo: str                  # "nome", "texto" ou "descricao"
+    inicio: int
+    fim: int
+    trecho: str
+    valor: Optional[float] = None   # honorários em R$, quando informados assim
+
+
+# Ocorrências em uma janela normalizada que começam antes de `limite`
+def _varrer_janela(normalizada: str, limite: int, ignorar: set[str]) -> list[tuple[int, int, str, Any]]:
+    encontradas = []
+    for tipo, ancora, padrao, recuo in _REGRAS:
+        if tipo in ignorar:
+            continue
+        posicao = normalizada.find(ancora)
+        while posicao != -1 and posicao - recuo < limite:
+            ocorrencia = padrao.search(normalizada, max(0, posicao - recuo), posicao + SOBREPOSICAO)
+            if (
+                ocorrencia is not None
+                and ocorrencia.start() <= posicao < ocorrencia.end()
+                and ocorrencia.start() < limite
+            ):
+                encontradas.append((ocorrencia.start(), ocorrencia.end(), tipo, ocorrencia))
+                posicao = normalizada.find(ancora, ocorrencia.end())
+            else:
+                posicao = normalizada.find(ancora, posicao + 1)
+    encontradas.sort(key=lambda item: item[0])
+    return encontradas
+
+
+# Tipo, posições (no texto original), trecho e valor de honorários (no texto
+# normalizado) de cada ocorrência, bloco a bloco. Ocorrências que começam na
+# sobreposição ficam para o bloco seguinte, que a repete
+def _ocorrencias(partes: Iterable[str], ignorar: set[str]) -> Iterator[tuple[str, int, int, str, Optional[str]]]:
+    cauda = ""
+    base = 0
+
+    def varrer(janela: str, limite: int):
+        for inicio, fim, tipo, ocorrencia in _varrer_janela(normalizar(janela), limite, ignorar):
+            valor = ocorrencia.group("valor") if tipo == "honorarios" else None
+            yield tipo, base + inicio, base + fim, janela[inicio:fim], valor
+
+    for parte in partes:
+        if len(ignorar) == len(TIPOS):
+            return
+        janela = cauda + parte
+        corte = max(0, len(janela) - SOBREPOSICAO)
+        yield from varrer(janela, corte)
+        cauda = janela[corte:]
+        base += corte
+
+    yield from varrer(cauda, len(cauda))
+
+
+def _valor_em_reais(texto: Optional[str]) -> Optional[float]:
+    if not texto or not texto.startswith("r$"):
+        return None
+    numero = texto[2:].strip().replace(".", "").replace(",", ".")
+    try:
+        return float(numero)
+    except ValueError:
+        return None
+
+
+# Texto do documento em partes de até `tamanho` caracteres, sem carregá-lo
+# inteiro quando ele é adiado (rota /grande)
+def ler_em_partes(documento: Any, tamanho: int) -> Iterable[str]:
+    partes = getattr(documento, "partes_texto", None)
+    if partes is not None:
+        return partes(tamanho)
+    texto = documento.texto or ""
+    return (texto[i:i + tamanho] for i in range(0, len(texto), tamanho))
+
+
+def extrair_evidencias(processo: Any, bloco: int | None = None) -> list[Evidencia]:
+    return extrair_evidencias_itens(processo.documentos, enumerate(processo.movimentos), bloco)
+
+
+# Evidências de documentos e de movimentos (com seu índice no processo); na
+# análise incremental, só dos itens novos. Até MAX_POR_TIPO por tipo.
+# Textos curtos (nomes, descrições, documentos pequenos) são juntados com
+# "\n" em janelas de até `bloco` caracteres, que nenhum padrão atravessa;
+# textos maiores que o bloco são varridos em partes
+def extrair_evidencias_itens(
+    documentos: Iterable[Any], movimentos: Iterable[tuple[int, Any]], bloco: int | None = None
+) -> list[Evidencia]:
+    bloco = bloco or BLOCO_CARACTERES
+    evidencias: list[Evidencia] = []
+    contagem: dict[str, int] = {}
+    completos: set[str] = set()
+    lote: list[tuple[str, str, str, str]] = []
+    inicios: list[int] = []
+
+    def registrar(tipo, origem, identificador, campo, inicio, fim, trecho, valor) -> None:
+        if tipo in completos:
+            return
+        contagem[tipo] = contagem.get(tipo, 0) + 1
+        if contagem[tipo] >= MAX_POR_TIPO:
+            completos.add(tipo)
+        evidencias.append(
+            Evidencia(
+                tipo=tipo, origem=origem, id=identificador, campo=campo,
+                inicio=inicio, fim=fim, trecho=trecho[:200], valor=_valor_em_reais(valor),
+            )
+        )
+
+    def descarregar() -> None:
+        if not lote:
+            return
+        janela = "\n".join(texto for *_, texto in lote)
+        for inicio, fim, tipo, ocorrencia in _varrer_janela(normalizar(janela), len(janela), completos):
+            i = bisect_right(inicios, inicio) - 1
+            origem, identificador, campo, _ = lote[i]
+            valor = ocorrencia.group("valor") if tipo == "honorarios" else None
+            registrar(tipo, origem, identificador, campo, inicio - inicios[i], fim - inicios[i], janela[inicio:fim], valor)
+        lote.clear()
+        inicios.clear()
+
+    for origem, identificador, campo, partes in _fontes(documentos, movimentos, bloco):
+        if len(completos) == len(TIPOS):
+            break
+        partes = iter(partes)
+        primeira = next(partes, "")
+        segunda = next(partes, None)
+
+        if segunda is None:
+            proximo_inicio = inicios[-1] + len(lote[-1][3]) + 1 if lote else 0
+            if proximo_inicio + len(primeira) > bloco:
+                descarregar()
+                proximo_inicio = 0
+            lote.append((origem, identificador, campo, primeira))
+            inicios.append(proximo_inicio)
+            continue
+
+        descarregar()
+        for tipo, inicio, fim, trecho, valor in _ocorrencias(chain((primeira, segunda), partes), completos):
+            registrar(tipo, origem, identificador, campo, inicio, fim, trecho, valor)
+
+    descarregar()
+    return evidencias
+
+
+def _fontes(documentos: Iterable[Any], movimentos: Iterable[tuple[int, Any]], bloco: int):
+    for documento in documentos:
+        yield "documento", str(documento.id), "nome", (documento.nome,)
+        yield "documento", str(documento.id), "texto", ler_em_partes(documento, bloco)
+    for indice, movimento in movimentos:
+        yield "movimento", str(indice), "descricao", (movimento.descricao,)
+
+
+# Mantém até MAX_POR_TIPO evidências de cada tipo, na ordem em que apareceram
+def limitar_evidencias(evidencias: list[Evidencia]) -> List[Evidencia]:
+    contagem: dict[str, int] = {}
+    mantidas = []
+    for evidencia in evidencias:
+        if contagem.get(evidencia.tipo, 0) < MAX_POR_TIPO:
+            contagem[evidencia.tipo] = contagem.get(evidencia.tipo, 0) + 1
+            mantidas.append(evidencia)
+    return mantidas
+
+
+# Sinais das políticas 5, 6 e 7 a partir das evidências
+def sinais_evidencias(evidencias: list[Evidencia]) -> dict[str, bool]:
+    tipos = {evidencia.tipo for evidencia in evidencias}
+    return {
+        "obito_autor_sem_habilitacao": "obito" in tipos and "habilitacao" not in tipos,
+        "substabelecimento_sem_reserva": "substabelecimento_sem_reserva" in tipos,
+        "possui_informacao_honorarios": "honorarios" in tipos,
+    }
@@ -1,69 +1,336 @@
+import asyncio
+import itertools
 import json
 import os
-from typing import Any
-from openai import OpenAI
+import threading
+import time
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any
 from pydantic import ValidationError
 
 from api.schemas.process_schema import ResultadoDecisao
 from verifier.opniaoTecnica import OpniaoTecnica
+from verifier.registro_prompts import SERIALIZACAO_COMPACTA, registro_prompts
+from verifier.serializacao import serializar_completa, serializar_opiniao
+from verifier.reparo_json import reparar_json
+from verifier.roteador_llm import ErroRoteamento, chamada_abandonada, roteador_llm
+from verifier.cache_decisoes import CACHE_HABILITADO, cache_decisoes, chave_decisao
+from verifier.agendador_llm import TempoEsgotadoFila, agendador_llm, estimar_tokens
 from dotenv import load_dotenv
 from config.logger import obter_log
+from config.metricas import (
+    ERROS_LLM,
+    JSON_REPARADO,
+    LATENCIA_ETAPA,
+    RETENTATIVAS_LLM,
+    TOKENS_ECONOMIZADOS,
+    TOKENS_PROMPT,
+)
+
+if TYPE_CHECKING:
+    import openai
 
 
 load_dotenv()
 
 logger = obter_log("llm")
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# Clientes criados no primeiro uso (ou no aquecimento, em segundo plano, na
+# subida da API), não no import: o SDK da OpenAI leva ~0,3 s para importar e
+# cada cliente monta o seu pool HTTP e contexto TLS. Retentativas ficam com o
+# agendador (max_retries=0): as do SDK não passam pela fila nem pelos
+# orçamentos de taxa
+client = None
 
-# Carregando template
-def carregarPrompt(path: str = None) -> str:
+# Cliente assíncrono: um único pool de conexões HTTP compartilhado pelo processo
+aclient = None
+
+_lock_clientes = threading.Lock()
+
+
+def obter_cliente() -> "openai.OpenAI":
+    global client
+    if client is None:
+        with _lock_clientes:
+            if client is None:
+                client = _criar_cliente("OpenAI")
+    return client
+
+
+def obter_cliente_async() -> "openai.AsyncOpenAI":
+    global aclient
+    if aclient is None:
+        with _lock_clientes:
+            if aclient is None:
+                aclient = _criar_cliente("AsyncOpenAI")
+    return aclient
+
+
+def _criar_cliente(classe: str):
+    import openai
+
+    try:
+        return getattr(openai, classe)(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
+    except openai.OpenAIError as e:
+        raise ErroLLM(f"Cliente do LLM não configurado: {e}", causa="configuracao") from e
+
+
+def aquecer_clientes() -> None:
+    try:
+        obter_cliente()
+        obter_cliente_async()
+    except ErroLLM as e:
+        logger.warning(f"Clientes do LLM não criados no aquecimento | erro={e}")
+
+# Tokens reservados para a resposta, somados à estimativa do prompt
+TOKENS_RESPOSTA = int(os.getenv("JUSCASH_LLM_TOKENS_RESPOSTA", "300"))
+
+DECISOES_VALIDAS = ["approved", "rejected", "incomplete"]
 
-    versao = os.getenv("PROMPT_VERSION", "1")
-    logger.info(f"Usando prompt versão {versao}")
+# Saída estruturada: o modelo é obrigado a responder no JSON Schema de
+# ResultadoDecisao (decisao restrita às três opções). Exige modelo com suporte
+# a response_format json_schema
+SAIDA_ESTRUTURADA = os.getenv("JUSCASH_LLM_SAIDA_ESTRUTURADA", "0") == "1"
 
-    if path is None:
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        path = os.path.join(base_dir, "prompts", f"prompt_v{versao}.txt")
+# Novas chamadas quando a resposta continua inválida mesmo após o reparo local
+RECHAMADAS_SAIDA_INVALIDA = int(os.getenv("JUSCASH_LLM_RECHAMADAS_SAIDA_INVALIDA", "1"))
 
-    with open(path, "r", encoding="utf-8") as f:
-        return f.read()
+# A economia da serialização compacta pede a completa, só para medir: ela é
+# calculada em 1 de cada AMOSTRA_ECONOMIA prompts e contada por todos eles
+AMOSTRA_ECONOMIA = max(1, int(os.getenv("JUSCASH_PROMPT_AMOSTRA_ECONOMIA", "50")))
+_prompts_compactos = itertools.count()
+
+
+def esquema_resultado_decisao() -> dict:
+    esquema = ResultadoDecisao.model_json_schema()
+    esquema["properties"]["decisao"]["enum"] = DECISOES_VALIDAS
+    esquema["required"] = list(esquema["properties"])
+    esquema["additionalProperties"] = False
+    return esquema
+
+
+FORMATO_RESPOSTA = {
+    "type": "json_schema",
+    "json_schema": {"name": "resultado_decisao", "strict": True, "schema": esquema_resultado_decisao()},
+}
+
+# Carregando template (servido da memória pelo registro de prompts)
+def carregarPrompt(path: str = None) -> str:
+
+    if path is not None:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    return registro_prompts.obter().texto
     
 
-# Constroi o prompt final, injetando o JSON do parecer técnico
+# Constroi o prompt final, injetando o JSON do parecer técnico na
+# serialização que a versão ativa do prompt pede (completa ou compacta)
 def construirPrompt(opniao_tecnica: OpniaoTecnica) -> str:
 
-    template = carregarPrompt()
-    opiniao_json = json.dumps(opniao_tecnica.model_dump(), ensure_ascii=False)
+    template = registro_prompts.obter()
+    opiniao_json = serializar_opiniao(opniao_tecnica, template.serializacao)
+    prompt = template.renderizar(opiniao_json)
+
+    TOKENS_PROMPT.inc(estimar_tokens(prompt), versao_prompt=template.versao)
+    if template.serializacao == SERIALIZACAO_COMPACTA and next(_prompts_compactos) % AMOSTRA_ECONOMIA == 0:
+        economizados = estimar_tokens(serializar_completa(opniao_tecnica)) - estimar_tokens(opiniao_json)
+        TOKENS_ECONOMIZADOS.inc(economizados * AMOSTRA_ECONOMIA, versao_prompt=template.versao)
 
-    prompt = template.replace("{technical_opinion_json}", opiniao_json)
     return prompt
 
 class ErroLLM(Exception):
-    # Tratamento de um possivel erro
-    pass
+    # Tratamento de um possivel erro; `causa` alimenta a métrica de erros
+    def __init__(self, mensagem: str, causa: str = "desconhecida"):
+        super().__init__(mensagem)
+        self.causa = causa
 
-# Faz a chamada bruta ao LLM
-def chamar_llm(prompt: str, modelo: str = None) -> str:
-    
-    if modelo is None:
-        modelo = os.getenv("JUSCASH_LLM_MODELO", "gpt-4.1-mini")
 
-    resposta = client.chat.completions.create(
-        model=modelo,
-        messages=[
+# Modelo e prazo escolhidos pelo roteador para a tentativa em andamento. Vai
+# por contexto (por thread/tarefa) para chamar_llm(prompt) manter a assinatura
+_rota_chamada: ContextVar[tuple[str | None, float | None]] = ContextVar("rota_chamada", default=(None, None))
+
+
+# Modelo que respondeu a última análise deste contexto: o secundário, se o
+# hedge venceu; o padrão, se a decisão veio do cache. Também vai por contexto
+# para analisar_com_llm manter o retorno
+_modelo_resposta: ContextVar[str | None] = ContextVar("modelo_resposta", default=None)
+
+
+def modelo_padrao() -> str:
+    return os.getenv("JUSCASH_LLM_MODELO", "gpt-4.1-mini")
+
+
+def modelo_resposta() -> str:
+    return _modelo_resposta.get() or modelo_padrao()
+
+# Faz a chamada bruta ao LLM, passando pelo agendador (fila, orçamentos de
+# RPM/TPM e retentativas com backoff), dentro do prazo `timeout` se houver
+def chamar_llm(prompt: str, modelo: str = None, timeout: float = None) -> str:
+    import openai
+
+    cliente = obter_cliente()
+    modelo_rota, prazo_rota = _rota_chamada.get()
+    modelo = modelo or modelo_rota or modelo_padrao()
+    timeout = timeout if timeout is not None else prazo_rota
+
+    tokens = estimar_tokens(prompt) + TOKENS_RESPOSTA
+    # Prazo da chamada inteira (fila + tentativas), vindo do roteador
+    limite = None if timeout is None else time.monotonic() + timeout
+
+    for tentativa in range(1, agendador_llm.tentativas + 1):
+        _verificar_abandono()
+        with LATENCIA_ETAPA.cronometrar(etapa="fila_llm"):
+            try:
+                ficha = agendador_llm.adquirir(tokens, _restante(limite))
+            except TempoEsgotadoFila as e:
+                raise ErroLLM(str(e), causa="fila") from e
+        if chamada_abandonada():
+            # Vaga e tokens voltam ao agendador sem a chamada ter sido feita
+            agendador_llm.concluir(ficha, tokens_usados=0, falhou=True)
+            _verificar_abandono()
+
+        try:
+            bruta = cliente.chat.completions.with_raw_response.create(
+                **_parametros(prompt, modelo), timeout=_timeout_tentativa(limite)
+            )
+            resposta = bruta.parse()
+        except openai.APIError as e:
+            time.sleep(_tratar_falha(ficha, e, tentativa))
+            continue
+        except BaseException:
+            agendador_llm.concluir(ficha, falhou=True)
+            raise
+
+        agendador_llm.concluir(ficha, tokens_usados=_tokens_usados(resposta), cabecalhos=bruta.headers)
+        return _conteudo_resposta(resposta)
+
+
+# Mesma chamada, sem bloquear o event loop
+async def chamar_llm_async(prompt: str, modelo: str = None, timeout: float = None) -> str:
+    import openai
+
+    cliente = obter_cliente_async()
+    modelo_rota, prazo_rota = _rota_chamada.get()
+    modelo = modelo or modelo_rota or modelo_padrao()
+    timeout = timeout if timeout is not None else prazo_rota
+
+    tokens = estimar_tokens(prompt) + TOKENS_RESPOSTA
+    # Prazo da chamada inteira (fila + tentativas), vindo do roteador
+    limite = None if timeout is None else time.monotonic() + timeout
+
+    for tentativa in range(1, agendador_llm.tentativas + 1):
+        with LATENCIA_ETAPA.cronometrar(etapa="fila_llm"):
+            try:
+                ficha = await agendador_llm.adquirir_async(tokens, _restante(limite))
+            except TempoEsgotadoFila as e:
+                raise ErroLLM(str(e), causa="fila") from e
+
+        try:
+            bruta = await cliente.chat.completions.with_raw_response.create(
+                **_parametros(prompt, modelo), timeout=_timeout_tentativa(limite)
+            )
+            resposta = bruta.parse()
+        except openai.APIError as e:
+            await asyncio.sleep(_tratar_falha(ficha, e, tentativa))
+            continue
+        except BaseException:
+            agendador_llm.concluir(ficha, falhou=True)
+            raise
+
+        agendador_llm.concluir(ficha, tokens_usados=_tokens_usados(resposta), cabecalhos=bruta.headers)
+        return _conteudo_resposta(resposta)
+
+
+# Perdedora do hedge (ou chamada além do prazo) na rota síncrona: o roteador
+# já não espera o resultado, então não vale gastar outra tentativa
+def _verificar_abandono() -> None:
+    if chamada_abandonada():
+        raise ErroLLM("Chamada ao LLM abandonada pelo roteador.", causa="abandonada")
+
+
+def _restante(limite: float | None) -> float | None:
+    if limite is None:
+        return None
+    restante = limite - time.monotonic()
+    if restante <= 0:
+        raise ErroLLM("Prazo da chamada ao LLM esgotado.", causa="timeout")
+    return restante
+
+
+def _timeout_tentativa(limite: float | None):
+    import openai
+
+    restante = _restante(limite)
+    return openai.NOT_GIVEN if restante is None else restante
+
+
+def _parametros(prompt: str, modelo: str) -> dict:
+    parametros = {
+        "model": modelo,
+        "messages": [
             {
                 "role": "user",
                 "content": prompt,
             }
         ],
-        temperature=0.1,
+        "temperature": 0.1,
+    }
+    if SAIDA_ESTRUTURADA:
+        parametros["response_format"] = FORMATO_RESPOSTA
+    return parametros
+
+
+# Devolve a vaga ao agendador e diz quanto esperar antes de tentar de novo;
+# erros não transitórios (ou a última tentativa) viram ErroLLM
+def _tratar_falha(ficha, e: "openai.APIError", tentativa: int) -> float:
+    import openai
+
+    cabecalhos = e.response.headers if isinstance(e, openai.APIStatusError) else None
+    agendador_llm.concluir(
+        ficha, cabecalhos=cabecalhos, limitada=isinstance(e, openai.RateLimitError), falhou=True
     )
 
+    erro = _erro_api(e)
+    if not _transitorio(e) or tentativa >= agendador_llm.tentativas:
+        raise erro from e
+
+    RETENTATIVAS_LLM.inc(causa=erro.causa)
+    espera = agendador_llm.espera_retentativa(tentativa, cabecalhos)
+    logger.warning(f"Retentando chamada ao LLM | tentativa={tentativa} | causa={erro.causa} | espera={espera:.2f}s")
+    return espera
+
+
+def _transitorio(e: "openai.APIError") -> bool:
+    import openai
+
+    return isinstance(e, (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError))
+
+
+def _tokens_usados(resposta) -> int | None:
+    uso = getattr(resposta, "usage", None)
+    return uso.total_tokens if uso is not None else None
+
+
+def _erro_api(e: "openai.APIError") -> ErroLLM:
+    import openai
+
+    if isinstance(e, openai.APITimeoutError):
+        causa = "timeout"
+    elif isinstance(e, openai.RateLimitError):
+        causa = "rate_limit"
+    elif isinstance(e, openai.APIConnectionError):
+        causa = "conexao"
+    else:
+        causa = "api"
+    return ErroLLM(f"Falha na chamada à API do LLM: {e}", causa=causa)
+
+
+def _conteudo_resposta(resposta) -> str:
     conteudo = resposta.choices[0].message.content
 
     if conteudo is None:
-        raise ErroLLM("Resposta vazia do LLM.")
+        raise ErroLLM("Resposta vazia do LLM.", causa="resposta_vazia")
 
     return conteudo.strip()
 
@@ -85,33 +352,204 @@ def _extrair_json(texto: str) -> Any:
         except json.JSONDecodeError:
             pass
 
-    raise ErroLLM(f"Não foi possível interpretar a saída do LLM como JSON: {texto}")
+    # Tentativa: reparo local (cercas, aspas, vírgulas, truncamento, literal Python)
+    reparado = reparar_json(texto)
+    if reparado is not None:
+        valor, tecnica = reparado
+        JSON_REPARADO.inc(tecnica=tecnica)
+        logger.warning(f"Saída do LLM reparada localmente | tecnica={tecnica}")
+        return valor
+
+    raise ErroLLM(f"Não foi possível interpretar a saída do LLM como JSON: {texto}", causa="json_invalido")
 
 
 # Função principal do módulo
 def analisar_com_llm(opiniao_tecnica: OpniaoTecnica) -> ResultadoDecisao:
 
+    # Parecer idêntico já decidido: evita uma chamada paga ao LLM
+    _modelo_resposta.set(modelo_padrao())
+    chave = _chave_cache(opiniao_tecnica)
+    decisao = _buscar_no_cache(opiniao_tecnica, chave)
+    if decisao is not None:
+        return decisao
+
+    _registrar_chamada(opiniao_tecnica)
+
+    try:
+        # Monta o prompt
+        with LATENCIA_ETAPA.cronometrar(etapa="prompt"):
+            prompt = construirPrompt(opiniao_tecnica)
+
+        # Chamar a llm: o roteador escolhe o modelo, aplica o prazo e faz o
+        # hedge no secundário se o primário demorar
+        def tentar(modelo: str, prazo: float) -> ResultadoDecisao:
+            return _obter_decisao(opiniao_tecnica, prompt, modelo, prazo)
+
+        try:
+            decisao, modelo = roteador_llm.executar(tentar, modelo_padrao())
+        except (ErroRoteamento, TimeoutError) as e:
+            raise _erro_roteamento(e) from e
+    except ErroLLM as e:
+        ERROS_LLM.inc(causa=e.causa)
+        raise
+
+    _guardar_no_cache(opiniao_tecnica, _chave_resposta(opiniao_tecnica, chave, modelo), decisao)
+    return decisao
+
+
+# Versão assíncrona, usada pelos endpoints async e pelo lote
+async def analisar_com_llm_async(opiniao_tecnica: OpniaoTecnica) -> ResultadoDecisao:
+
+    _modelo_resposta.set(modelo_padrao())
+    chave = _chave_cache(opiniao_tecnica)
+    decisao = await _buscar_no_cache_async(opiniao_tecnica, chave)
+    if decisao is not None:
+        return decisao
+
+    _registrar_chamada(opiniao_tecnica)
+
+    try:
+        with LATENCIA_ETAPA.cronometrar(etapa="prompt"):
+            prompt = construirPrompt(opiniao_tecnica)
+
+        async def tentar(modelo: str, prazo: float) -> ResultadoDecisao:
+            return await _obter_decisao_async(opiniao_tecnica, prompt, modelo, prazo)
+
+        try:
+            decisao, modelo = await roteador_llm.executar_async(tentar, modelo_padrao())
+        except (ErroRoteamento, TimeoutError) as e:
+            raise _erro_roteamento(e) from e
+    except ErroLLM as e:
+        ERROS_LLM.inc(causa=e.causa)
+        raise
+
+    await _guardar_no_cache_async(opiniao_tecnica, _chave_resposta(opiniao_tecnica, chave, modelo), decisao)
+    return decisao
+
+
+# Chave do cache do modelo que de fato respondeu
+def _chave_resposta(opiniao_tecnica: OpniaoTecnica, chave: str | None, modelo: str) -> str | None:
+    _modelo_resposta.set(modelo)
+    if chave is not None and modelo != modelo_padrao():
+        chave = _chave_cache(opiniao_tecnica, modelo)
+    return chave
+
+
+# Uma tentativa completa num modelo: chamada, extração e validação, com nova
+# chamada se a saída vier inválida
+def _obter_decisao(opiniao_tecnica: OpniaoTecnica, prompt: str, modelo: str, prazo: float) -> ResultadoDecisao:
+    rota = _rota_chamada.set((modelo, prazo))
+    try:
+        for tentativa in range(RECHAMADAS_SAIDA_INVALIDA + 1):
+            with LATENCIA_ETAPA.cronometrar(etapa="llm"):
+                res = chamar_llm(prompt)
+
+            try:
+                return _interpretar_resposta(opiniao_tecnica, res)
+            except ErroLLM as e:
+                _rechamar_ou_falhar(e, tentativa)
+    finally:
+        _rota_chamada.reset(rota)
+
+
+async def _obter_decisao_async(
+    opiniao_tecnica: OpniaoTecnica, prompt: str, modelo: str, prazo: float
+) -> ResultadoDecisao:
+    rota = _rota_chamada.set((modelo, prazo))
+    try:
+        for tentativa in range(RECHAMADAS_SAIDA_INVALIDA + 1):
+            with LATENCIA_ETAPA.cronometrar(etapa="llm"):
+                res = await chamar_llm_async(prompt)
+
+            try:
+                return _interpretar_resposta(opiniao_tecnica, res)
+            except ErroLLM as e:
+                _rechamar_ou_falhar(e, tentativa)
+    finally:
+        _rota_chamada.reset(rota)
+
+
+def _erro_roteamento(e: Exception) -> ErroLLM:
+    if isinstance(e, ErroRoteamento):
+        return ErroLLM(str(e), causa="circuito_aberto")
+    return ErroLLM(f"Falha na chamada à API do LLM: {e}", causa="timeout")
+
+
+# Saída que nem o reparo local salvou: chama o LLM de novo, até o limite
+def _rechamar_ou_falhar(e: ErroLLM, tentativa: int) -> None:
+    if e.causa not in ("json_invalido", "schema_invalido") or tentativa >= RECHAMADAS_SAIDA_INVALIDA:
+        raise e
+    RETENTATIVAS_LLM.inc(causa=e.causa)
+    logger.warning(f"Saída do LLM inválida, chamando de novo | causa={e.causa} | tentativa={tentativa + 1}")
+
+
+def _chave_cache(opiniao_tecnica: OpniaoTecnica, modelo: str | None = None) -> str | None:
+    if not CACHE_HABILITADO:
+        return None
+    return chave_decisao(opiniao_tecnica, registro_prompts.versao_ativa, modelo or modelo_padrao())
+
+
+def _buscar_no_cache(opiniao_tecnica: OpniaoTecnica, chave: str | None) -> ResultadoDecisao | None:
+    if chave is None:
+        return None
+
+    return _registrar_acerto(opiniao_tecnica, cache_decisoes.obter(chave, opiniao_tecnica.numero_processo))
+
+
+# Rotas async: a camada SQLite do cache não roda no event loop
+async def _buscar_no_cache_async(opiniao_tecnica: OpniaoTecnica, chave: str | None) -> ResultadoDecisao | None:
+    if chave is None:
+        return None
+
+    decisao = await cache_decisoes.obter_async(chave, opiniao_tecnica.numero_processo)
+    return _registrar_acerto(opiniao_tecnica, decisao)
+
+
+def _registrar_acerto(opiniao_tecnica: OpniaoTecnica, decisao: ResultadoDecisao | None) -> ResultadoDecisao | None:
+    if decisao is not None:
+        logger.info(
+            "Decisão servida do cache | numero_processo=%s | decision=%s",
+            opiniao_tecnica.numero_processo,
+            decisao.decisao,
+        )
+    return decisao
+
+
+def _guardar_no_cache(opiniao_tecnica: OpniaoTecnica, chave: str | None, decisao: ResultadoDecisao) -> None:
+    if chave is not None:
+        cache_decisoes.guardar(chave, decisao, opiniao_tecnica.numero_processo)
+
+
+async def _guardar_no_cache_async(
+    opiniao_tecnica: OpniaoTecnica, chave: str | None, decisao: ResultadoDecisao
+) -> None:
+    if chave is not None:
+        await cache_decisoes.guardar_async(chave, decisao, opiniao_tecnica.numero_processo)
+
+
+def _registrar_chamada(opiniao_tecnica: OpniaoTecnica) -> None:
     logger.info(
         "Chamando LLM para decisão | numero_processo=%s | politicas_violadas=%s",
         opiniao_tecnica.numero_processo,
         opiniao_tecnica.politicas_potencialmente_violadas,
     )
 
-    # Monta o prompt
-    prompt = construirPrompt(opiniao_tecnica)
 
-    # Chamar a llm
-    res = chamar_llm(prompt)
+def _interpretar_resposta(opiniao_tecnica: OpniaoTecnica, res: str) -> ResultadoDecisao:
 
     # Extrair json da resposta
-    data = _extrair_json(res)
+    with LATENCIA_ETAPA.cronometrar(etapa="extracao_json"):
+        data = _extrair_json(res)
 
     # Validar com Pydantic
     try:
-        decisao = ResultadoDecisao(**data)
+        with LATENCIA_ETAPA.cronometrar(etapa="validacao"):
+            decisao = ResultadoDecisao.model_validate(data)
     except ValidationError as e:
         logger.error("Resposta do LLM não bate com DecisionResult | erro=%s", e)
-        raise ErroLLM(f"Resposta do LLM não atende ao schema ResultadoDecisao: {e}") from e
+        raise ErroLLM(
+            f"Resposta do LLM não atende ao schema ResultadoDecisao: {e}", causa="schema_invalido"
+        ) from e
 
     logger.info(
         "Decisão validada | numero_processo=%s | decision=%s",
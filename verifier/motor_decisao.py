@@ -0,0 +1,146 @@
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Literal
+
+from pydantic import BaseModel
+
+from api.schemas.process_schema import ResultadoDecisao
+from verifier.opniaoTecnica import OpniaoTecnica
+from verifier import llm_client
+from verifier.registro_prompts import registro_prompts
+from verifier import selecao_trechos
+from config.logger import obter_log
+from config.metricas import DECISOES, LATENCIA_ETAPA
+
+
+logger = obter_log("motor")
+
+# Liga/desliga o atalho determinístico quando a requisição não diz nada.
+# Desligado por padrão (JUSCASH_CURTO_CIRCUITO=1 liga): com ele, casos como
+# óbito sem habilitação são rejeitados sem revisão do LLM
+CURTO_CIRCUITO_PADRAO = os.getenv("JUSCASH_CURTO_CIRCUITO", "0") == "1"
+
+# Políticas cuja violação, sozinha, já rejeita o processo (ver prompt_v3)
+POLITICAS_REJEICAO = {
+    "POL-3": "valor da condenação inferior a R$ 1.000,00",
+    "POL-4": "processo na esfera trabalhista",
+    "POL-5": "óbito do autor sem habilitação no inventário",
+    "POL-6": "substabelecimento sem reserva de poderes",
+}
+
+
+# Decisão final + por onde ela passou ("regras", "llm", "armazem", quando
+# reaproveitada do histórico de um processo que não mudou, ou "incremental",
+# quando os itens novos não mudaram o parecer). `modelo` é o que respondeu,
+# no caminho "llm"
+class DecisaoMotor(BaseModel):
+    resultado: ResultadoDecisao
+    caminho: Literal["regras", "llm", "armazem", "incremental"]
+    modelo: str = ""
+
+
+# Decide só com as regras quando o caso é claro; devolve None quando é ambíguo
+def decisao_deterministica(opiniao_tecnica: OpniaoTecnica) -> ResultadoDecisao | None:
+
+    violadas = opiniao_tecnica.politicas_potencialmente_violadas
+    rejeicoes = [pol for pol in POLITICAS_REJEICAO if pol in violadas]
+
+    if rejeicoes:
+        motivos = "; ".join(f"{pol}: {POLITICAS_REJEICAO[pol]}" for pol in rejeicoes)
+        return ResultadoDecisao(
+            decisao="rejected",
+            justificativa=f"Processo rejeitado pelas políticas internas ({motivos}).",
+            citacoes=rejeicoes,
+        )
+
+    if opiniao_tecnica.analise.valor_condenacao is None:
+        return ResultadoDecisao(
+            decisao="incomplete",
+            justificativa=(
+                "Valor da condenação não informado (POL-2); "
+                "não é possível aplicar as políticas de valor."
+            ),
+            citacoes=["POL-2"],
+        )
+
+    return None
+
+
+# Se o atalho vale para esta chamada: o pedido manda; sem pedido, o padrão
+def usar_curto_circuito(curto_circuito: bool | None) -> bool:
+    return CURTO_CIRCUITO_PADRAO if curto_circuito is None else curto_circuito
+
+
+# Trechos dos documentos para o prompt: só quando o caso vai para o LLM, a
+# seleção está ligada e o processo (com os textos) foi passado
+def _anexar_trechos(opiniao_tecnica: OpniaoTecnica, processo: Any | None) -> None:
+    if processo is None or not selecao_trechos.SELECAO_HABILITADA:
+        return
+    with LATENCIA_ETAPA.cronometrar(etapa="trechos"):
+        opiniao_tecnica.trechos_relevantes = selecao_trechos.selecionar_trechos(processo)
+
+
+def decidir(
+    opiniao_tecnica: OpniaoTecnica,
+    analisar: Callable[[OpniaoTecnica], ResultadoDecisao] | None = None,
+    curto_circuito: bool | None = None,
+    processo: Any | None = None,
+) -> DecisaoMotor:
+
+    if usar_curto_circuito(curto_circuito):
+        resultado = decisao_deterministica(opiniao_tecnica)
+        if resultado is not None:
+            return _registrar(DecisaoMotor(resultado=resultado, caminho="regras"), opiniao_tecnica)
+
+    _anexar_trechos(opiniao_tecnica, processo)
+
+    if analisar is None:
+        analisar = llm_client.analisar_com_llm
+
+    resultado = analisar(opiniao_tecnica)
+    return _registrar(
+        DecisaoMotor(resultado=resultado, caminho="llm", modelo=llm_client.modelo_resposta()), opiniao_tecnica
+    )
+
+
+async def decidir_async(
+    opiniao_tecnica: OpniaoTecnica,
+    analisar: Callable[[OpniaoTecnica], Awaitable[ResultadoDecisao]] | None = None,
+    curto_circuito: bool | None = None,
+    processo: Any | None = None,
+) -> DecisaoMotor:
+
+    if usar_curto_circuito(curto_circuito):
+        resultado = decisao_deterministica(opiniao_tecnica)
+        if resultado is not None:
+            return _registrar(DecisaoMotor(resultado=resultado, caminho="regras"), opiniao_tecnica)
+
+    if processo is not None and selecao_trechos.SELECAO_HABILITADA:
+        # A seleção lê todos os textos: fica fora do event loop
+        await asyncio.to_thread(_anexar_trechos, opiniao_tecnica, processo)
+
+    if analisar is None:
+        analisar = llm_client.analisar_com_llm_async
+
+    resultado = await analisar(opiniao_tecnica)
+    return _registrar(
+        DecisaoMotor(resultado=resultado, caminho="llm", modelo=llm_client.modelo_resposta()), opiniao_tecnica
+    )
+
+
+def _registrar(decisao: DecisaoMotor, opiniao_tecnica: OpniaoTecnica) -> DecisaoMotor:
+    DECISOES.inc(
+        decisao=decisao.resultado.decisao,
+        caminho=decisao.caminho,
+        versao_prompt=registro_prompts.versao_ativa,
+        modelo=decisao.modelo,
+    )
+
+    if decisao.caminho == "regras":
+        logger.info(
+            "Decisão determinística (sem LLM) | numero_processo=%s | decision=%s | citations=%s",
+            opiniao_tecnica.numero_processo,
+            decisao.resultado.decisao,
+            decisao.resultado.citacoes,
+        )
+    return decisao
@@ -2,7 +2,11 @@ from pydantic import BaseModel
 from typing import List
 
 from api.schemas.process_schema import Processo
-from verifier.regras import ParecerTecnico, analisar_processo
+from verifier.avaliador_politicas import ConjuntoPoliticas
+from verifier.extracao_evidencias import Evidencia, extrair_evidencias
+from verifier.regras import ParecerTecnico, analisar_processo, registro_politicas
+from verifier.selecao_trechos import Trecho
+from config.metricas import LATENCIA_ETAPA
 
 
 # Analise tecnica a partiri de um processo com base nas politicas
@@ -13,50 +17,19 @@ class OpniaoTecnica(BaseModel):
     politicas_potencialmente_violadas: List[str]
     politicas_atendidas: List[str]
     resumo_tecnico: str      
+    # Trechos dos documentos para o LLM; só preenchido no caminho do LLM
+    # com a seleção de trechos ligada (verifier/selecao_trechos.py)
+    trechos_relevantes: List[Trecho] = []
 
 
-def _mapear_politicas(analise: ParecerTecnico) -> tuple[list[str], list[str]]:
-    violadas: list[str] = []
-    atendidas: list[str] = []
+# As regras POL-1 a POL-8 (condição e se a política fica violada/atendida)
+# estão no arquivo de políticas; aqui só aplicamos o conjunto compilado
+def _mapear_politicas(
+    analise: ParecerTecnico, politicas: ConjuntoPoliticas | None = None
+) -> tuple[list[str], list[str]]:
 
-    # POL-1: Só compramos crédito de processos transitados em julgado e em fase de execução.
-    if analise.transitado_em_julgado and analise.em_fase_execucao:
-        atendidas.append("POL-1")
-    else:
-        violadas.append("POL-1")
-
-    # POL-2: Exigir valor de condenação informado.
-    if analise.valor_condenacao is not None:
-        atendidas.append("POL-2")
-    else:
-        violadas.append("POL-2")
-
-    # POL-3: Valor de condenação < R$ 1.000,00 → não compra.
-    if analise.valor_condenacao is not None and analise.valor_condenacao < 1000:
-        violadas.append("POL-3")
-
-    # POL-4: Condenações na esfera trabalhista → não compra.
-    if analise.esfera_trabalhista:
-        violadas.append("POL-4")
-
-    # POL-5: Óbito do autor sem habilitação no inventário → não compra.
-    if analise.obito_autor_sem_habilitacao:
-        violadas.append("POL-5")
-
-    # POL-6: Substabelecimento sem reserva de poderes → não compra.
-    if analise.substabelecimento_sem_reserva:
-        violadas.append("POL-6")
-
-    # POL-7: Informar honorários contratuais, periciais e sucumbenciais quando existirem.
-    # Aqui, como não temos os campos, só marcamos como atendida se o flag estiver True.
-    if analise.possui_informacao_honorarios:
-        atendidas.append("POL-7")
-
-    # POL-8: Se faltar documento essencial → incomplete.
-    if analise.falta_documento_essencial:
-        violadas.append("POL-8")
-    else:
-        atendidas.append("POL-8")
+    politicas = politicas or registro_politicas.obter()
+    violadas, atendidas = politicas.mapear(analise)
 
     # Remover duplicados por segurança
     violadas = list(dict.fromkeys(violadas))
@@ -92,6 +65,15 @@ def _gerar_resumo_tecnico(
     if analise.esfera_trabalhista:
         partes.append("O processo está na esfera trabalhista (possível incidência da POL-4).")
 
+    if analise.obito_autor_sem_habilitacao:
+        partes.append("Há indício de óbito do autor sem habilitação de herdeiros (POL-5).")
+
+    if analise.substabelecimento_sem_reserva:
+        partes.append("Há substabelecimento sem reserva de poderes (POL-6).")
+
+    if analise.possui_informacao_honorarios:
+        partes.append("Os honorários estão informados nos documentos (POL-7).")
+
     if analise.falta_documento_essencial:
         faltantes = ", ".join(analise.documentos_essenciais_faltantes) or "não especificados"
         partes.append(
@@ -119,13 +101,27 @@ def _gerar_resumo_tecnico(
 
 
 # Gera parecer estruturado para ser usado depois no prompt da LLM
-def gerar_parecer_tecnico(process: Processo) -> OpniaoTecnica:
-
-    # 1) Aplica as regras de negócio
-    analise = analisar_processo(process)
-
-    # 2) Mapeia as políticas relacionadas
-    politicas_violadas, politicas_atendidas = _mapear_politicas(analise)
+def gerar_parecer_tecnico(
+    process: Processo,
+    politicas: ConjuntoPoliticas | None = None,
+    hits: dict[str, dict[str, bool]] | None = None,
+    evidencias: list[Evidencia] | None = None,
+) -> OpniaoTecnica:
+
+    # Mesma versão das políticas para todo o parecer, mesmo se houver troca no meio
+    politicas = politicas or registro_politicas.obter()
+
+    # 0) Evidências textuais das políticas 5 a 7
+    if evidencias is None:
+        with LATENCIA_ETAPA.cronometrar(etapa="evidencias"):
+            evidencias = extrair_evidencias(process)
+
+    with LATENCIA_ETAPA.cronometrar(etapa="regras"):
+        # 1) Aplica as regras de negócio
+        analise = analisar_processo(process, politicas, hits, evidencias)
+
+        # 2) Mapeia as políticas relacionadas
+        politicas_violadas, politicas_atendidas = _mapear_politicas(analise, politicas)
 
     # 3) Monta o resumo técnico em texto livre
     resumo = _gerar_resumo_tecnico(
@@ -0,0 +1,194 @@
+import asyncio
+import mmap
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any
+
+from api.ingestao import TextoAdiado
+from api.schemas.processo_compacto import DocumentoCompacto, MovimentoCompacto, ProcessoCompacto
+from verifier.opniaoTecnica import OpniaoTecnica, gerar_parecer_tecnico
+from config.logger import obter_log
+from config.metricas import LATENCIA_ETAPA
+
+
+logger = obter_log("pool_cpu")
+
+
+# Pool de processos para a parte CPU do parecer (evidências textuais,
+# normalização, regras). Sob o uvicorn ela roda no threadpool ou no event
+# loop, presa ao GIL: um processo com muito texto trava as requisições que
+# só esperam o LLM no mesmo worker. Com o pool, o parecer de processos
+# grandes é gerado em outro processo e a chamada ao LLM continua aqui.
+# - Os trabalhadores sobem com "spawn" (o worker do uvicorn tem threads e
+#   conexões abertas, que não devem ser herdadas por fork) e já compilam as
+#   políticas e os padrões no initializer.
+# - O processo vai como tuplas (metadados, documentos, movimentos), não como
+#   árvore Pydantic em pickle; lá vira a projeção com __slots__
+#   (api/schemas/processo_compacto.py). Textos adiados vão como os bytes
+#   ainda escapados, sem decodificar. O parecer volta como JSON.
+# - Processos com pouco texto ficam no processo principal: para eles o custo
+#   de ida e volta é maior que o do próprio parecer. Os grandes também: a
+#   cópia para o trabalhador teria todos os textos na memória de uma vez.
+#   Por isso os da rota /grande (textos num arquivo mapeado, lidos em
+#   partes) nunca vão ao pool, e os demais só até MAX_CARACTERES.
+# A análise incremental guarda estado por processo no worker e não usa o pool.
+
+MIN_CARACTERES = int(os.getenv("JUSCASH_POOL_CPU_MIN_CARACTERES", "200000"))
+MAX_CARACTERES = int(os.getenv("JUSCASH_POOL_CPU_MAX_CARACTERES", str(16 * 1024 * 1024)))
+
+_CAMPOS_PROCESSO = (
+    "numeroProcesso", "classe", "orgaoJulgador", "ultimaDistribuicao", "assunto",
+    "segredoJustica", "justicaGratuita", "siglaTribunal", "esfera", "valorCondenacao",
+)
+
+
+# Initializer de cada trabalhador: políticas compiladas antes da 1ª tarefa
+def _aquecer() -> None:
+    from verifier.regras import registro_politicas
+
+    registro_politicas.obter()
+
+
+def _pronto(_: int) -> int:
+    return os.getpid()
+
+
+def tamanho_texto(processo: Any) -> int:
+    total = 0
+    for documento in processo.documentos:
+        adiado = getattr(documento, "_texto_adiado", None)
+        total += adiado.tamanho_bytes if adiado is not None else len(documento.texto or "")
+    return total
+
+
+# Textos adiados sobre o mmap da rota /grande (api/ingestao.py)
+def texto_em_arquivo(processo: Any) -> bool:
+    for documento in processo.documentos:
+        adiado = getattr(documento, "_texto_adiado", None)
+        if adiado is not None and isinstance(adiado.corpo, mmap.mmap):
+            return True
+    return False
+
+
+def compactar_processo(processo: Any) -> tuple:
+    dados = {campo: getattr(processo, campo) for campo in _CAMPOS_PROCESSO}
+    documentos = []
+    for documento in processo.documentos:
+        adiado = getattr(documento, "_texto_adiado", None)
+        texto = adiado.bruto() if adiado is not None else documento.texto
+        documentos.append((documento.id, documento.dataHoraJuntada, documento.nome, texto))
+    movimentos = [(movimento.dataHora, movimento.descricao) for movimento in processo.movimentos]
+    return dados, documentos, movimentos
+
+
+def descompactar_processo(compacto: tuple) -> ProcessoCompacto:
+    dados, documentos, movimentos = compacto
+    return ProcessoCompacto(
+        dados,
+        [
+            DocumentoCompacto(id, data, nome, "", TextoAdiado(texto, 0, len(texto)))
+            if isinstance(texto, bytes)
+            else DocumentoCompacto(id, data, nome, texto)
+            for id, data, nome, texto in documentos
+        ],
+        [MovimentoCompacto(data, descricao) for data, descricao in movimentos],
+    )
+
+
+# Executado no trabalhador
+def _gerar_parecer_compacto(compacto: tuple) -> str:
+    return gerar_parecer_tecnico(descompactar_processo(compacto)).model_dump_json()
+
+
+class PoolCPU:
+
+    def __init__(
+        self,
+        trabalhadores: int,
+        min_caracteres: int = MIN_CARACTERES,
+        max_caracteres: int = MAX_CARACTERES,
+        inicio: str = "spawn",
+    ):
+        self.trabalhadores = trabalhadores
+        self.min_caracteres = min_caracteres
+        self.max_caracteres = max_caracteres
+        self._contexto = multiprocessing.get_context(inicio)
+        self._lock = threading.Lock()
+        self._executor = self._criar_executor()
+
+        self.tarefas = 0
+        self.falhas = 0
+
+    def _criar_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.trabalhadores, mp_context=self._contexto, initializer=_aquecer
+        )
+
+    # Sobe os trabalhadores agora, e não na primeira requisição
+    def aquecer(self) -> None:
+        pids = set(self._executor.map(_pronto, range(self.trabalhadores)))
+        logger.info(f"Pool de CPU pronto | trabalhadores={self.trabalhadores} | pids={sorted(pids)}")
+
+    def vale_a_pena(self, processo: Any) -> bool:
+        if texto_em_arquivo(processo):
+            return False
+        return self.min_caracteres <= tamanho_texto(processo) <= self.max_caracteres
+
+    def gerar_parecer(self, processo: Any) -> OpniaoTecnica:
+        compacto = compactar_processo(processo)
+        executor = self._executor
+        with LATENCIA_ETAPA.cronometrar(etapa="pool_cpu"):
+            try:
+                return self._concluir(executor.submit(_gerar_parecer_compacto, compacto).result())
+            except BrokenProcessPool as e:
+                self._recriar(executor, e)
+        return gerar_parecer_tecnico(processo)
+
+    # Cópia dos textos adiados (mmap) e o parecer de contingência também
+    # ficam fora do event loop
+    async def gerar_parecer_async(self, processo: Any) -> OpniaoTecnica:
+        compacto = await asyncio.to_thread(compactar_processo, processo)
+        executor = self._executor
+        loop = asyncio.get_running_loop()
+        with LATENCIA_ETAPA.cronometrar(etapa="pool_cpu"):
+            try:
+                return self._concluir(await loop.run_in_executor(executor, _gerar_parecer_compacto, compacto))
+            except BrokenProcessPool as e:
+                self._recriar(executor, e)
+        return await asyncio.to_thread(gerar_parecer_tecnico, processo)
+
+    def _concluir(self, json_parecer: str) -> OpniaoTecnica:
+        self.tarefas += 1
+        return OpniaoTecnica.model_validate_json(json_parecer)
+
+    # Trabalhador morreu (OOM, sinal): o pool inteiro fica inutilizável. Um
+    # novo é criado (uma vez, mesmo com várias requisições vendo a falha) e a
+    # requisição atual é atendida no processo principal
+    def _recriar(self, quebrado: ProcessPoolExecutor, erro: Exception) -> None:
+        with self._lock:
+            self.falhas += 1
+            if self._executor is not quebrado:
+                return
+            self._executor = self._criar_executor()
+        logger.warning(f"Pool de CPU quebrado, recriado | erro={erro}")
+        quebrado.shutdown(wait=False, cancel_futures=True)
+
+    def encerrar(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def estatisticas(self) -> dict:
+        return {
+            "trabalhadores": self.trabalhadores,
+            "min_caracteres": self.min_caracteres,
+            "max_caracteres": self.max_caracteres,
+            "tarefas": self.tarefas,
+            "falhas": self.falhas,
+        }
+
+
+# Desligado por padrão: só existe com JUSCASH_POOL_CPU=<número de trabalhadores>
+_trabalhadores = int(os.getenv("JUSCASH_POOL_CPU", "0"))
+pool_cpu = PoolCPU(_trabalhadores) if _trabalhadores > 0 else None
@@ -0,0 +1,134 @@
+import glob
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+
+from config.logger import obter_log
+
+
+logger = obter_log("prompts")
+
+PLACEHOLDER_OPINIAO = "{technical_opinion_json}"
+# Mesmo lugar no prompt, mas recebe o parecer na serialização compacta
+# (verifier/serializacao.py); é o placeholder que escolhe o modo da versão
+PLACEHOLDER_OPINIAO_COMPACTA = "{technical_opinion_compact}"
+
+SERIALIZACAO_COMPLETA = "completa"
+SERIALIZACAO_COMPACTA = "compacta"
+
+DIRETORIO_PROMPTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "prompts")
+
+_PADRAO_ARQUIVO = re.compile(r"prompt_v(?P<versao>[^.]+)\.txt$")
+
+
+# Template já "compilado": o texto vem quebrado nos pontos do placeholder,
+# então renderizar é só um join, sem replace nem leitura de disco
+@dataclass(frozen=True)
+class TemplatePrompt:
+    versao: str
+    caminho: str
+    mtime: float
+    partes: tuple[str, ...]
+    serializacao: str = SERIALIZACAO_COMPLETA
+
+    @property
+    def texto(self) -> str:
+        placeholder = PLACEHOLDER_OPINIAO_COMPACTA if self.serializacao == SERIALIZACAO_COMPACTA else PLACEHOLDER_OPINIAO
+        return placeholder.join(self.partes)
+
+    def renderizar(self, opiniao_json: str) -> str:
+        return opiniao_json.join(self.partes)
+
+
+def compilar_template(versao: str, caminho: str) -> TemplatePrompt:
+    mtime = os.stat(caminho).st_mtime
+    with open(caminho, "r", encoding="utf-8") as f:
+        texto = f.read()
+
+    if PLACEHOLDER_OPINIAO_COMPACTA in texto:
+        placeholder, serializacao = PLACEHOLDER_OPINIAO_COMPACTA, SERIALIZACAO_COMPACTA
+    else:
+        placeholder, serializacao = PLACEHOLDER_OPINIAO, SERIALIZACAO_COMPLETA
+
+    return TemplatePrompt(
+        versao=versao,
+        caminho=caminho,
+        mtime=mtime,
+        partes=tuple(texto.split(placeholder)),
+        serializacao=serializacao,
+    )
+
+
+# Registro de todas as versões de prompt, carregadas uma vez na subida.
+# Alterações nos arquivos são detectadas pelo mtime, verificado no máximo
+# a cada `intervalo_verificacao` segundos por versão.
+class RegistroPrompts:
+
+    def __init__(
+        self,
+        diretorio: str = DIRETORIO_PROMPTS,
+        versao_ativa: str | None = None,
+        intervalo_verificacao: float | None = None,
+    ):
+        self.diretorio = diretorio
+        self.versao_ativa = versao_ativa or os.getenv("PROMPT_VERSION", "1")
+
+        if intervalo_verificacao is None:
+            intervalo_verificacao = float(os.getenv("PROMPT_RELOAD_INTERVALO", "2"))
+        self.intervalo_verificacao = intervalo_verificacao
+
+        self._templates: dict[str, TemplatePrompt] = {}
+        self._ultima_verificacao: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+        self.carregar_todos()
+        logger.info(
+            f"Prompts carregados | versoes={sorted(self._templates)} | "
+            f"versao_ativa={self.versao_ativa}"
+        )
+
+    def carregar_todos(self) -> None:
+        for caminho in glob.glob(os.path.join(self.diretorio, "prompt_v*.txt")):
+            encontrado = _PADRAO_ARQUIVO.search(os.path.basename(caminho))
+            if encontrado:
+                versao = encontrado.group("versao")
+                self._templates[versao] = compilar_template(versao, caminho)
+                self._ultima_verificacao[versao] = time.monotonic()
+
+    def versoes(self) -> list[str]:
+        return sorted(self._templates)
+
+    def obter(self, versao: str | None = None) -> TemplatePrompt:
+        versao = versao or self.versao_ativa
+        template = self._templates.get(versao)
+
+        agora = time.monotonic()
+        if template is not None and agora - self._ultima_verificacao.get(versao, 0) < self.intervalo_verificacao:
+            return template
+
+        with self._lock:
+            self._ultima_verificacao[versao] = agora
+            caminho = os.path.join(self.diretorio, f"prompt_v{versao}.txt")
+
+            try:
+                mtime = os.stat(caminho).st_mtime
+            except FileNotFoundError:
+                if template is None:
+                    raise
+                # Arquivo removido: mantém a última versão conhecida
+                return template
+
+            if template is None or mtime != template.mtime:
+                template = compilar_template(versao, caminho)
+                self._templates[versao] = template
+                logger.info(f"Prompt recarregado | versao={versao}")
+
+        return template
+
+    def renderizar(self, opiniao_json: str, versao: str | None = None) -> str:
+        return self.obter(versao).renderizar(opiniao_json)
+
+
+registro_prompts = RegistroPrompts()
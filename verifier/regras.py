@@ -2,6 +2,9 @@ from pydantic import BaseModel
 from typing import List, Optional
 
 from api.schemas.process_schema import Processo
+from verifier.avaliador_politicas import ConjuntoPoliticas, RegistroPoliticas
+from verifier.buscador_termos import normalizar
+from verifier.extracao_evidencias import Evidencia, extrair_evidencias, sinais_evidencias
 
 class ParecerTecnico(BaseModel):
     # politicas 1 e 2
@@ -25,46 +28,59 @@ class ParecerTecnico(BaseModel):
     # Campo para comentarios
     observacoes: Optional[str] = None
 
+    # Trechos dos documentos que sustentam as políticas 5 a 7 (fora do prompt
+    # e da chave de cache; ficam no histórico do armazém)
+    evidencias: List[Evidencia] = []
+
+
+# Políticas declaradas em verifier/politicas/politicas_v{N}.json, compiladas
+# uma vez na importação e recarregadas quando o arquivo muda
+registro_politicas = RegistroPoliticas(campos_parecer=ParecerTecnico.model_fields)
+
+
+# Varre documentos e movimentos uma única vez e devolve o mapa
+# {campo: {termo: encontrado}} lido por todas as políticas
+def varrer_processo(processo: Processo, politicas: ConjuntoPoliticas | None = None) -> dict[str, dict[str, bool]]:
+    return (politicas or registro_politicas.obter()).varrer(processo)
+
+
+# `hits` e `evidencias` já calculados (ex.: acumulados pela análise
+# incremental) evitam varrer o processo de novo
+def analisar_processo(
+    processo: Processo,
+    politicas: ConjuntoPoliticas | None = None,
+    hits: dict[str, dict[str, bool]] | None = None,
+    evidencias: list[Evidencia] | None = None,
+) -> ParecerTecnico:
+    politicas = politicas or registro_politicas.obter()
+    sinais = politicas.avaliar_sinais(processo, hits)
+    if evidencias is None:
+        evidencias = extrair_evidencias(processo)
+    sinais_texto = sinais_evidencias(evidencias)
 
-def analisar_processo(processo: Processo) -> ParecerTecnico:
     # POL-1: transitado em julgado e em fase de execução
-    transitado = temDocComNome(processo, "Trânsito em Julgado")
-    # podemos considerar também variações:
-    transitado = transitado or temDocComNome(processo, "Certidão de Trânsito")
-
-    em_execucao = (
-        temMovimentoComDescricao(processo, "cumprimento definitivo")
-        or temMovimentoComDescricao(processo, "execução definitiva")
-        or temMovimentoComDescricao(processo, "cumprimento de sentença")
-    )
+    # (os termos aceitos para cada sinal estão no arquivo de políticas)
+    transitado = sinais["transitado_em_julgado"]
+
+    em_execucao = sinais["em_fase_execucao"]
 
     # POL-2 / POL-3: valor de condenação + valor baixo
     valor_condenacao = processo.valorCondenacao
-    valor_muito_baixo = (
-        valor_condenacao is not None and valor_condenacao < 1000
-    )
+    valor_muito_baixo = sinais["valor_muito_baixo"]
 
     # POL-4: esfera trabalhista
-    esfera_trabalhista = processo.esfera.lower() == "trabalhista"
+    esfera_trabalhista = sinais["esfera_trabalhista"]
 
-    # POL-5 e POL-6:
-    # No schema base eles não vêm estruturados, então por enquanto
-    # consideramos False e deixamos para o LLM tentar inferir pelo texto
-    obito_autor_sem_habilitacao = False
-    substabelecimento_sem_reserva = False
+    # POL-5 e POL-6: não vêm estruturados no schema; saem dos textos dos
+    # documentos e movimentos (verifier/extracao_evidencias.py)
+    obito_autor_sem_habilitacao = sinais_texto["obito_autor_sem_habilitacao"]
+    substabelecimento_sem_reserva = sinais_texto["substabelecimento_sem_reserva"]
 
-    # POL-7: honorários informados?
-    # No schema base também não temos "honorarios", então marcamos False.
-    possui_informacao_honorarios = False
+    # POL-7: honorários informados (cláusula com valor ou percentual)?
+    possui_informacao_honorarios = sinais_texto["possui_informacao_honorarios"]
 
     # POL-8: documento essencial faltante
-    documentos_essenciais_faltantes = []
-
-    if not transitado:
-        documentos_essenciais_faltantes.append("Certidão de trânsito em julgado")
-
-    if not em_execucao:
-        documentos_essenciais_faltantes.append("Comprovação de fase de execução")
+    documentos_essenciais_faltantes = politicas.documentos_faltantes(sinais)
 
     falta_documento_essencial = len(documentos_essenciais_faltantes) > 0
 
@@ -87,16 +103,17 @@ def analisar_processo(processo: Processo) -> ParecerTecnico:
         falta_documento_essencial=falta_documento_essencial,
         documentos_essenciais_faltantes=documentos_essenciais_faltantes,
         observacoes=observacoes,
+        evidencias=evidencias,
     )
 
 
 
 def temDocComNome(processo: Processo, termo: str) -> bool:
-    termoInferior = termo.lower()
-    return any(termoInferior in doc.nome.lower() for doc in processo.documentos)
+    termoNormalizado = normalizar(termo)
+    return any(termoNormalizado in normalizar(doc.nome) for doc in processo.documentos)
 
 
 
 def temMovimentoComDescricao(processo: Processo, termo: str) -> bool:
-    termoInferior = termo.lower()
-    return any(termoInferior in mov.descricao.lower() for mov in processo.movimentos)
+    termoNormalizado = normalizar(termo)
+    return any(termoNormalizado in normalizar(mov.descricao) for mov in processo.movimentos)
@@ -0,0 +1,100 @@
+import ast
+import json
+import re
+from typing import Any
+
+
+# Conserto local de JSON malformado vindo do LLM, tentado antes de gastar
+# uma nova chamada. Cada passo só roda se o anterior não bastou:
+# 1. cercas de código (```json ... ```) e texto em volta do objeto
+# 2. aspas tipográficas usadas como delimitadores e vírgulas sobrando
+# 3. objeto truncado: fecha string, colchetes e chaves abertos
+# 4. literal Python (aspas simples, True/False/None)
+
+_CERCA = re.compile(r"```(?:json|JSON)?\s*(.*?)(?:```|$)", re.DOTALL)
+_VIRGULA_SOBRANDO = re.compile(r",\s*([}\]])")
+_ASPAS_TIPOGRAFICAS = str.maketrans({"“": '"', "”": '"', "„": '"', "″": '"'})
+_LITERAIS_PYTHON = {"true": True, "false": False, "null": None}
+
+
+def _carregar(texto: str) -> Any:
+    try:
+        return json.loads(texto)
+    except (json.JSONDecodeError, ValueError):
+        return None
+
+
+def _sem_cercas(texto: str) -> str:
+    cerca = _CERCA.search(texto)
+    if cerca:
+        texto = cerca.group(1)
+    inicio = texto.find("{")
+    return texto[inicio:] if inicio != -1 else texto
+
+
+def _fechar_estruturas(texto: str) -> str:
+    pilha = []
+    em_string = escape = False
+
+    for caractere in texto:
+        if em_string:
+            if escape:
+                escape = False
+            elif caractere == "\\":
+                escape = True
+            elif caractere == '"':
+                em_string = False
+        elif caractere == '"':
+            em_string = True
+        elif caractere in "{[":
+            pilha.append("}" if caractere == "{" else "]")
+        elif caractere in "}]" and pilha:
+            pilha.pop()
+
+    if em_string:
+        texto += '"'
+    texto = texto.rstrip().rstrip(",")
+    # Chave solta no fim ("citacoes": ) não tem como ser completada
+    if texto.endswith(":"):
+        texto += " null"
+    return texto + "".join(reversed(pilha))
+
+
+def _literal_python(texto: str) -> Any:
+    try:
+        valor = ast.literal_eval(texto)
+    except (ValueError, SyntaxError, MemoryError, RecursionError):
+        # true/false/null no meio de aspas simples: troca pelos nomes Python
+        try:
+            valor = ast.literal_eval(
+                re.sub(r"\b(true|false|null)\b", lambda m: repr(_LITERAIS_PYTHON[m.group(1)]), texto)
+            )
+        except (ValueError, SyntaxError, MemoryError, RecursionError):
+            return None
+    return valor if isinstance(valor, (dict, list)) else None
+
+
+# Devolve (valor, técnica usada) ou None se nada funcionou
+def reparar_json(texto: str) -> tuple[Any, str] | None:
+    candidato = _sem_cercas(texto).strip()
+    valor = _carregar(candidato)
+    if valor is not None:
+        return valor, "cercas"
+
+    candidato = _VIRGULA_SOBRANDO.sub(r"\1", candidato.translate(_ASPAS_TIPOGRAFICAS))
+    valor = _carregar(candidato)
+    if valor is not None:
+        return valor, "pontuacao"
+
+    fechado = _fechar_estruturas(candidato)
+    valor = _carregar(_VIRGULA_SOBRANDO.sub(r"\1", fechado))
+    if valor is not None:
+        return valor, "truncado"
+
+    valor = _literal_python(candidato)
+    if valor is None:
+        valor = _literal_python(fechado)
+    if valor is not None:
+        return valor, "literal_python"
+
+    return None
@@ -0,0 +1,378 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Awaitable, Callable, TypeVar
+
+from config.logger import obter_log
+from config.metricas import ROTEAMENTO_LLM
+
+
+logger = obter_log("roteador_llm")
+
+T = TypeVar("T")
+
+
+# Roteamento das chamadas ao LLM para controlar a cauda de latência:
+# - prazo por chamada: nenhuma análise espera o modelo mais que `prazo`
+# - hedge: se o primário não respondeu dentro do p95 observado, a mesma
+#   análise vai também para o modelo secundário; vale o primeiro resultado
+#   válido e a outra chamada é cancelada. Na rota síncrona, a perdedora é
+#   avisada (chamada_abandonada()) e desiste antes da próxima tentativa,
+#   devolvendo a vaga e os tokens ao agendador. As chamadas com hedge usam
+#   no máximo `threads_hedge` threads (JUSCASH_LLM_HEDGE_THREADS); sem
+#   thread livre, a chamada roda na própria thread da requisição, sem hedge
+# Devolve (resultado, modelo que respondeu): com o hedge, pode ser o secundário
+# - disjuntor por modelo: depois de N falhas seguidas o modelo sai da rota
+#   por um tempo, e depois volta com uma chamada de teste. Chamada cancelada
+#   por estourar o prazo conta como falha; a que perdeu o hedge ou cuja
+#   requisição foi cancelada não dá veredito
+
+
+# Falhas que contam para o disjuntor: as do modelo/serviço. Resposta
+# malformada já tem reparo e nova chamada; fila local não é culpa do modelo
+CAUSAS_FALHA_MODELO = {"timeout", "conexao", "api", "rate_limit"}
+
+
+class ErroRoteamento(Exception):
+    pass
+
+
+# Aviso de que o roteador já não quer o resultado de uma chamada síncrona
+# em andamento; `por_prazo` distingue o prazo estourado do hedge vencido
+class Abandono(threading.Event):
+    por_prazo = False
+
+
+# Sinal, por thread, do abandono da chamada síncrona em andamento
+_abandono: ContextVar[Abandono | None] = ContextVar("abandono_llm", default=None)
+
+
+def chamada_abandonada() -> bool:
+    abandono = _abandono.get()
+    return abandono is not None and abandono.is_set()
+
+
+class RastreadorLatencia:
+
+    def __init__(self, tamanho: int = 200, amostras_min: int = 20):
+        self.amostras_min = amostras_min
+        self._amostras: deque[float] = deque(maxlen=tamanho)
+        self._lock = threading.Lock()
+
+    def registrar(self, segundos: float) -> None:
+        with self._lock:
+            self._amostras.append(segundos)
+
+    def percentil(self, p: float) -> float | None:
+        with self._lock:
+            if len(self._amostras) < self.amostras_min:
+                return None
+            ordenadas = sorted(self._amostras)
+        return ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * p))]
+
+
+class Disjuntor:
+    FECHADO = "fechado"
+    ABERTO = "aberto"
+    MEIO_ABERTO = "meio_aberto"
+
+    def __init__(self, nome: str, falhas_max: int = 5, tempo_aberto: float = 30.0):
+        self.nome = nome
+        self.falhas_max = max(1, falhas_max)
+        self.tempo_aberto = tempo_aberto
+        self.estado = self.FECHADO
+        self._falhas = 0
+        self._reabrir_em = 0.0
+        self._lock = threading.Lock()
+
+    # Fechado: libera. Aberto: bloqueia até o tempo passar, e aí libera uma
+    # única chamada de teste (meio aberto) até ela terminar
+    def permite(self) -> bool:
+        with self._lock:
+            if self.estado == self.FECHADO:
+                return True
+            if self.estado == self.ABERTO and time.monotonic() >= self._reabrir_em:
+                self.estado = self.MEIO_ABERTO
+                return True
+            return False
+
+    def sucesso(self) -> None:
+        with self._lock:
+            if self.estado != self.FECHADO:
+                logger.info(f"Disjuntor fechado | modelo={self.nome}")
+            self.estado = self.FECHADO
+            self._falhas = 0
+
+    # Chamada de teste que terminou sem veredito (cancelada): libera outra
+    def liberar_teste(self) -> None:
+        with self._lock:
+            if self.estado == self.MEIO_ABERTO:
+                self.estado = self.ABERTO
+                self._reabrir_em = time.monotonic()
+
+    def falha(self) -> None:
+        with self._lock:
+            self._falhas += 1
+            if self.estado == self.MEIO_ABERTO or self._falhas >= self.falhas_max:
+                if self.estado != self.ABERTO:
+                    logger.warning(f"Disjuntor aberto | modelo={self.nome} | falhas={self._falhas}")
+                    ROTEAMENTO_LLM.inc(evento="disjuntor_aberto", modelo=self.nome)
+                self.estado = self.ABERTO
+                self._reabrir_em = time.monotonic() + self.tempo_aberto
+
+
+class RoteadorLLM:
+
+    def __init__(
+        self,
+        secundario: str | None = None,
+        prazo: float = 60.0,
+        fator_hedge: float = 1.0,
+        atraso_hedge_min: float = 0.5,
+        atraso_hedge_padrao: float = 8.0,
+        falhas_disjuntor: int = 5,
+        tempo_disjuntor: float = 30.0,
+        threads_hedge: int = 32,
+    ):
+        self.secundario = secundario
+        self.prazo = prazo
+        self.fator_hedge = fator_hedge
+        self.atraso_hedge_min = atraso_hedge_min
+        self.atraso_hedge_padrao = atraso_hedge_padrao
+        self.falhas_disjuntor = falhas_disjuntor
+        self.tempo_disjuntor = tempo_disjuntor
+        self.threads_hedge = threads_hedge
+
+        self._latencias: dict[str, RastreadorLatencia] = {}
+        self._disjuntores: dict[str, Disjuntor] = {}
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+        self._threads_ocupadas = 0
+
+    def latencia(self, modelo: str) -> RastreadorLatencia:
+        with self._lock:
+            return self._latencias.setdefault(modelo, RastreadorLatencia())
+
+    def disjuntor(self, modelo: str) -> Disjuntor:
+        with self._lock:
+            if modelo not in self._disjuntores:
+                self._disjuntores[modelo] = Disjuntor(modelo, self.falhas_disjuntor, self.tempo_disjuntor)
+            return self._disjuntores[modelo]
+
+    # Quanto esperar pelo primário antes do hedge: p95 observado x fator,
+    # ou um valor fixo enquanto ainda não há amostras suficientes
+    def atraso_hedge(self, modelo: str) -> float:
+        p95 = self.latencia(modelo).percentil(0.95)
+        atraso = self.atraso_hedge_padrao if p95 is None else p95 * self.fator_hedge
+        return min(self.prazo, max(self.atraso_hedge_min, atraso))
+
+    # Modelo da primeira chamada e, se houver, o do hedge
+    def _rota(self, primario: str) -> tuple[str, str | None]:
+        secundario = self.secundario
+        if secundario == primario:
+            secundario = None
+
+        if self.disjuntor(primario).permite():
+            return primario, secundario
+        if secundario and self.disjuntor(secundario).permite():
+            ROTEAMENTO_LLM.inc(evento="desvio", modelo=secundario)
+            return secundario, None
+        raise ErroRoteamento(f"Nenhum modelo disponível (disjuntor aberto para {primario})")
+
+    def _pode_hedge(self, modelo: str | None) -> bool:
+        return modelo is not None and self.disjuntor(modelo).permite()
+
+    def _registrar(self, modelo: str, inicio: float, erro: BaseException | None) -> None:
+        if erro is None:
+            self.latencia(modelo).registrar(time.monotonic() - inicio)
+            self.disjuntor(modelo).sucesso()
+        elif isinstance(erro, TimeoutError) or getattr(erro, "causa", None) in CAUSAS_FALHA_MODELO:
+            self.disjuntor(modelo).falha()
+        else:
+            self.disjuntor(modelo).liberar_teste()
+
+    # ---- rota síncrona (threads)
+
+    # Cada chamada registra o próprio desfecho, uma única vez, quando termina.
+    # Abandonada por prazo, conta como falha do modelo, qualquer que seja o
+    # fim (a requisição já recebeu o timeout)
+    def _tentar(
+        self, tentar: Callable[[str, float], T], modelo: str, prazo: float, abandono: Abandono | None = None
+    ) -> T:
+        marca = _abandono.set(abandono)
+        inicio = time.monotonic()
+        erro: BaseException | None = None
+        try:
+            return tentar(modelo, prazo)
+        except BaseException as e:
+            erro = e
+            raise
+        finally:
+            _abandono.reset(marca)
+            if abandono is not None and abandono.is_set() and abandono.por_prazo:
+                self.disjuntor(modelo).falha()
+            else:
+                self._registrar(modelo, inicio, erro)
+
+    # Thread do executor do hedge; False se todas estão ocupadas (inclusive
+    # por perdedoras ainda terminando)
+    def _reservar_thread(self) -> bool:
+        with self._lock:
+            if self._threads_ocupadas >= self.threads_hedge:
+                return False
+            self._threads_ocupadas += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.threads_hedge, thread_name_prefix="hedge-llm")
+            return True
+
+    def _liberar_thread(self, _futuro: Future) -> None:
+        with self._lock:
+            self._threads_ocupadas -= 1
+
+    def _submeter(self, tentar, modelo: str, prazo: float, abandono: Abandono) -> Future:
+        futuro = self._executor.submit(self._tentar, tentar, modelo, prazo, abandono)
+        futuro.add_done_callback(self._liberar_thread)
+        return futuro
+
+    def executar(self, tentar: Callable[[str, float], T], primario: str) -> tuple[T, str]:
+        primeiro, reserva = self._rota(primario)
+        if reserva is None:
+            return self._tentar(tentar, primeiro, self.prazo), primeiro
+        if not self._reservar_thread():
+            ROTEAMENTO_LLM.inc(evento="hedge_sem_thread", modelo=reserva)
+            return self._tentar(tentar, primeiro, self.prazo), primeiro
+
+        limite = time.monotonic() + self.prazo
+        abandono = Abandono()
+        pendentes: dict[Future, str] = {self._submeter(tentar, primeiro, self.prazo, abandono): primeiro}
+        feitos, _ = wait(pendentes, timeout=self.atraso_hedge(primeiro))
+        ultimo_erro: BaseException | None = None
+
+        # Primário lento (ou já falhou): dispara o mesmo pedido no secundário
+        primario_ok = feitos and next(iter(feitos)).exception() is None
+        if not primario_ok and self._reservar_thread():
+            if self._pode_hedge(reserva):
+                ROTEAMENTO_LLM.inc(evento="hedge", modelo=reserva)
+                restante = max(0.0, limite - time.monotonic())
+                pendentes[self._submeter(tentar, reserva, restante, abandono)] = reserva
+            else:
+                self._liberar_thread(None)
+
+        while pendentes:
+            restante = limite - time.monotonic()
+            feitos, _ = wait(pendentes, timeout=max(0.0, restante), return_when=FIRST_COMPLETED)
+            if not feitos:
+                break
+            for futuro in feitos:
+                modelo = pendentes.pop(futuro)
+                if futuro.exception() is None:
+                    if modelo != primeiro:
+                        ROTEAMENTO_LLM.inc(evento="hedge_venceu", modelo=modelo)
+                    self._abandonar(pendentes, abandono, por_prazo=False)
+                    return futuro.result(), modelo
+                ultimo_erro = futuro.exception()
+
+        self._abandonar(pendentes, abandono, por_prazo=True)
+        if ultimo_erro is not None and not pendentes:
+            raise ultimo_erro
+        raise TimeoutError(f"LLM não respondeu em {self.prazo:.0f}s")
+
+    # As chamadas em andamento desistem na próxima tentativa e registram o
+    # desfecho elas mesmas (_tentar). Só a que nem começou, cancelada aqui,
+    # é registrada agora, sem veredito: o modelo nem foi chamado
+    def _abandonar(self, pendentes: dict[Future, str], abandono: Abandono, por_prazo: bool) -> None:
+        abandono.por_prazo = por_prazo
+        abandono.set()
+        for futuro, modelo in pendentes.items():
+            if futuro.cancel():
+                self.disjuntor(modelo).liberar_teste()
+
+    # ---- rota assíncrona (tarefas, canceladas de verdade)
+
+    async def _tentar_async(self, tentar: Callable[[str, float], Awaitable[T]], modelo: str, prazo: float) -> T:
+        inicio = time.monotonic()
+        try:
+            resultado = await tentar(modelo, prazo)
+        except asyncio.CancelledError:
+            # Quem cancelou sabe o motivo e registra (_cancelada)
+            raise
+        except BaseException as e:
+            self._registrar(modelo, inicio, e)
+            raise
+        self._registrar(modelo, inicio, None)
+        return resultado
+
+    def _cancelada(self, modelo: str, por_prazo: bool) -> None:
+        if por_prazo:
+            self.disjuntor(modelo).falha()
+        else:
+            self.disjuntor(modelo).liberar_teste()
+
+    # Sem secundário, o mesmo fluxo sem o hedge: uma tarefa até o prazo
+    async def executar_async(
+        self, tentar: Callable[[str, float], Awaitable[T]], primario: str
+    ) -> tuple[T, str]:
+        primeiro, reserva = self._rota(primario)
+        limite = time.monotonic() + self.prazo
+        pendentes = {asyncio.ensure_future(self._tentar_async(tentar, primeiro, self.prazo)): primeiro}
+        ultimo_erro: BaseException | None = None
+        estourou = False
+
+        try:
+            feitos, _ = await asyncio.wait(pendentes, timeout=self.atraso_hedge(primeiro))
+            primario_ok = feitos and next(iter(feitos)).exception() is None
+            if not primario_ok and self._pode_hedge(reserva):
+                ROTEAMENTO_LLM.inc(evento="hedge", modelo=reserva)
+                restante = max(0.0, limite - time.monotonic())
+                pendentes[asyncio.ensure_future(self._tentar_async(tentar, reserva, restante))] = reserva
+
+            while pendentes:
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    estourou = True
+                    break
+                feitos, _ = await asyncio.wait(pendentes, timeout=restante, return_when=asyncio.FIRST_COMPLETED)
+                for tarefa in feitos:
+                    modelo = pendentes.pop(tarefa)
+                    if tarefa.exception() is None:
+                        if modelo != primeiro:
+                            ROTEAMENTO_LLM.inc(evento="hedge_venceu", modelo=modelo)
+                        return tarefa.result(), modelo
+                    ultimo_erro = tarefa.exception()
+        finally:
+            # Perdedora do hedge, prazo estourado ou requisição cancelada
+            for tarefa, modelo in pendentes.items():
+                if not tarefa.done():
+                    tarefa.cancel()
+                    self._cancelada(modelo, por_prazo=estourou)
+
+        if ultimo_erro is not None:
+            raise ultimo_erro
+        raise TimeoutError(f"LLM não respondeu em {self.prazo:.0f}s")
+
+    def estatisticas(self) -> dict:
+        with self._lock:
+            modelos = sorted(set(self._latencias) | set(self._disjuntores))
+        return {
+            modelo: {
+                "p95_s": self.latencia(modelo).percentil(0.95),
+                "disjuntor": self.disjuntor(modelo).estado,
+            }
+            for modelo in modelos
+        }
+
+
+roteador_llm = RoteadorLLM(
+    secundario=os.getenv("JUSCASH_LLM_MODELO_SECUNDARIO") or None,
+    prazo=float(os.getenv("JUSCASH_LLM_PRAZO", "60")),
+    fator_hedge=float(os.getenv("JUSCASH_LLM_HEDGE_FATOR", "1.0")),
+    atraso_hedge_min=float(os.getenv("JUSCASH_LLM_HEDGE_ATRASO_MIN", "0.5")),
+    atraso_hedge_padrao=float(os.getenv("JUSCASH_LLM_HEDGE_ATRASO_PADRAO", "8")),
+    falhas_disjuntor=int(os.getenv("JUSCASH_LLM_DISJUNTOR_FALHAS", "5")),
+    tempo_disjuntor=float(os.getenv("JUSCASH_LLM_DISJUNTOR_ABERTO_S", "30")),
+    threads_hedge=int(os.getenv("JUSCASH_LLM_HEDGE_THREADS", "32")),
+)
@@ -0,0 +1,233 @@
+import os
+from functools import cache
+from typing import TYPE_CHECKING, Any, Iterator
+
+from pydantic import BaseModel
+
+from verifier.agendador_llm import estimar_tokens
+from verifier.buscador_termos import TABELA_NORMALIZACAO
+from verifier.extracao_evidencias import ler_em_partes
+from config.logger import obter_log
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+logger = obter_log("trechos")
+
+
+# Seleção de trechos dos documentos para o prompt: quando o LLM precisa ler
+# texto, não dá para mandar todos os documentos de um processo grande. Os
+# textos são cortados em trechos de até TAMANHO_TRECHO caracteres (em
+# espaço em branco) e pontuados com BM25 contra uma pergunta por política.
+# O índice invertido é montado por requisição e só guarda os radicais das
+# perguntas: as demais palavras contam apenas para o tamanho do trecho. A
+# pontuação é vetorizada (NumPy) sobre as ocorrências (trecho, termo).
+# Os melhores trechos de cada política entram alternadamente até o
+# ORCAMENTO_TOKENS, então o prompt tem tamanho limitado qualquer que seja o
+# processo. Os textos são lidos duas vezes, em partes: a primeira monta o
+# índice, a segunda recorta só os trechos escolhidos.
+# O NumPy só é importado na primeira seleção: com a seleção desligada (o
+# padrão), a API sobe sem ele.
+
+# Desligado por padrão (JUSCASH_TRECHOS=1 liga)
+SELECAO_HABILITADA = os.getenv("JUSCASH_TRECHOS", "0") == "1"
+ORCAMENTO_TOKENS = int(os.getenv("JUSCASH_TRECHOS_ORCAMENTO_TOKENS", "1500"))
+TRECHOS_POR_POLITICA = int(os.getenv("JUSCASH_TRECHOS_POR_POLITICA", "2"))
+TAMANHO_TRECHO = int(os.getenv("JUSCASH_TRECHOS_TAMANHO", "1200"))
+
+# Parâmetros usuais do BM25
+K1 = 1.2
+B = 0.75
+
+# Radical: prefixo da palavra normalizada ("habilitação", "habilitados" =>
+# "habili"). Uma só tabela normaliza (sem acento, caixa baixa) e troca tudo
+# que não é letra ou dígito por espaço, e bytes.split separa as palavras
+_TAMANHO_RADICAL = 6
+_TABELA_PALAVRAS = bytes(
+    c if chr(c).isascii() and chr(c).isalnum() else 0x20 for c in TABELA_NORMALIZACAO
+)
+
+# Uma pergunta por política que depende do texto dos documentos
+PERGUNTAS_POLITICAS = {
+    "POL-1": "certidão de trânsito em julgado; cumprimento definitivo de sentença em fase de execução",
+    "POL-2": "valor da condenação; cálculos de liquidação atualizados; valor devido",
+    "POL-5": "óbito ou falecimento do autor; habilitação de herdeiros, espólio, inventário",
+    "POL-6": "substabelecimento sem reserva de poderes; procuração do advogado",
+    "POL-7": "honorários advocatícios contratuais ou sucumbenciais; percentual sobre o crédito",
+}
+
+
+class Trecho(BaseModel):
+    politica: str
+    documento_id: str
+    inicio: int
+    fim: int
+    texto: str
+
+
+def _palavras(texto: str) -> list[bytes]:
+    return texto.encode("latin-1", "replace").translate(_TABELA_PALAVRAS).split()
+
+
+# Vocabulário das perguntas (radical -> id; palavras com menos de 3 letras
+# ficam de fora) e matriz política x termo
+def _consultas(perguntas: dict[str, str]) -> "tuple[dict[bytes, int], np.ndarray]":
+    import numpy as np
+
+    vocabulario: dict[bytes, int] = {}
+    termos_por_pergunta = []
+    for pergunta in perguntas.values():
+        termos_por_pergunta.append(
+            {
+                vocabulario.setdefault(palavra[:_TAMANHO_RADICAL], len(vocabulario))
+                for palavra in _palavras(pergunta)
+                if len(palavra) >= 3
+            }
+        )
+
+    pesos = np.zeros((len(perguntas), len(vocabulario)), dtype=np.float64)
+    for i, termos in enumerate(termos_por_pergunta):
+        pesos[i, list(termos)] = 1.0
+    return vocabulario, pesos
+
+
+# Vocabulário e pesos das perguntas, montados (com o import do NumPy) na
+# primeira seleção ou no pré-carregamento do serve.py
+@cache
+def indice_perguntas() -> "tuple[dict[bytes, int], np.ndarray]":
+    return _consultas(PERGUNTAS_POLITICAS)
+
+
+# Trechos de um documento como (início, fim, texto), cortados no último
+# espaço em branco antes de `tamanho` (ou em `tamanho`, se não houver)
+def _trechos_documento(documento: Any, tamanho: int) -> Iterator[tuple[int, int, str]]:
+    pendente = ""
+    base = 0
+    for parte in ler_em_partes(documento, tamanho):
+        pendente += parte
+        while len(pendente) >= tamanho:
+            corte = max(pendente.rfind(" ", tamanho // 2, tamanho), pendente.rfind("\n", tamanho // 2, tamanho))
+            corte = corte + 1 if corte != -1 else tamanho
+            yield base, base + corte, pendente[:corte]
+            base += corte
+            pendente = pendente[corte:]
+    if pendente.strip():
+        yield base, base + len(pendente), pendente
+
+
+# Pontuação BM25 de cada trecho para cada política (políticas x trechos)
+def pontuar(
+    ocorrencias_trecho: "np.ndarray", ocorrencias_termo: "np.ndarray", tamanhos: "np.ndarray", pesos: "np.ndarray"
+) -> "np.ndarray":
+    import numpy as np
+
+    quantidade = len(tamanhos)
+    if quantidade == 0 or len(ocorrencias_trecho) == 0:
+        return np.zeros((pesos.shape[0], quantidade))
+
+    termos_total = pesos.shape[1]
+    # Frequência de cada (trecho, termo) presente
+    pares, tf = np.unique(ocorrencias_trecho * termos_total + ocorrencias_termo, return_counts=True)
+    trechos, termos = np.divmod(pares, termos_total)
+
+    df = np.bincount(termos, minlength=termos_total)
+    idf = np.log(1.0 + (quantidade - df + 0.5) / (df + 0.5))
+    normalizacao = K1 * (1.0 - B + B * tamanhos[trechos] / max(tamanhos.mean(), 1.0))
+    contribuicao = idf[termos] * tf * (K1 + 1.0) / (tf + normalizacao)
+
+    return np.stack(
+        [np.bincount(trechos, weights=contribuicao * linha[termos], minlength=quantidade) for linha in pesos]
+    )
+
+
+# Melhores trechos por política, alternando entre as políticas (o 1º de
+# cada, depois o 2º...) até o orçamento de tokens
+def _escolher(pontuacoes: "np.ndarray", custos: list[int], politicas: list[str], por_politica: int, orcamento: int):
+    import numpy as np
+
+    ranking = [
+        [int(i) for i in np.argsort(-linha, kind="stable")[:por_politica] if linha[i] > 0] for linha in pontuacoes
+    ]
+    escolhidos: dict[int, str] = {}
+    tokens = 0
+    for posicao in range(por_politica):
+        for politica, indices in zip(politicas, ranking):
+            if posicao >= len(indices) or indices[posicao] in escolhidos:
+                continue
+            custo = custos[indices[posicao]]
+            if tokens + custo > orcamento:
+                continue
+            escolhidos[indices[posicao]] = politica
+            tokens += custo
+    return escolhidos, tokens
+
+
+def selecionar_trechos(
+    processo: Any,
+    orcamento_tokens: int | None = None,
+    por_politica: int | None = None,
+    tamanho: int | None = None,
+) -> list[Trecho]:
+    orcamento_tokens = ORCAMENTO_TOKENS if orcamento_tokens is None else orcamento_tokens
+    por_politica = por_politica or TRECHOS_POR_POLITICA
+    tamanho = tamanho or TAMANHO_TRECHO
+    import numpy as np
+
+    vocabulario, pesos = indice_perguntas()
+
+    # 1ª leitura: índice invertido (só com os termos das perguntas)
+    localizacao: list[tuple[int, int, int]] = []
+    tamanhos: list[int] = []
+    custos: list[int] = []
+    ocorrencias_trecho: list[int] = []
+    ocorrencias_termo: list[int] = []
+    for indice_documento, documento in enumerate(processo.documentos):
+        for inicio, fim, texto in _trechos_documento(documento, tamanho):
+            palavras = _palavras(texto)
+            termos = [
+                vocabulario[palavra[:_TAMANHO_RADICAL]]
+                for palavra in palavras
+                if palavra[:_TAMANHO_RADICAL] in vocabulario
+            ]
+            ocorrencias_trecho.extend([len(tamanhos)] * len(termos))
+            ocorrencias_termo.extend(termos)
+            localizacao.append((indice_documento, inicio, fim))
+            tamanhos.append(len(palavras))
+            custos.append(estimar_tokens(texto))
+
+    pontuacoes = pontuar(
+        np.asarray(ocorrencias_trecho, dtype=np.int64),
+        np.asarray(ocorrencias_termo, dtype=np.int64),
+        np.asarray(tamanhos, dtype=np.float64),
+        pesos,
+    )
+    politicas = list(PERGUNTAS_POLITICAS)
+    escolhidos, tokens = _escolher(pontuacoes, custos, politicas, por_politica, orcamento_tokens)
+
+    # 2ª leitura: recorta só os trechos escolhidos, na ordem dos documentos
+    por_documento: dict[int, list[int]] = {}
+    for indice in sorted(escolhidos):
+        por_documento.setdefault(localizacao[indice][0], []).append(indice)
+
+    trechos = []
+    for indice_documento, indices in por_documento.items():
+        documento = processo.documentos[indice_documento]
+        pendentes = {localizacao[i][1]: i for i in indices}
+        for inicio, fim, texto in _trechos_documento(documento, tamanho):
+            indice = pendentes.pop(inicio, None)
+            if indice is not None:
+                trechos.append(
+                    Trecho(
+                        politica=escolhidos[indice], documento_id=str(documento.id),
+                        inicio=inicio, fim=fim, texto=texto,
+                    )
+                )
+            if not pendentes:
+                break
+
+    logger.info(
+        f"Trechos selecionados | numero_processo={processo.numeroProcesso} | indexados={len(tamanhos)} | "
+        f"selecionados={len(trechos)} | tokens={tokens}"
+    )
+    return trechos
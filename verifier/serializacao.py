@@ -0,0 +1,55 @@
+import json
+
+from verifier.opniaoTecnica import OpniaoTecnica
+from verifier.registro_prompts import SERIALIZACAO_COMPACTA
+
+
+# Serialização do parecer técnico para o prompt.
+#
+# completa: o model_dump inteiro (análise, políticas violadas e atendidas,
+#     resumo em prosa), como sempre foi, menos as evidências textuais (os
+#     sinais que elas geram já estão na análise). Os trechos dos documentos
+#     só aparecem quando foram selecionados (verifier/selecao_trechos.py).
+# compacta: só o que decide o caso, com chaves curtas e sem espaços. Ficam de
+#     fora o número do processo, as políticas atendidas (são o complemento das
+#     violadas) e o resumo técnico, que repete os mesmos fatos em texto.
+#     A legenda das chaves fica no próprio prompt (ver prompt_v4.txt); os
+#     trechos vão em "tc" (ver prompt_v5.txt).
+
+
+def serializar_completa(opiniao: OpniaoTecnica) -> str:
+    excluir = {"analise": {"evidencias"}}
+    if not opiniao.trechos_relevantes:
+        excluir["trechos_relevantes"] = True
+    return json.dumps(opiniao.model_dump(exclude=excluir), ensure_ascii=False)
+
+
+def serializar_compacta(opiniao: OpniaoTecnica) -> str:
+    analise = opiniao.analise
+    dados = {
+        "te": int(analise.transitado_em_julgado),
+        "ex": int(analise.em_fase_execucao),
+        "vc": analise.valor_condenacao,
+        "vb": int(analise.valor_muito_baixo),
+        "tr": int(analise.esfera_trabalhista),
+        "ob": int(analise.obito_autor_sem_habilitacao),
+        "sb": int(analise.substabelecimento_sem_reserva),
+        "ho": int(analise.possui_informacao_honorarios),
+        "df": analise.documentos_essenciais_faltantes,
+        "pv": opiniao.politicas_potencialmente_violadas,
+    }
+    if analise.observacoes:
+        dados["obs"] = analise.observacoes
+    if opiniao.trechos_relevantes:
+        dados["tc"] = [
+            {"p": trecho.politica, "d": trecho.documento_id, "t": trecho.texto}
+            for trecho in opiniao.trechos_relevantes
+        ]
+
+    return json.dumps(dados, ensure_ascii=False, separators=(",", ":"))
+
+
+def serializar_opiniao(opiniao: OpniaoTecnica, modo: str) -> str:
+    if modo == SERIALIZACAO_COMPACTA:
+        return serializar_compacta(opiniao)
+    return serializar_completa(opiniao)